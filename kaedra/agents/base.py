@@ -4,13 +4,24 @@ Abstract base class for all agents.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, List
 from dataclasses import dataclass
+import logging
 
+from ..core.config import MODELS
+from ..core.exceptions import KaedraError
 from ..services.prompt import PromptService, PromptResult
+from ..services.prompt_assembler import (
+    PromptAssembler, PromptSection, AssembledPrompt,
+    PRIORITY_PROFILE, PRIORITY_USER_MESSAGE, PRIORITY_RECENT_TURNS, PRIORITY_TOOL_OUTPUT
+)
+from ..services.usage import TokenUsage
 from ..services.memory import MemoryService
 
 
+logger = logging.getLogger("kaedra.agents")
+
+
 @dataclass
 class AgentResponse:
     """Structured response from an agent."""
@@ -19,6 +30,13 @@ class AgentResponse:
     model: str
     latency_ms: float
     metadata: Optional[Dict] = None
+    error: Optional[KaedraError] = None  # Model call failed; content is a display message
+    usage: Optional[TokenUsage] = None   # Token counts of the underlying model call
+    
+    @property
+    def ok(self) -> bool:
+        """False if the underlying generation failed."""
+        return self.error is None
 
 
 class BaseAgent(ABC):
@@ -37,6 +55,7 @@ class BaseAgent(ABC):
         self.memory = memory_service
         self.name = name
         self._profile = ""
+        self.assembler = PromptAssembler()
     
     @property
     @abstractmethod
@@ -45,29 +64,65 @@ class BaseAgent(ABC):
         pass
     
     @abstractmethod
-    async def run(self, query: str, context: str = None) -> AgentResponse:
+    async def run(self, query: str, context: str = None, model_key: str = None,
+                  tool_output: str = None) -> AgentResponse:
         """
         Process a user query and return a response.
         
         Args:
             query: The user's input
-            context: Optional additional context
+            context: Optional additional context (e.g. prior conversation turns)
+            model_key: Override model key (flash/pro/ultra)
+            tool_output: Optional tool/fetch results for the agent to interpret
             
         Returns:
             AgentResponse with the agent's response
         """
         pass
     
-    def _build_prompt(self, query: str, context: str = None) -> str:
-        """Build the full prompt with profile and context."""
-        parts = [self.profile]
-        
-        if context:
-            parts.append(f"\n[CONTEXT]\n{context}")
-        
-        parts.append(f"\n[USER MESSAGE]\n{query}")
+    async def run_stream(self, query: str, context: str = None, model_key: str = None,
+                         tool_output: str = None) -> AsyncIterator[str]:
+        """
+        Stream the agent's response as text chunks.
         
-        return "\n".join(parts)
+        Args:
+            query: The user's input
+            context: Optional additional context (e.g. prior conversation turns)
+            model_key: Override model key (flash/pro/ultra)
+            tool_output: Optional tool/fetch results for the agent to interpret
+            
+        Yields:
+            Text chunks as they arrive
+            
+        Raises:
+            KaedraError: If generation fails
+        """
+        assembled = self._prepare_prompt(query, context, model_key, tool_output)
+        async for chunk in self.prompt.generate_stream_async(assembled.text, model_key, agent=self.name):
+            yield chunk
+    
+    def _sections(self, query: str, context: str = None, tool_output: str = None) -> List[PromptSection]:
+        """Prompt sections in display order; agents add their own."""
+        return [
+            PromptSection("profile", self.profile, PRIORITY_PROFILE),
+            PromptSection("recent_turns", context, PRIORITY_RECENT_TURNS, header="[CONTEXT]", keep="tail"),
+            PromptSection("tool_output", tool_output, PRIORITY_TOOL_OUTPUT, header="[TOOL OUTPUT]"),
+            PromptSection("user_message", query, PRIORITY_USER_MESSAGE, header="[USER MESSAGE]"),
+        ]
+    
+    def _prepare_prompt(self, query: str, context: str = None, model_key: str = None,
+                        tool_output: str = None, sections: List[PromptSection] = None) -> AssembledPrompt:
+        """Assemble the full prompt (from `sections` if already built) within the model's token budget."""
+        model_name = MODELS.get(model_key or self.prompt.current_model_key, self.prompt.current_model)
+        if sections is None:
+            sections = self._sections(query, context, tool_output)
+        assembled = self.assembler.assemble(sections, model_name)
+        if assembled.truncated or assembled.dropped or assembled.over_budget:
+            logger.info(
+                f"{self.name} prompt fit to {assembled.budget} tokens: {assembled.tokens} kept, "
+                f"truncated={assembled.truncated}, dropped={assembled.dropped}"
+            )
+        return assembled
     
     def _recall_memories(self, query: str, limit: int = 3) -> str:
         """Recall relevant memories for context."""
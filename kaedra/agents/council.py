@@ -3,17 +3,21 @@ KAEDRA v0.0.6 - Council
 Multi-agent discussion orchestration.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, field
 import logging
 import asyncio
+import re
+import time
 
-from .base import BaseAgent
+from .base import BaseAgent, AgentResponse
 from .kaedra import KaedraAgent
 from .blade import BladeAgent
 from .nyx import NyxAgent
 from ..services.prompt import PromptService, PromptResult
 from ..services.memory import MemoryService
+from ..services.usage import estimate_tokens
+from ..core.config import COUNCIL_AGENT_TIMEOUT_S, DEBATE_STATE_MAX_TOKENS
 from ..core.exceptions import AgentError
 
 
@@ -29,6 +33,19 @@ class CouncilResult:
     kaedra_synthesis: str
     model: str
     total_latency_ms: float
+    agent_latency_ms: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    parallel: bool = True
+    
+    @property
+    def partial(self) -> bool:
+        """True if any agent failed or timed out."""
+        return bool(self.errors)
+    
+    @property
+    def synthesized(self) -> bool:
+        """False if KAEDRA failed and kaedra_synthesis is the advisor fallback."""
+        return "KAEDRA" not in self.errors
     
     def to_dict(self) -> dict:
         return {
@@ -37,7 +54,154 @@ class CouncilResult:
             "nyx": self.nyx_response,
             "synthesis": self.kaedra_synthesis,
             "model": self.model,
-            "latency_ms": self.total_latency_ms
+            "latency_ms": self.total_latency_ms,
+            "agent_latency_ms": self.agent_latency_ms,
+            "errors": self.errors,
+            "synthesized": self.synthesized,
+            "parallel": self.parallel
+        }
+
+
+def fallback_synthesis(error: str, blade_text: str, nyx_text: str) -> str:
+    """Stand-in for a failed synthesis: a visible marker, then the surviving advisor text."""
+    parts = [f"[SYNTHESIS FAILED: {error}] No final call was made; advisor positions follow."]
+    for name, text in (("BLADE", blade_text), ("NYX", nyx_text)):
+        if text:
+            parts.append(f"{name}: {text}")
+    return "\n\n".join(parts)
+
+
+KEY_POINTS_INSTRUCTION = """
+End with exactly two lines:
+CLAIMS: your key claims this turn, separated by " | "
+REBUTTALS: the points you rebutted this turn, separated by " | " (or "none")"""
+
+_KEY_POINTS = re.compile(r"^\W*(CLAIMS|REBUTTALS)\W*:\s*(.*)$", re.IGNORECASE | re.MULTILINE)
+
+
+def parse_key_points(text: str) -> Tuple[str, List[str], List[str]]:
+    """
+    Split a debate turn into (content, claims, rebuttals).
+
+    Falls back to the turn's first two sentences as claims if the agent
+    did not end with the CLAIMS/REBUTTALS lines.
+    """
+    points: Dict[str, List[str]] = {"CLAIMS": [], "REBUTTALS": []}
+    for label, items in _KEY_POINTS.findall(text):
+        points[label.upper()].extend(
+            item.strip() for item in items.split("|")
+            if item.strip() and item.strip().lower() != "none"
+        )
+    content = _KEY_POINTS.sub("", text).strip()
+    if not points["CLAIMS"]:
+        sentences = re.split(r"(?<=[.!?])\s+", " ".join(content.split()))
+        points["CLAIMS"] = [sentence for sentence in sentences[:2] if sentence]
+    return content, points["CLAIMS"], points["REBUTTALS"]
+
+
+@dataclass
+class DebatePosition:
+    """Compressed running state of one side: key claims and rebuttals."""
+    agent: str
+    claims: List[str] = field(default_factory=list)
+    rebuttals: List[str] = field(default_factory=list)
+    max_tokens: int = DEBATE_STATE_MAX_TOKENS
+    
+    def update(self, claims: List[str], rebuttals: List[str]):
+        """Add a turn's points; the oldest points go first when over the cap."""
+        for point in claims:
+            if point not in self.claims:
+                self.claims.append(point)
+        for point in rebuttals:
+            if point not in self.rebuttals:
+                self.rebuttals.append(point)
+        while self.tokens > self.max_tokens and (len(self.claims) > 1 or self.rebuttals):
+            # Trim whichever list is longer; always keep the latest claim
+            if self.rebuttals and len(self.rebuttals) >= len(self.claims):
+                self.rebuttals.pop(0)
+            else:
+                self.claims.pop(0)
+    
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.render())
+    
+    def render(self) -> str:
+        parts = []
+        if self.claims:
+            parts.append("Claims:\n" + "\n".join(f"- {point}" for point in self.claims))
+        if self.rebuttals:
+            parts.append("Rebuttals:\n" + "\n".join(f"- {point}" for point in self.rebuttals))
+        return "\n".join(parts)
+    
+    def to_dict(self) -> dict:
+        return {"claims": self.claims, "rebuttals": self.rebuttals, "tokens": self.tokens}
+
+
+@dataclass
+class DebateTurn:
+    """One debate turn with its cost."""
+    agent: str
+    content: str
+    latency_ms: float
+    prompt_tokens: int
+    completion_tokens: int
+
+
+@dataclass
+class DebateRound:
+    """A round of turns (round 0 is BLADE's opening)."""
+    round: int
+    turns: List[DebateTurn] = field(default_factory=list)
+    
+    @property
+    def latency_ms(self) -> float:
+        return sum(turn.latency_ms for turn in self.turns)
+    
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(turn.prompt_tokens for turn in self.turns)
+    
+    @property
+    def completion_tokens(self) -> int:
+        return sum(turn.completion_tokens for turn in self.turns)
+
+
+@dataclass
+class DebateResult:
+    """Result of a debate."""
+    topic: str
+    rounds: List[DebateRound] = field(default_factory=list)
+    judgment: str = ""
+    judge_latency_ms: float = 0.0
+    judge_prompt_tokens: int = 0
+    positions: Dict[str, dict] = field(default_factory=dict)
+    total_latency_ms: float = 0.0
+    
+    @property
+    def turns(self) -> List[Dict[str, str]]:
+        """Debate log: every turn, then the judgment."""
+        log = [{"agent": turn.agent, "content": turn.content} for r in self.rounds for turn in r.turns]
+        log.append({"agent": "KAEDRA (Judge)", "content": self.judgment})
+        return log
+    
+    def to_dict(self) -> dict:
+        return {
+            "topic": self.topic,
+            "turns": self.turns,
+            "rounds": [
+                {
+                    "round": r.round,
+                    "latency_ms": r.latency_ms,
+                    "prompt_tokens": r.prompt_tokens,
+                    "completion_tokens": r.completion_tokens,
+                }
+                for r in self.rounds
+            ],
+            "positions": self.positions,
+            "judge_latency_ms": self.judge_latency_ms,
+            "judge_prompt_tokens": self.judge_prompt_tokens,
+            "latency_ms": self.total_latency_ms,
         }
 
 
@@ -47,30 +211,69 @@ class Council:
     
     Flow:
     1. BLADE provides action-focused perspective
-    2. NYX provides risk-focused perspective
+    2. NYX provides risk-focused perspective (concurrently with BLADE
+       by default, or after BLADE when it should respond to BLADE)
     3. KAEDRA synthesizes and makes final call
+    
+    Each agent call has a timeout; if one advisor fails, KAEDRA
+    synthesizes from the other and the result is marked partial. If
+    KAEDRA's synthesis fails, the advisors' text is returned behind a
+    visible failure marker instead (see CouncilResult.synthesized).
     """
     
     def __init__(
         self,
         prompt_service: PromptService,
-        memory_service: MemoryService = None
+        memory_service: MemoryService = None,
+        agent_timeout_s: float = COUNCIL_AGENT_TIMEOUT_S,
+        kaedra: KaedraAgent = None,
+        blade: BladeAgent = None,
+        nyx: NyxAgent = None
     ):
         self.prompt = prompt_service
         self.memory = memory_service
+        self.agent_timeout_s = agent_timeout_s
         
-        # Initialize agents
-        self.kaedra = KaedraAgent(prompt_service, memory_service)
-        self.blade = BladeAgent(prompt_service, memory_service)
-        self.nyx = NyxAgent(prompt_service, memory_service)
+        # Initialize agents (callers may share their own instances)
+        self.kaedra = kaedra or KaedraAgent(prompt_service, memory_service)
+        self.blade = blade or BladeAgent(prompt_service, memory_service)
+        self.nyx = nyx or NyxAgent(prompt_service, memory_service)
         
         logger.info("Council initialized with KAEDRA, BLADE, NYX")
     
+    async def _ask(
+        self,
+        agent: BaseAgent,
+        prompt: str,
+        model: str,
+        latencies: Dict[str, float],
+        errors: Dict[str, str]
+    ) -> Optional[AgentResponse]:
+        """Run one agent with a timeout, recording latency and any failure."""
+        start_time = time.time()
+        try:
+            response = await asyncio.wait_for(
+                agent.run(prompt, model_key=model),
+                timeout=self.agent_timeout_s
+            )
+            if response.ok:
+                return response
+            errors[agent.name] = response.error.message
+        except asyncio.TimeoutError:
+            errors[agent.name] = f"timed out after {self.agent_timeout_s:g}s"
+        except Exception as e:
+            errors[agent.name] = str(e)
+        finally:
+            latencies[agent.name] = (time.time() - start_time) * 1000
+        
+        logger.warning(f"Council: {agent.name} failed: {errors[agent.name]}")
+        return None
+    
     async def convene(
         self,
         query: str,
         model: str = None,
-        parallel: bool = False
+        parallel: bool = True
     ) -> CouncilResult:
         """
         Convene the council to discuss a query.
@@ -78,13 +281,19 @@ class Council:
         Args:
             query: Topic/question to discuss
             model: Model key to use
-            parallel: Run BLADE and NYX in parallel (faster but less contextual)
+            parallel: Run BLADE and NYX concurrently (default). Set False
+                to have NYX respond to BLADE's position, at the cost of
+                running them back to back.
         
         Returns:
             CouncilResult with all perspectives and synthesis
+        
+        Raises:
+            AgentError: If both advisors fail
         """
-        import time
         start_time = time.time()
+        latencies: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
         
         logger.info(f"Council convened for: {query[:50]}...")
         
@@ -102,8 +311,7 @@ Be direct. 2-4 sentences. End with a clear action.
 """
         
         if parallel:
-            # Run BLADE and NYX in parallel
-            blade_task = self.blade.run(blade_prompt, model)
+            # Run BLADE and NYX concurrently
             nyx_prompt = f"""COUNCIL DISCUSSION
 
 Topic: {query}
@@ -115,19 +323,21 @@ As NYX, provide your strategic risk perspective.
 
 Be thorough but concise. 2-4 sentences.
 """
-            nyx_task = self.nyx.run(nyx_prompt, model)
-            
-            blade_result, nyx_result = await asyncio.gather(blade_task, nyx_task)
+            blade_result, nyx_result = await asyncio.gather(
+                self._ask(self.blade, blade_prompt, model, latencies, errors),
+                self._ask(self.nyx, nyx_prompt, model, latencies, errors)
+            )
         else:
             # Sequential (NYX can respond to BLADE)
-            blade_result = await self.blade.run(blade_prompt, model)
+            blade_result = await self._ask(self.blade, blade_prompt, model, latencies, errors)
             
+            blade_position = blade_result.content if blade_result else "(BLADE did not respond)"
             nyx_prompt = f"""COUNCIL DISCUSSION
 
 Topic: {query}
 
 BLADE's Position:
-{blade_result.text}
+{blade_position}
 
 As NYX, respond to BLADE's take.
 - Where do you agree?
@@ -136,7 +346,13 @@ As NYX, respond to BLADE's take.
 
 Be thorough but concise. 2-4 sentences.
 """
-            nyx_result = await self.nyx.run(nyx_prompt, model)
+            nyx_result = await self._ask(self.nyx, nyx_prompt, model, latencies, errors)
+        
+        if blade_result is None and nyx_result is None:
+            raise AgentError("Both council advisors failed", agent="council", details={"errors": errors})
+        
+        blade_text = blade_result.content if blade_result else ""
+        nyx_text = nyx_result.content if nyx_result else ""
         
         # KAEDRA synthesizes
         synthesis_prompt = f"""COUNCIL SYNTHESIS
@@ -144,12 +360,13 @@ Be thorough but concise. 2-4 sentences.
 Topic: {query}
 
 BLADE's Position (Action-Focused):
-{blade_result.text}
+{blade_text or "(unavailable - BLADE did not respond)"}
 
 NYX's Position (Risk-Focused):
-{nyx_result.text}
+{nyx_text or "(unavailable - NYX did not respond)"}
 
 As KAEDRA, synthesize both perspectives and make the final call.
+If an advisor is unavailable, say so and decide from what you have.
 
 Structure:
 1. Where do they agree?
@@ -160,86 +377,140 @@ Structure:
 3-5 sentences. Be decisive. End with "Here's what we're doing..."
 """
         
-        synthesis_result = await self.kaedra.run(synthesis_prompt, model)
+        synthesis_result = await self._ask(self.kaedra, synthesis_prompt, model, latencies, errors)
+        if synthesis_result:
+            synthesis = synthesis_result.content
+        else:
+            synthesis = fallback_synthesis(errors[self.kaedra.name], blade_text, nyx_text)
         
         total_latency = (time.time() - start_time) * 1000
         
         result = CouncilResult(
             query=query,
-            blade_response=blade_result.text,
-            nyx_response=nyx_result.text,
-            kaedra_synthesis=synthesis_result.text,
-            model=blade_result.model,
-            total_latency_ms=total_latency
+            blade_response=blade_text,
+            nyx_response=nyx_text,
+            kaedra_synthesis=synthesis,
+            model=(blade_result or nyx_result).model,
+            total_latency_ms=total_latency,
+            agent_latency_ms=latencies,
+            errors=errors,
+            parallel=parallel
         )
         
-        logger.info(f"Council concluded in {total_latency:.0f}ms")
+        logger.info(f"Council concluded in {total_latency:.0f}ms ({latencies})")
         
         return result
     
+    async def _debate_turn(
+        self,
+        agent: BaseAgent,
+        prompt: str,
+        model: str,
+        position: DebatePosition,
+        round_num: int
+    ) -> DebateTurn:
+        """Run one debate turn and fold its key points into the side's state."""
+        latencies: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+        response = await self._ask(agent, prompt, model, latencies, errors)
+        if response is None:
+            raise AgentError(
+                f"{agent.name} failed in debate round {round_num}: {errors[agent.name]}",
+                agent="council", details={"round": round_num}
+            )
+        
+        content, claims, rebuttals = parse_key_points(response.content)
+        position.update(claims, rebuttals)
+        usage = response.usage
+        return DebateTurn(
+            agent=agent.name,
+            content=content,
+            latency_ms=latencies[agent.name],
+            prompt_tokens=usage.prompt_tokens if usage else estimate_tokens(prompt),
+            completion_tokens=usage.completion_tokens if usage else estimate_tokens(response.content)
+        )
+    
     async def debate(
         self,
         topic: str,
         rounds: int = 2,
-        model: str = None
-    ) -> List[Dict[str, str]]:
+        model: str = None,
+        state_max_tokens: int = DEBATE_STATE_MAX_TOKENS
+    ) -> DebateResult:
         """
         Extended debate between BLADE and NYX.
         
+        Each side keeps a compressed running state (key claims and
+        rebuttals, capped at state_max_tokens) that is updated after every
+        turn. Debaters see their own state plus the opponent's last turn,
+        and the judge sees both states plus the final exchange, so prompt
+        sizes stay flat as rounds increase.
+        
         Args:
             topic: Topic to debate
             rounds: Number of back-and-forth rounds
             model: Model key
+            state_max_tokens: Token cap for each side's compressed state
         
         Returns:
-            List of debate turns
+            DebateResult with turns, judgment and per-round metrics
+        
+        Raises:
+            AgentError: If a debater fails
         """
-        debate_log = []
+        start_time = time.time()
+        positions = {
+            "BLADE": DebatePosition("BLADE", max_tokens=state_max_tokens),
+            "NYX": DebatePosition("NYX", max_tokens=state_max_tokens),
+        }
+        result = DebateResult(topic=topic)
         
         # BLADE opens
         blade_opener = f"""DEBATE: {topic}
 
 You're opening the debate. State your position clearly and forcefully.
-"""
-        blade_result = await self.blade.run(blade_opener, model)
-        debate_log.append({"agent": "BLADE", "content": blade_result.text})
+{KEY_POINTS_INSTRUCTION}"""
+        opening = await self._debate_turn(self.blade, blade_opener, model, positions["BLADE"], 0)
+        result.rounds.append(DebateRound(round=0, turns=[opening]))
+        last_turn = opening
         
         # Debate rounds
-        for round_num in range(rounds):
-            # NYX responds
-            nyx_prompt = f"""DEBATE: {topic}
-Round {round_num + 1}
-
-BLADE just said:
-{debate_log[-1]['content']}
+        for round_num in range(1, rounds + 1):
+            debate_round = DebateRound(round=round_num)
+            for agent, instruction in (
+                (self.nyx, "Challenge their position. Find weaknesses. Make your counter-argument."),
+                (self.blade, "Defend your position. Counter their arguments. Stand your ground."),
+            ):
+                prompt = f"""DEBATE: {topic}
+Round {round_num}
 
-Challenge their position. Find weaknesses. Make your counter-argument.
-"""
-            nyx_result = await self.nyx.run(nyx_prompt, model)
-            debate_log.append({"agent": "NYX", "content": nyx_result.text})
-            
-            # BLADE responds
-            blade_prompt = f"""DEBATE: {topic}
-Round {round_num + 1}
+Your position so far:
+{positions[agent.name].render() or "(none yet)"}
 
-NYX just said:
-{debate_log[-1]['content']}
+{last_turn.agent} just said:
+{last_turn.content}
 
-Defend your position. Counter their arguments. Stand your ground.
-"""
-            blade_result = await self.blade.run(blade_prompt, model)
-            debate_log.append({"agent": "BLADE", "content": blade_result.text})
-        
-        # KAEDRA judges
-        debate_summary = "\n\n".join([
-            f"[{turn['agent']}]: {turn['content']}"
-            for turn in debate_log
-        ])
+{instruction}
+{KEY_POINTS_INSTRUCTION}"""
+                last_turn = await self._debate_turn(agent, prompt, model, positions[agent.name], round_num)
+                debate_round.turns.append(last_turn)
+            result.rounds.append(debate_round)
         
+        # KAEDRA judges from the compressed states plus the final exchange
+        final_exchange = "\n\n".join(
+            f"[{turn.agent}]: {turn.content}" for turn in result.rounds[-1].turns
+        )
         judge_prompt = f"""DEBATE JUDGMENT: {topic}
+Rounds: {rounds}
+
+BLADE's case (key claims and rebuttals across the debate):
+{positions["BLADE"].render()}
 
-Full debate:
-{debate_summary}
+NYX's case (key claims and rebuttals across the debate):
+{positions["NYX"].render()}
+
+Final exchange:
+{final_exchange}
 
 As the judge, determine:
 1. Strongest arguments from each side
@@ -248,10 +519,22 @@ As the judge, determine:
 4. Final ruling
 """
         
-        judgment = await self.kaedra.run(judge_prompt, model)
-        debate_log.append({"agent": "KAEDRA (Judge)", "content": judgment.text})
+        judge_start = time.time()
+        judgment = await self.kaedra.run(judge_prompt, model_key=model)
+        if not judgment.ok:
+            raise AgentError(f"Debate judgment failed: {judgment.error.message}", agent="council")
+        result.judgment = judgment.content
+        result.judge_latency_ms = (time.time() - judge_start) * 1000
+        result.judge_prompt_tokens = judgment.usage.prompt_tokens if judgment.usage else estimate_tokens(judge_prompt)
+        result.positions = {name: position.to_dict() for name, position in positions.items()}
+        result.total_latency_ms = (time.time() - start_time) * 1000
+        
+        logger.info(
+            f"Debate concluded in {result.total_latency_ms:.0f}ms over {rounds} rounds "
+            f"(judge prompt {result.judge_prompt_tokens} tokens)"
+        )
         
-        return debate_log
+        return result
     
     def get_agents(self) -> Dict[str, BaseAgent]:
         """Get all council agents."""
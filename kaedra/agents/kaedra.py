@@ -3,12 +3,20 @@ KAEDRA v0.0.6 - KAEDRA Agent
 The main Shadow Tactician orchestrator.
 """
 
-from typing import Optional
+from typing import Optional, AsyncIterator, List, Tuple
+from datetime import datetime
+import asyncio
 import time
 
 from .base import BaseAgent, AgentResponse
-from ..services.prompt import PromptService, PromptResult
+from ..core.config import MODELS
+from ..services.prompt import PromptService, PromptResult, streamed_grounded
 from ..services.memory import MemoryService
+from ..services.prompt_assembler import (
+    PromptSection, PRIORITY_PROFILE, PRIORITY_USER_MESSAGE, PRIORITY_RECENT_TURNS,
+    PRIORITY_MEMORIES, PRIORITY_TOOL_OUTPUT
+)
+from ..services.semantic_cache import SemanticCache, get_semantic_cache
 
 
 KAEDRA_PROFILE = """You are KAEDRA, a shadow tactician and strategic intelligence partner for Who Visions LLC.
@@ -62,67 +70,152 @@ class KaedraAgent(BaseAgent):
     
     Main orchestrator agent that coordinates BLADE and NYX,
     maintains memory, and provides strategic intelligence.
+    
+    Callers that opt in (use_semantic_cache=True) get paraphrases of a
+    recent query answered from the semantic cache when one is configured
+    (KAEDRA_SEMANTIC_CACHE=true).
     """
     
     def __init__(self,
                  prompt_service: PromptService,
-                 memory_service: Optional[MemoryService] = None):
+                 memory_service: Optional[MemoryService] = None,
+                 semantic_cache: Optional[SemanticCache] = None):
         super().__init__(prompt_service, memory_service, name="KAEDRA")
+        self.semantic_cache = semantic_cache if semantic_cache is not None else get_semantic_cache()
     
     @property
     def profile(self) -> str:
         return KAEDRA_PROFILE
     
-    async def run(self, query: str, context: str = None) -> AgentResponse:
+    async def run(self, query: str, context: str = None, model_key: str = None,
+                  tool_output: str = None, use_semantic_cache: bool = False) -> AgentResponse:
         """
         Process a query with full KAEDRA personality.
         
         Args:
             query: User's input
             context: Additional context (e.g., from memory)
+            model_key: Override model key (flash/pro/ultra)
+            tool_output: Tool/fetch results to interpret
+            use_semantic_cache: Allow an answer from the semantic cache
+                (user-facing queries; internal prompts leave it off)
             
         Returns:
             AgentResponse with KAEDRA's response
         """
-        # Get current time for context
-        from datetime import datetime
-        import pytz
-        
-        est = pytz.timezone('US/Eastern')
-        now = datetime.now(est)
-        current_time = now.strftime('%I:%M %p EST')
-        current_date = now.strftime('%A, %B %d, %Y')
-        
-        # Build time context
-        time_context = f"[CURRENT TIME]\nDate: {current_date}\nTime: {current_time}"
-        
-        # Recall relevant memories
-        memory_context = self._recall_memories(query)
+        sections = self._sections(query, context, tool_output)
+        cache, scope = self._semantic_cache_for(use_semantic_cache, context, tool_output, sections)
+        model_name = MODELS.get(model_key or self.prompt.current_model_key, self.prompt.current_model)
         
-        # Build combined context
-        full_context = [time_context]
-        if memory_context:
-            full_context.append(f"[RECALLED MEMORY]\n{memory_context}")
-        if context:
-            full_context.append(f"[ADDITIONAL CONTEXT]\n{context}")
-        
-        combined_context = "\n\n".join(full_context) if full_context else None
+        if cache:
+            start_time = time.time()
+            hit = await asyncio.to_thread(cache.lookup, query, model_name, scope)
+            if hit:
+                return AgentResponse(
+                    content=hit.response,
+                    agent_name=self.name,
+                    model=hit.model,
+                    latency_ms=(time.time() - start_time) * 1000,
+                    metadata={'semantic_cache': {
+                        'similarity': hit.similarity,
+                        'age_s': hit.age_s,
+                        'cached_query': hit.query,
+                    }}
+                )
         
         # Build and execute prompt
-        full_prompt = self._build_prompt(query, combined_context)
+        assembled = self._prepare_prompt(query, context, model_key, tool_output, sections)
         
         start_time = time.time()
-        result = self.prompt.generate(full_prompt)
+        result = await self.prompt.generate_async(assembled.text, model_key, agent=self.name)
         latency = (time.time() - start_time) * 1000
         
+        # Answers that actually searched depend on live results
+        if cache and result.ok and not result.grounded:
+            await asyncio.to_thread(cache.store_response, query, result.text, model_name, scope)
+        
         return AgentResponse(
             content=result.text,
             agent_name=self.name,
             model=result.model,
-            latency_ms=latency
+            latency_ms=latency,
+            error=result.error,
+            usage=result.usage,
+            metadata={'prompt': assembled.to_dict()}
         )
     
-    def run_sync(self, query: str, context: str = None) -> AgentResponse:
+    async def run_stream(self, query: str, context: str = None, model_key: str = None,
+                         tool_output: str = None, use_semantic_cache: bool = False) -> AsyncIterator[str]:
+        """
+        Stream KAEDRA's response as text chunks.
+        
+        With use_semantic_cache, a semantic cache hit is yielded as one
+        chunk and a completed stream is stored like a run() answer.
+        
+        Raises:
+            KaedraError: If generation fails
+        """
+        sections = self._sections(query, context, tool_output)
+        cache, scope = self._semantic_cache_for(use_semantic_cache, context, tool_output, sections)
+        model_name = MODELS.get(model_key or self.prompt.current_model_key, self.prompt.current_model)
+        
+        if cache:
+            hit = await asyncio.to_thread(cache.lookup, query, model_name, scope)
+            if hit:
+                yield hit.response
+                return
+        
+        chunks = []
+        async for chunk in self.prompt.generate_stream_async(
+            self._prepare_prompt(query, context, model_key, tool_output, sections).text, model_key, agent=self.name
+        ):
+            chunks.append(chunk)
+            yield chunk
+        
+        if cache and not streamed_grounded():
+            await asyncio.to_thread(cache.store_response, query, "".join(chunks), model_name, scope)
+    
+    def _semantic_cache_for(self, use_semantic_cache: bool, context: Optional[str], tool_output: Optional[str],
+                            sections: List[PromptSection]) -> Tuple[Optional[SemanticCache], str]:
+        """
+        The semantic cache for this call (None if it must not be used) and
+        the scope its answers are keyed under.
+        
+        The scope fingerprints the prompt sections besides the query that
+        shape the answer: recalled memories and today's date.
+        """
+        # Caller-supplied context (tool output, conversation) makes the answer run-specific
+        if not use_semantic_cache or not self.semantic_cache or context or tool_output:
+            return None, ""
+        memories = next((section.content for section in sections if section.name == "memories"), "")
+        return self.semantic_cache, SemanticCache.scope(memories, self._now().strftime('%Y-%m-%d'))
+    
+    @staticmethod
+    def _now() -> datetime:
+        """Current time in EST."""
+        import pytz
+        return datetime.now(pytz.timezone('US/Eastern'))
+    
+    def _sections(self, query: str, context: str = None, tool_output: str = None) -> List[PromptSection]:
+        """Sections with current time, recalled memories and caller context."""
+        # Get current time for context
+        now = self._now()
+        current_time = now.strftime('%I:%M %p EST')
+        current_date = now.strftime('%A, %B %d, %Y')
+        
+        return [
+            PromptSection("profile", self.profile, PRIORITY_PROFILE),
+            PromptSection("time", f"Date: {current_date}\nTime: {current_time}", PRIORITY_PROFILE,
+                          header="[CURRENT TIME]"),
+            PromptSection("memories", self._recall_memories(query), PRIORITY_MEMORIES,
+                          header="[RECALLED MEMORY]"),
+            PromptSection("recent_turns", context, PRIORITY_RECENT_TURNS,
+                          header="[ADDITIONAL CONTEXT]", keep="tail"),
+            PromptSection("tool_output", tool_output, PRIORITY_TOOL_OUTPUT, header="[TOOL OUTPUT]"),
+            PromptSection("user_message", query, PRIORITY_USER_MESSAGE, header="[USER MESSAGE]"),
+        ]
+    
+    def run_sync(self, query: str, context: str = None, model_key: str = None,
+                 tool_output: str = None, use_semantic_cache: bool = False) -> AgentResponse:
         """Synchronous version of run for non-async contexts."""
-        import asyncio
-        return asyncio.run(self.run(query, context))
+        return asyncio.run(self.run(query, context, model_key, tool_output, use_semantic_cache))
@@ -3,12 +3,13 @@ KAEDRA v0.0.6 - NYX Agent
 Temporal oracle and multiversal navigator from Timeline Φ.
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import time
 import json
 
 from .base import BaseAgent, AgentResponse
 from ..services.prompt import PromptService
+from ..services.prompt_assembler import PromptSection, PRIORITY_PROFILE
 from ..services.memory import MemoryService
 from ..core.tools import nyx_scan_timeline_signal, FREE_TOOLS
 
@@ -92,36 +93,50 @@ class NyxAgent(BaseAgent):
     def profile(self) -> str:
         return NYX_PROFILE
     
-    async def run(self, query: str, context: str = None) -> AgentResponse:
+    async def run(self, query: str, context: str = None, model_key: str = None,
+                  tool_output: str = None) -> AgentResponse:
         """
         Process a query with NYX's analytical personality.
         
         Args:
             query: User's input
             context: Additional context
+            model_key: Override model key (flash/pro/ultra)
+            tool_output: Tool results to interpret
             
         Returns:
             AgentResponse with NYX's response
         """
-        full_prompt = self._build_prompt(query, context)
-        full_prompt += "\n\nRespond as NYX from Timeline Φ. Scan the futures, read the signals, guide toward convergence. End with CONVERGE / RECALIBRATE / HOLD VECTOR."
+        assembled = self._prepare_prompt(query, context, model_key, tool_output)
         
         start_time = time.time()
-        result = self.prompt.generate(full_prompt)
+        result = await self.prompt.generate_async(assembled.text, model_key, agent=self.name)
         latency = (time.time() - start_time) * 1000
         
         return AgentResponse(
             content=result.text,
             agent_name=self.name,
             model=result.model,
-            latency_ms=latency
+            latency_ms=latency,
+            error=result.error,
+            usage=result.usage,
+            metadata={"prompt": assembled.to_dict()}
         )
     
+    def _sections(self, query: str, context: str = None, tool_output: str = None) -> List[PromptSection]:
+        sections = super()._sections(query, context, tool_output)
+        sections.append(PromptSection(
+            "framing",
+            "Respond as NYX from Timeline Φ. Scan the futures, read the signals, guide toward convergence. End with CONVERGE / RECALIBRATE / HOLD VECTOR.",
+            PRIORITY_PROFILE
+        ))
+        return sections
     
-    def run_sync(self, query: str, context: str = None) -> AgentResponse:
+    def run_sync(self, query: str, context: str = None, model_key: str = None,
+                 tool_output: str = None) -> AgentResponse:
         """Synchronous version of run."""
         import asyncio
-        return asyncio.run(self.run(query, context))
+        return asyncio.run(self.run(query, context, model_key, tool_output))
     
     def scan_signals(self) -> Dict[str, Any]:
         """
@@ -1,8 +1,11 @@
 import os
+import json
 import time
-from typing import Optional, Dict, Any, List
+import asyncio
+from typing import Optional, Dict, Any, List, Callable, Awaitable
 from fastapi import FastAPI, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -11,8 +14,14 @@ from kaedra.services.prompt import PromptService
 from kaedra.services.memory import MemoryService
 from kaedra.services.research import ResearchService
 from kaedra.services.web import WebService
+from kaedra.services.embedding import get_embedding_service
+from kaedra.services.usage import TokenUsage, estimate_tokens
+from kaedra.services.session import ConversationStore, llm_summarizer
 from kaedra.agents.kaedra import KaedraAgent
-from kaedra.core.config import PROJECT_ID, LOCATION, AGENT_RESOURCE_NAME
+from kaedra.core.config import (
+    PROJECT_ID, LOCATION, AGENT_RESOURCE_NAME, SESSION_LLM_SUMMARY, MODELS, AUTO_MODEL_KEY
+)
+from kaedra.core.exceptions import KaedraError, RateLimitError, AuthenticationError
 from kaedra.core.google_tools import GOOGLE_TOOLS
 from kaedra.core.tools import FreeToolsRegistry
 
@@ -77,7 +86,8 @@ A2A_CARD = {
                         "content": {"type": "string"}
                     }
                 }
-            }
+            },
+            "conversation_id": {"type": "string"}
         },
         "required": ["messages"]
     },
@@ -96,6 +106,7 @@ class AppState:
     agent: Optional[KaedraAgent] = None
     research_service: Optional[ResearchService] = None
     web_service: Optional[WebService] = None
+    sessions: Optional[ConversationStore] = None
 
 state = AppState()
 
@@ -114,6 +125,11 @@ async def startup_event():
         
         # Initialize Agent
         state.agent = KaedraAgent(prompt_service, memory_service)
+        
+        # Server-side conversations (requests with a conversation_id)
+        state.sessions = ConversationStore(
+            summarizer=llm_summarizer(prompt_service) if SESSION_LLM_SUMMARY else None
+        )
         print("[+] Kaedra Agent initialized successfully.")
     except Exception as e:
         print(f"[!] Failed to initialize Kaedra Agent: {e}")
@@ -144,6 +160,7 @@ class OpenAIChatCompletionRequest(BaseModel):
     messages: List[OpenAIMessage]
     temperature: Optional[float] = 0.7
     stream: Optional[bool] = False
+    conversation_id: Optional[str] = None  # Server keeps the history; send only new messages
 
 class OpenAIChoice(BaseModel):
     index: int
@@ -156,12 +173,14 @@ class OpenAIChatCompletionResponse(BaseModel):
     created: int
     model: str
     choices: List[OpenAIChoice]
-    usage: Dict[str, int]
+    usage: Dict[str, Any]
+    conversation_id: Optional[str] = None
 
 # Fleet Request Models
 class GenerateRequest(BaseModel):
     prompt: str
-    model: Optional[str] = "gemini-3-flash-preview"
+    model: Optional[str] = AUTO_MODEL_KEY  # Model key or name; "auto" routes flash -> pro
+    bypass_cache: bool = False
 
 class SearchRequest(BaseModel):
     query: str
@@ -181,6 +200,53 @@ class EmbeddingRequest(BaseModel):
     text: str
     model: str = "text-embedding-004"
 
+def raise_for_model_error(error: Optional[KaedraError]):
+    """Turn a failed generation into an HTTP error instead of a 200 with an error string."""
+    if error is None:
+        return
+    if isinstance(error, RateLimitError):
+        retry_after = error.details.get("retry_after_seconds")
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        raise HTTPException(status_code=429, detail=error.to_dict(), headers=headers)
+    status = 502 if not isinstance(error, AuthenticationError) else 503
+    raise HTTPException(status_code=status, detail=error.to_dict())
+
+async def sse_chat_stream(completion_id: str, model: str, first_chunk: str, stream,
+                          on_complete: Optional[Callable[[str], Awaitable[None]]] = None):
+    """
+    OpenAI-compatible chat.completion.chunk events for an agent stream.
+    
+    on_complete receives the full reply once the stream finished without error.
+    """
+    created = int(time.time())
+    parts = [first_chunk]
+    
+    def event(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+    
+    yield event({"role": "assistant", "content": ""})
+    if first_chunk:
+        yield event({"content": first_chunk})
+    try:
+        async for chunk in stream:
+            parts.append(chunk)
+            yield event({"content": chunk})
+    except KaedraError as e:
+        # Headers are already sent; report the failure in-band
+        yield f"data: {json.dumps({'error': e.to_dict()})}\n\n"
+    else:
+        if on_complete is not None:
+            await on_complete("".join(parts))
+        yield event({}, "stop")
+    yield "data: [DONE]\n\n"
+
 # -------------------------------------------------------------------------
 # ENDPOINTS
 # -------------------------------------------------------------------------
@@ -229,10 +295,10 @@ async def chat_endpoint(request: ChatRequest):
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
     try:
-        # Use run_sync logic but inside an async wrapper if needed, 
-        # but KaedraAgent.run is async, so we await it.
+        # KaedraAgent.run awaits the model without blocking the event loop
         # Note: KaedraAgent.run returns AgentResponse object
-        result = await state.agent.run(request.message, request.context)
+        result = await state.agent.run(request.message, request.context, use_semantic_cache=True)
+        raise_for_model_error(result.error)
         
         return ChatResponse(
             response=result.content,
@@ -241,6 +307,8 @@ async def chat_endpoint(request: ChatRequest):
             latency_ms=result.latency_ms,
             timestamp=time.time()
         )
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[!] Chat error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -254,16 +322,63 @@ async def openai_chat_endpoint(request: OpenAIChatCompletionRequest):
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
     try:
-        # Extract last message as the prompt
-        last_message = request.messages[-1].content
+        conversation = None
+        if request.conversation_id and state.sessions:
+            # Context comes from the stored summary + recent turns, not the payload
+            conversation, query = await asyncio.to_thread(
+                state.sessions.begin_turn,
+                request.conversation_id,
+                [(m.role, m.content) for m in request.messages]
+            )
+            if query is None:
+                raise HTTPException(status_code=400, detail="No new messages for this conversation")
+            last_message = query[1]
+            context_str = conversation.context()
+        else:
+            # Extract last message as the prompt
+            last_message = request.messages[-1].content
+            
+            # Build context from previous messages if any
+            context_str = ""
+            if len(request.messages) > 1:
+                context_str = "\n".join([f"{m.role}: {m.content}" for m in request.messages[:-1]])
         
-        # Build context from previous messages if any
-        context_str = ""
-        if len(request.messages) > 1:
-            context_str = "\n".join([f"{m.role}: {m.content}" for m in request.messages[:-1]])
+        async def remember(reply: str):
+            if conversation is not None:
+                await asyncio.to_thread(state.sessions.complete_turn, conversation, query, reply)
+
+        if request.stream:
+            stream = state.agent.run_stream(last_message, context_str, use_semantic_cache=True)
+            # Pull the first chunk here so failures before any output still get a proper status
+            try:
+                first_chunk = await stream.__anext__()
+            except StopAsyncIteration:
+                first_chunk = ""
+            except KaedraError as e:
+                raise_for_model_error(e)
+            headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            if conversation is not None:
+                headers["X-Conversation-Id"] = conversation.id
+            return StreamingResponse(
+                sse_chat_stream(
+                    f"chatcmpl-{int(time.time())}", state.agent.prompt.current_model, first_chunk, stream,
+                    on_complete=remember
+                ),
+                media_type="text/event-stream",
+                headers=headers
+            )
 
         # Run agent
-        result = await state.agent.run(last_message, context_str)
+        result = await state.agent.run(last_message, context_str, use_semantic_cache=True)
+        raise_for_model_error(result.error)
+        await remember(result.content)
+        
+        # Semantic cache hits made no model call; report estimated counts
+        usage = result.usage or TokenUsage(
+            prompt_tokens=estimate_tokens(last_message + context_str),
+            completion_tokens=estimate_tokens(result.content),
+            estimated=True
+        )
         
         return OpenAIChatCompletionResponse(
             id=f"chatcmpl-{int(time.time())}",
@@ -276,8 +391,11 @@ async def openai_chat_endpoint(request: OpenAIChatCompletionRequest):
                     finish_reason="stop"
                 )
             ],
-            usage={"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            usage=usage.to_openai(),
+            conversation_id=conversation.id if conversation else None
         )
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[!] OpenAI chat error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -297,18 +415,30 @@ async def fleet_generate(request: GenerateRequest):
     if not state.agent:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
-    result = await state.agent.prompt_service.generate_async(
+    # Accept a model key or a full model name; anything else is routed
+    model_keys = {name: key for key, name in reversed(list(MODELS.items()))}
+    model_key = request.model if request.model in MODELS else model_keys.get(request.model, AUTO_MODEL_KEY)
+    
+    result = await state.agent.prompt.generate_async(
         prompt=request.prompt,
-        model_key="flash" # Default to Flash for speed
+        model_key=model_key,
+        bypass_cache=request.bypass_cache
     )
-    return {"text": result.text, "model": result.model}
+    raise_for_model_error(result.error)
+    return {
+        "text": result.text,
+        "model": result.model,
+        "cached": (result.metadata or {}).get("cache") == "hit",
+        "usage": result.usage.to_dict() if result.usage else None,
+        "route": (result.metadata or {}).get("route")
+    }
 
 @app.post("/search")
 async def fleet_search(request: SearchRequest):
     """
     Fleet Search Endpoint: Grounded Google Search.
     """
-    return GOOGLE_TOOLS["google_search"](request.query, request.num_results)
+    return await asyncio.to_thread(GOOGLE_TOOLS["google_search"], request.query, request.num_results)
 
 @app.post("/analyze-url")
 async def fleet_analyze_url(request: AnalyzeUrlRequest):
@@ -318,7 +448,7 @@ async def fleet_analyze_url(request: AnalyzeUrlRequest):
     if not state.web_service:
         state.web_service = WebService()
     
-    metadata = state.web_service.extract_metadata(request.url)
+    metadata = await asyncio.to_thread(state.web_service.extract_metadata, request.url)
     return metadata
 
 @app.post("/execute-code")
@@ -331,7 +461,8 @@ async def fleet_execute_code(request: ExecuteCodeRequest):
 
     # TODO: Connect to Vertex AI Code Execution Tool if available
     prompt = f"Executing {request.language} code:\n```\n{request.code}\n```\n\nSimulate the output of this code:"
-    result = await state.agent.prompt_service.generate_async(prompt)
+    result = await state.agent.prompt.generate_async(prompt)
+    raise_for_model_error(result.error)
     return {"output": result.text, "status": "simulated"}
 
 @app.post("/research")
@@ -366,7 +497,7 @@ async def create_embeddings(request: EmbeddingRequest):
     if not state.agent:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
-    vector = state.agent.prompt_service.embed(request.text, request.model)
+    vector = await state.agent.prompt.embed_async(request.text, request.model)
     return {
         "object": "list",
         "data": [{"object": "embedding", "embedding": vector, "index": 0}],
@@ -378,11 +509,22 @@ async def health_detailed():
     """
     Detailed System Health Check.
     """
-    sys_info = FreeToolsRegistry.get_system_info()
+    sys_info = await asyncio.to_thread(FreeToolsRegistry.get_system_info)
     return {
         "status": "ok",
         "service": SERVICE_NAME,
         "system": sys_info,
+        "embeddings": get_embedding_service().stats(),
+        "response_cache": state.agent.prompt.response_cache.stats()
+        if state.agent and state.agent.prompt.response_cache else None,
+        "semantic_cache": state.agent.semantic_cache.stats()
+        if state.agent and state.agent.semantic_cache else None,
+        "prompt_retries": state.agent.prompt.retrier.stats() if state.agent else None,
+        "admission": state.agent.prompt.admission.utilization() if state.agent else None,
+        "coalescing": state.agent.prompt.inflight.stats() if state.agent else None,
+        "usage": state.agent.prompt.usage.summary() if state.agent else None,
+        "routing": state.agent.prompt.router.stats() if state.agent else None,
+        "sessions": state.sessions.stats() if state.sessions else None,
         "timestamp": time.time()
     }
 
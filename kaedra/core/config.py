@@ -25,6 +25,18 @@ AGENT_RESOURCE_NAME = os.getenv(
 BIGQUERY_DATASET = os.getenv("KAEDRA_BQ_DATASET", "kaedra_memory")
 BIGQUERY_TABLE = os.getenv("KAEDRA_BQ_TABLE", "embeddings")
 EMBEDDING_MODEL = "gemini-embedding-001"
+EMBEDDING_BATCH_SIZE = int(os.getenv("KAEDRA_EMBEDDING_BATCH_SIZE", "250"))  # Texts per embed_content call (text-embedding-00x max)
+EMBEDDING_MODEL_BATCH_LIMITS = {
+    "gemini-embedding-001": 1,  # Vertex AI accepts a single input per request for this model
+}
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("KAEDRA_EMBEDDING_CONCURRENCY", "8"))  # Parallel embed_content calls (retries run there too)
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("KAEDRA_EMBEDDING_BATCH_WINDOW_MS", "5"))  # Coalescing window
+EMBEDDING_RESULT_TIMEOUT_S = float(os.getenv("KAEDRA_EMBEDDING_TIMEOUT_S", "120"))  # Longest a caller waits for a vector
+BIGQUERY_INSERT_BATCH_ROWS = 100  # ~3072 floats/row keeps each streaming insert well under 10MB
+BIGQUERY_VECTOR_INDEX = os.getenv("KAEDRA_BQ_VECTOR_INDEX", "auto")  # auto | on | off (use VECTOR_SEARCH)
+BIGQUERY_VECTOR_INDEX_MIN_ROWS = 5000  # Below this, brute force is cheaper than maintaining an index
+BIGQUERY_VECTOR_INDEX_CHECK_S = 600  # Refresh the index status (in the background) this often
+BIGQUERY_VECTOR_INDEX_RECHECK_S = 6 * 3600  # Recount a too-small table this often (also rows written by other processes)
 ENABLE_SEMANTIC_SEARCH = os.getenv("KAEDRA_SEMANTIC_SEARCH", "true").lower() == "true"
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -43,8 +55,39 @@ MODEL_COSTS = {
     "ultra": 0.038,  # Estimated
 }
 
+# Token pricing per model name, USD per 1M tokens (usage accounting)
+MODEL_PRICING = {
+    MODELS["flash"]: {"input": 0.50, "cached_input": 0.05, "output": 3.00},
+    MODELS["pro"]: {"input": 2.00, "cached_input": 0.20, "output": 12.00},
+}
+DEFAULT_MODEL_PRICING = MODEL_PRICING[MODELS["pro"]]  # Unknown models priced conservatively
+
+# Prompt size budgets per model name (input tokens); lowest-priority sections are cut first
+PROMPT_TOKEN_BUDGETS = {
+    MODELS["flash"]: 8_000,
+    MODELS["pro"]: 16_000,
+}
+DEFAULT_PROMPT_TOKEN_BUDGET = int(os.getenv("KAEDRA_PROMPT_TOKEN_BUDGET", "8000"))
+
 DEFAULT_MODEL = "flash"
 
+# Admission control per model name (keys sharing a model share its quota).
+# rpm/tpm of None means unlimited.
+MODEL_LIMITS = {
+    MODELS["flash"]: {"max_in_flight": 32, "rpm": 1000, "tpm": 4_000_000},
+    MODELS["pro"]: {"max_in_flight": 8, "rpm": 120, "tpm": 1_000_000},
+}
+DEFAULT_MODEL_LIMITS = {"max_in_flight": 8, "rpm": 60, "tpm": 500_000}
+ENABLE_ADMISSION_CONTROL = os.getenv("KAEDRA_ADMISSION_CONTROL", "true").lower() == "true"
+ADMISSION_QUEUE_TIMEOUT_S = float(os.getenv("KAEDRA_ADMISSION_TIMEOUT", "30"))  # Max queueing per call
+
+# Retries for LLM calls (429 / 5xx / timeouts only)
+PROMPT_MAX_ATTEMPTS = int(os.getenv("KAEDRA_PROMPT_MAX_ATTEMPTS", "4"))
+PROMPT_RETRY_BASE_DELAY_S = float(os.getenv("KAEDRA_PROMPT_RETRY_BASE_DELAY", "0.5"))
+PROMPT_RETRY_MAX_DELAY_S = float(os.getenv("KAEDRA_PROMPT_RETRY_MAX_DELAY", "20"))
+PROMPT_RETRY_DEADLINE_S = float(os.getenv("KAEDRA_PROMPT_RETRY_DEADLINE", "60"))  # Across all attempts
+PROMPT_RETRY_BUDGET_RATIO = float(os.getenv("KAEDRA_PROMPT_RETRY_BUDGET", "0.1"))  # Retries per success
+
 # ══════════════════════════════════════════════════════════════════════════════
 # VEO VIDEO MODEL REGISTRY
 # ══════════════════════════════════════════════════════════════════════════════
@@ -77,15 +120,94 @@ MEMORY_DIR = KAEDRA_HOME / "memory"
 PROFILES_DIR = KAEDRA_HOME / "profiles"
 CONFIG_DIR = KAEDRA_HOME / "config"
 VIDEO_DIR = KAEDRA_HOME / "videos"
+CACHE_DIR = KAEDRA_HOME / "cache"
 
 # Create directories on import
 try:
-    for dir_path in [KAEDRA_HOME, CHAT_LOGS_DIR, MEMORY_DIR, PROFILES_DIR, CONFIG_DIR, VIDEO_DIR]:
+    for dir_path in [KAEDRA_HOME, CHAT_LOGS_DIR, MEMORY_DIR, PROFILES_DIR, CONFIG_DIR, VIDEO_DIR, CACHE_DIR]:
         dir_path.mkdir(parents=True, exist_ok=True)
 except Exception as e:
     # If we fail to create dirs (e.g. read-only fs), just warn
     print(f"[WARN] Failed to create directories: {e}")
 
+# ══════════════════════════════════════════════════════════════════════════════
+# MEMORY STORE
+# ══════════════════════════════════════════════════════════════════════════════
+
+MEMORY_BACKEND = os.getenv("KAEDRA_MEMORY_BACKEND", "json")  # json | sqlite
+MEMORY_SQLITE_PATH = Path(os.getenv("KAEDRA_MEMORY_DB", str(MEMORY_DIR / "memory.db")))
+VECTOR_BACKEND = os.getenv("KAEDRA_VECTOR_BACKEND", "bigquery")  # bigquery | local (NumPy, offline)
+IMPORTANCE_LEVELS = {'low': 1, 'normal': 2, 'high': 3, 'critical': 4}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# COUNCIL
+# ══════════════════════════════════════════════════════════════════════════════
+
+COUNCIL_AGENT_TIMEOUT_S = float(os.getenv("KAEDRA_COUNCIL_AGENT_TIMEOUT", "60"))  # Per-agent call budget
+DEBATE_STATE_MAX_TOKENS = int(os.getenv("KAEDRA_DEBATE_STATE_TOKENS", "400"))  # Compressed state per side
+
+# ══════════════════════════════════════════════════════════════════════════════
+# STRATEGIES
+# ══════════════════════════════════════════════════════════════════════════════
+
+TOT_MAX_CONCURRENCY = int(os.getenv("KAEDRA_TOT_CONCURRENCY", "4"))  # In-flight calls per Tree of Thought run
+TOT_BEAM_WIDTH = int(os.getenv("KAEDRA_TOT_BEAM", "2"))              # Branches kept per level
+TOT_EVALUATOR_MODEL = os.getenv("KAEDRA_TOT_EVALUATOR", "flash")     # Cheap model that scores branches
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MODEL ROUTING
+# ══════════════════════════════════════════════════════════════════════════════
+
+AUTO_MODEL_KEY = "auto"  # model_key that asks PromptService to route the request
+ROUTER_ENABLED = os.getenv("KAEDRA_AUTO_ROUTE", "false").lower() == "true"  # Route calls with no model_key
+ROUTER_FAST_MODEL = os.getenv("KAEDRA_ROUTER_FAST", "flash")        # Tried first
+ROUTER_STRONG_MODEL = os.getenv("KAEDRA_ROUTER_STRONG", "pro")      # Escalation target
+ROUTER_LONG_PROMPT_TOKENS = int(os.getenv("KAEDRA_ROUTER_LONG_PROMPT", "6000"))
+ROUTER_STRONG_SCORE = int(os.getenv("KAEDRA_ROUTER_STRONG_SCORE", "3"))  # Difficulty score that starts on strong
+ROUTER_SELF_CHECK = os.getenv("KAEDRA_ROUTER_SELF_CHECK", "true").lower() == "true"
+ROUTER_MIN_CONFIDENCE = float(os.getenv("KAEDRA_ROUTER_MIN_CONFIDENCE", "6"))  # Self-rated 0-10
+ROUTER_MIN_ANSWER_CHARS = int(os.getenv("KAEDRA_ROUTER_MIN_ANSWER", "80"))  # For hard prompts
+ROUTER_STRONG_STRATEGIES = {"RESEARCH"}  # Agents/strategies whose calls start on strong
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CACHES
+# ══════════════════════════════════════════════════════════════════════════════
+
+ENABLE_EMBEDDING_CACHE = os.getenv("KAEDRA_EMBEDDING_CACHE", "true").lower() == "true"
+EMBEDDING_CACHE_FILE = Path(os.getenv("KAEDRA_EMBEDDING_CACHE_DB", str(CACHE_DIR / "embeddings.db")))
+EMBEDDING_CACHE_SIZE = int(os.getenv("KAEDRA_EMBEDDING_CACHE_SIZE", "2048"))  # In-memory LRU entries
+EMBEDDING_CACHE_DISK_ENTRIES = int(os.getenv("KAEDRA_EMBEDDING_CACHE_DISK_ENTRIES", "50000"))  # SQLite rows kept (~600MB at 3072-d)
+
+# Exact-match LLM response cache (opt-in: same prompt -> same answer until TTL)
+ENABLE_RESPONSE_CACHE = os.getenv("KAEDRA_RESPONSE_CACHE", "false").lower() == "true"
+RESPONSE_CACHE_FILE = Path(os.getenv("KAEDRA_RESPONSE_CACHE_DB", str(CACHE_DIR / "responses.db")))
+RESPONSE_CACHE_SIZE = int(os.getenv("KAEDRA_RESPONSE_CACHE_SIZE", "512"))  # In-memory LRU entries
+RESPONSE_CACHE_DISK_ENTRIES = int(os.getenv("KAEDRA_RESPONSE_CACHE_DISK_ENTRIES", "20000"))  # SQLite rows kept
+RESPONSE_CACHE_TTL_S = float(os.getenv("KAEDRA_RESPONSE_CACHE_TTL", "3600"))  # Default TTL (seconds)
+
+RESPONSE_CACHE_TTL_BY_MODEL = {
+    "flash": RESPONSE_CACHE_TTL_S,
+    "pro": RESPONSE_CACHE_TTL_S * 6,    # Slower, pricier: keep longer
+    "ultra": RESPONSE_CACHE_TTL_S * 6,
+}
+
+# Semantic cache in front of KaedraAgent.run (opt-in, requires numpy)
+ENABLE_SEMANTIC_CACHE = os.getenv("KAEDRA_SEMANTIC_CACHE", "false").lower() == "true"
+SEMANTIC_CACHE_DIR = Path(os.getenv("KAEDRA_SEMANTIC_CACHE_DIR", str(CACHE_DIR / "semantic")))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("KAEDRA_SEMANTIC_CACHE_THRESHOLD", "0.92"))  # Cosine similarity
+SEMANTIC_CACHE_MAX_AGE_S = float(os.getenv("KAEDRA_SEMANTIC_CACHE_MAX_AGE", "900"))  # Freshness window
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("KAEDRA_SEMANTIC_CACHE_SIZE", "5000"))
+
+# Server-side conversations for /v1/chat/completions (requests with a conversation_id)
+SESSION_PERSIST = os.getenv("KAEDRA_SESSION_PERSIST", "true").lower() == "true"
+SESSION_DB_FILE = Path(os.getenv("KAEDRA_SESSION_DB", str(CACHE_DIR / "sessions.db")))
+SESSION_MAX_ACTIVE = int(os.getenv("KAEDRA_SESSION_MAX_ACTIVE", "1000"))  # In-memory LRU entries
+SESSION_MAX_STORED = int(os.getenv("KAEDRA_SESSION_MAX_STORED", "20000"))  # SQLite rows kept (oldest dropped)
+SESSION_TTL_S = float(os.getenv("KAEDRA_SESSION_TTL", "86400"))  # Idle time before a conversation expires
+SESSION_RECENT_TURNS = int(os.getenv("KAEDRA_SESSION_RECENT_TURNS", "8"))  # Messages kept verbatim
+SESSION_SUMMARY_MAX_CHARS = int(os.getenv("KAEDRA_SESSION_SUMMARY_CHARS", "4000"))
+SESSION_LLM_SUMMARY = os.getenv("KAEDRA_SESSION_LLM_SUMMARY", "false").lower() == "true"
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # ANSI COLORS
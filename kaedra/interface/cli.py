@@ -5,6 +5,7 @@ Main CLI entry point with command parsing and dispatch.
 
 import sys
 import random
+import asyncio
 import platform
 import warnings
 import subprocess
@@ -30,12 +31,16 @@ from ..core.config import (
 )
 from ..services.memory import MemoryService
 from ..services.logging import LoggingService
-from ..services.prompt import PromptService
+from ..services.prompt import PromptService, streamed_model
+from ..services.usage import UsageTracker
 from ..services.web import WebService
 from ..services import VIDEO_AVAILABLE, VideoService
 from ..agents.kaedra import KaedraAgent
 from ..agents.blade import BladeAgent
 from ..agents.nyx import NyxAgent
+from ..agents.council import Council
+from ..agents.base import BaseAgent, AgentResponse
+from ..core.exceptions import AgentError, KaedraError
 from ..strategies.tree_of_thought import TreeOfThoughtsStrategy
 from ..strategies.battle_of_bots import BattleOfBotsStrategy
 from ..strategies.presets import PromptOptimizer
@@ -90,6 +95,7 @@ def print_help():
 ║    /flash      → Gemini 2.5 Flash (~$0.008) ⚡ FAST                            ║
 ║    /pro        → Gemini 2.5 Pro (~$0.031) 🎯 BALANCED                         ║
 ║    /ultra      → Gemini 3 Pro Preview (~$0.038) 🔥 POWERFUL                   ║
+║    /auto       → Route per query: Flash first, Pro when needed 🔀             ║
 ║    /models     → Show available models                                        ║
 ║                                                                               ║
 ║  AGENT COMMUNICATION                                                          ║
@@ -162,42 +168,90 @@ def thinking_message(model: str) -> str:
     return random.choice(THINKING_MESSAGES).format(model=model)
 
 
-def run_council(query: str, kaedra: KaedraAgent, blade: BladeAgent, nyx: NyxAgent) -> str:
-    """Run a multi-agent council discussion."""
+def run_council(query: str, kaedra: KaedraAgent, blade: BladeAgent, nyx: NyxAgent) -> Optional[str]:
+    """
+    Run a multi-agent council discussion (BLADE and NYX in parallel).
+    
+    Returns the synthesis (or the marked advisor fallback), or None if
+    the council failed outright.
+    """
     print(f"\n{Colors.GOLD}[COUNCIL INITIATED]{Colors.RESET}")
     print(f"{Colors.DIM}Convening: KAEDRA, BLADE, NYX{Colors.RESET}\n")
+    print(f"{Colors.blade_tag()} Analyzing for action... {Colors.nyx_tag()} Analyzing for risk...")
+    
+    council = Council(kaedra.prompt, kaedra.memory, kaedra=kaedra, blade=blade, nyx=nyx)
+    try:
+        result = asyncio.run(council.convene(query))
+    except AgentError as e:
+        print(f"{Colors.system_tag()} Council failed: {e.message}\n")
+        return None
     
-    # BLADE first
-    print(f"{Colors.blade_tag()} Analyzing for action...")
-    blade_response = blade.run_sync(query)
-    print(f"{Colors.blade_tag()} {blade_response.content}\n")
+    latency = result.agent_latency_ms
+    for tag, name, content in (
+        (Colors.blade_tag(), "BLADE", result.blade_response),
+        (Colors.nyx_tag(), "NYX", result.nyx_response),
+        (Colors.kaedra_tag(), "KAEDRA", result.kaedra_synthesis),
+    ):
+        if name == "KAEDRA" and not result.synthesized:
+            print(f"{tag} {Colors.NEON_RED}{content}{Colors.RESET}\n")
+        elif name in result.errors:
+            print(f"{tag} {Colors.DIM}[unavailable: {result.errors[name]}]{Colors.RESET}\n")
+        else:
+            print(f"{tag} {content} {Colors.DIM}({latency.get(name, 0):.0f}ms){Colors.RESET}\n")
     
-    # NYX second
-    print(f"{Colors.nyx_tag()} Analyzing for risk...")
-    nyx_context = f"BLADE's Analysis: {blade_response.content}"
-    nyx_response = nyx.run_sync(query, context=nyx_context)
-    print(f"{Colors.nyx_tag()} {nyx_response.content}\n")
+    print(f"{Colors.GOLD}[COUNCIL CONCLUDED]{Colors.RESET} {Colors.DIM}{result.total_latency_ms:.0f}ms{Colors.RESET}\n")
     
-    # KAEDRA synthesizes
-    print(f"{Colors.kaedra_tag()} Synthesizing...")
-    synthesis_context = f"""BLADE's Position: {blade_response.content}
-
-NYX's Position: {nyx_response.content}
+    return result.kaedra_synthesis
 
-You're the ORCHESTRATOR. You've heard from your advisors. Make the call.
-Think through:
-1. Where do they agree?
-2. Where do they disagree, and why?
-3. What's the balanced path?
-4. What's your final call?
 
-Respond in 3-5 sentences. Acknowledge both perspectives, state your decision, give the final directive."""
+def stream_reply(agent: BaseAgent, query: str, tag: str, logger: LoggingService,
+                 tool_output: str = None, **run_kwargs) -> AgentResponse:
+    """
+    Print an agent's reply as it streams, teeing chunks into the session log.
     
-    kaedra_response = kaedra.run_sync(query, context=synthesis_context)
-    print(f"{Colors.kaedra_tag()} {kaedra_response.content}\n")
-    print(f"{Colors.GOLD}[COUNCIL CONCLUDED]{Colors.RESET}\n")
+    The reply is labelled with the model that served it (the routed one
+    under /auto), so its log header is written once the first chunk arrives.
+    Extra keyword arguments go to agent.run_stream (e.g. use_semantic_cache).
+    """
+    print(f"{tag} ", end="", flush=True)
+    chunks = []
+    error = None
+    model = agent.prompt.current_model
+    start_time = datetime.now()
+    
+    async def consume():
+        nonlocal model
+        try:
+            async for chunk in agent.run_stream(query, tool_output=tool_output, **run_kwargs):
+                if not chunks:
+                    model = streamed_model() or model
+                    logger.begin_message(agent.name, model)
+                chunks.append(chunk)
+                print(chunk, end="", flush=True)
+                logger.append_chunk(chunk)
+        finally:
+            model = streamed_model() or model
+    
+    try:
+        asyncio.run(consume())
+    except KaedraError as e:
+        error = e
+        print(f"{Colors.NEON_RED}[{e.code}] {e.message}{Colors.RESET}", end="")
+    except KeyboardInterrupt:
+        error = KaedraError("Response interrupted", code="INTERRUPTED")
+        print(f" {Colors.DIM}[interrupted]{Colors.RESET}", end="")
+    print("\n")
+    if not chunks:
+        logger.begin_message(agent.name, model)
+    logger.end_message(error.message if error else None)
     
-    return kaedra_response.content
+    return AgentResponse(
+        content="".join(chunks),
+        agent_name=agent.name,
+        model=model,
+        latency_ms=(datetime.now() - start_time).total_seconds() * 1000,
+        error=error
+    )
 
 
 def format_sysinfo() -> str:
@@ -242,7 +296,7 @@ def main():
     # Initialize services
     memory = MemoryService()
     logger = LoggingService()
-    prompt = PromptService(model_key=DEFAULT_MODEL)
+    prompt = PromptService(model_key=DEFAULT_MODEL, usage_tracker=UsageTracker(logger))
     web = WebService()
     
     # Initialize video service (optional)
@@ -311,6 +365,7 @@ def main():
                 if cmd == "/flash":
                     current_model = "flash"
                     prompt.set_model(current_model)
+                    prompt.auto_route = False
                     print(f"{Colors.system_tag()} ⚡ Model: {MODELS[current_model]}")
                     print(f"         Cost: ~${MODEL_COSTS[current_model]}/query | Speed: FAST")
                     continue
@@ -318,6 +373,7 @@ def main():
                 if cmd == "/pro":
                     current_model = "pro"
                     prompt.set_model(current_model)
+                    prompt.auto_route = False
                     print(f"{Colors.system_tag()} 🎯 Model: {MODELS[current_model]}")
                     print(f"         Cost: ~${MODEL_COSTS[current_model]}/query | Balance: OPTIMAL")
                     continue
@@ -325,17 +381,35 @@ def main():
                 if cmd == "/ultra":
                     current_model = "ultra"
                     prompt.set_model(current_model)
+                    prompt.auto_route = False
                     print(f"{Colors.system_tag()} 🔥 Model: {MODELS[current_model]}")
                     print(f"         Cost: ~${MODEL_COSTS[current_model]}/query | Power: MAXIMUM")
                     continue
                 
+                if cmd == "/auto":
+                    prompt.auto_route = True
+                    print(f"{Colors.system_tag()} 🔀 Model: AUTO ({prompt.router.fast_model} first, "
+                          f"{prompt.router.strong_model} when needed)")
+                    print(f"         Cost: ~${MODEL_COSTS[prompt.router.fast_model]}-"
+                          f"{MODEL_COSTS[prompt.router.strong_model]}/query | Speed: ADAPTIVE")
+                    continue
+                
                 if cmd in ["/models", "/status"]:
                     print(f"\n{Colors.GOLD}[SYSTEM STATUS]{Colors.RESET}")
                     print(f"  Version: v{__version__}")
                     print(f"  Location: {LOCATION}")
-                    print(f"  Active Model: {MODELS[current_model]} ({current_model})")
+                    if prompt.auto_route:
+                        routing = prompt.router.stats()
+                        print(f"  Active Model: AUTO ({routing['requests']} routed, "
+                              f"{routing['escalations']} escalated, ~${routing['cost_usd']:.4f} "
+                              f"vs ${routing['strong_only_cost_usd']:.4f} all-{prompt.router.strong_model})")
+                    else:
+                        print(f"  Active Model: {MODELS[current_model]} ({current_model})")
                     print(f"  Active Agent: {active_agent.upper()}")
                     print(f"  Logging: {'ON' if logger.is_session_active else 'OFF'}")
+                    session = prompt.usage.summary()["session"]
+                    print(f"  Session Usage: {session['calls']} calls, {session['prompt_tokens']} in / "
+                          f"{session['completion_tokens']} out tokens (~${session['cost_usd']:.4f})")
                     print(f"\n  Available Models:")
                     for k, v in MODELS.items():
                         marker = " ← ACTIVE" if k == current_model else ""
@@ -437,7 +511,7 @@ def main():
                         print(f"\n{Colors.kaedra_tag()} Analyzing the page...")
                         response = kaedra.run_sync(
                             f"I fetched this webpage: {url}. Summarize the key points.",
-                            context=web_context
+                            tool_output=web_context
                         )
                         print(f"{Colors.kaedra_tag()} {response.content}\n")
                         logger.log_message("WEB FETCH", page.content[:1000], MODELS[current_model])
@@ -602,7 +676,8 @@ def main():
                         print(f"{Colors.system_tag()} Usage: /council <task>")
                         continue
                     result = run_council(query, kaedra, blade, nyx)
-                    logger.log_message("COUNCIL", result, MODELS[current_model])
+                    if result is not None:
+                        logger.log_message("COUNCIL", result, MODELS[current_model])
                     continue
                 
                 # ══════════════════════════════════════════════════════════
@@ -613,7 +688,7 @@ def main():
                     task = user_input[5:].strip()
                     if task:
                         result = tot.execute(task, current_model)
-                        logger.log_message("TOT", result, MODELS[current_model])
+                        logger.log_message("TOT", result.full_analysis, MODELS[current_model])
                     else:
                         print(f"{Colors.system_tag()} Usage: /tot <task>")
                     continue
@@ -622,7 +697,7 @@ def main():
                     task = user_input[8:].strip()
                     if task:
                         result = battle.execute(task, current_model)
-                        logger.log_message("BATTLE", result, MODELS[current_model])
+                        logger.log_message("BATTLE", result.full_battle, MODELS[current_model])
                     else:
                         print(f"{Colors.system_tag()} Usage: /battle <task>")
                     continue
@@ -657,7 +732,8 @@ def main():
                 
                 if any(trigger in cmd for trigger in council_triggers):
                     result = run_council(user_input, kaedra, blade, nyx)
-                    logger.log_message("COUNCIL", result, MODELS[current_model])
+                    if result is not None:
+                        logger.log_message("COUNCIL", result, MODELS[current_model])
                     continue
                 
                 # ══════════════════════════════════════════════════════════
@@ -672,6 +748,7 @@ def main():
                 
                 tool_executed = False
                 tool_result = None
+                tool_context = None
                 
                 # BLADE tool triggers
                 if active_agent == "blade":
@@ -725,14 +802,10 @@ def main():
                         formatted = json.dumps(tool_result, indent=2)
                         print(f"{Colors.DIM}{formatted}{Colors.RESET}\n")
                         
-                        # Add tool result to context for agent interpretation
+                        # Pass tool result to the agent for interpretation
                         tool_context = f"Tool execution result:\n{formatted}\n\nInterpret this data from your perspective."
-                        user_input_with_context = f"{user_input}\n\n{tool_context}"
                     else:
                         print(f"{Colors.NEON_RED}[ERROR]{Colors.RESET} {tool_result.get('message', 'Unknown error')}\n")
-                        user_input_with_context = user_input
-                else:
-                    user_input_with_context = user_input
                 
                 # Route to active agent (with tool context if available)
                 # Vibe Detection (Simple)
@@ -747,23 +820,18 @@ def main():
                 final_input = user_input
                 if vibe_context:
                     final_input = f"{vibe_context}\n{final_input}"
-                if tool_executed:
-                    final_input = f"{final_input}\n\n{tool_context}"
 
+                # Stream the reply (also written to the session log as it arrives)
                 if active_agent == "blade":
-                    response = blade.run_sync(final_input)
-                    print(f"{Colors.blade_tag()} {response.content}\n")
+                    response = stream_reply(blade, final_input, Colors.blade_tag(), logger, tool_context)
                 elif active_agent == "nyx":
-                    response = nyx.run_sync(final_input)
-                    print(f"{Colors.nyx_tag()} {response.content}\n")
+                    response = stream_reply(nyx, final_input, Colors.nyx_tag(), logger, tool_context)
                 else:
-                    response = kaedra.run_sync(final_input)
-                    print(f"{Colors.kaedra_tag()} {response.content}\n")
-                
-                logger.log_message(active_agent.upper(), response.content, response.model)
+                    response = stream_reply(kaedra, final_input, Colors.kaedra_tag(), logger, tool_context,
+                                            use_semantic_cache=True)
 
-                # Auto-Memory: Persist turn (Brain Enhancement)
-                if not user_input.startswith("/"):
+                # Auto-Memory: Persist turn (Brain Enhancement), never failed generations
+                if not user_input.startswith("/") and response.ok:
                     try:
                         timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                         snippet_user = user_input[:500]
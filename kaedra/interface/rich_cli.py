@@ -5,6 +5,7 @@ Modern terminal UI with Rich library for streaming responses.
 
 import sys
 import random
+import asyncio
 import platform
 import warnings
 from datetime import datetime
@@ -38,12 +39,16 @@ from ..core.config import (
 )
 from ..services.memory import MemoryService
 from ..services.logging import LoggingService
-from ..services.prompt import PromptService
+from ..services.prompt import PromptService, streamed_model
+from ..services.usage import UsageTracker
 from ..services.web import WebService
 from ..services import VIDEO_AVAILABLE, VideoService
 from ..agents.kaedra import KaedraAgent
 from ..agents.blade import BladeAgent
 from ..agents.nyx import NyxAgent
+from ..agents.council import Council
+from ..agents.base import AgentResponse
+from ..core.exceptions import AgentError, KaedraError
 from ..strategies.tree_of_thought import TreeOfThoughtsStrategy
 from ..strategies.battle_of_bots import BattleOfBotsStrategy
 from ..strategies.presets import PromptOptimizer
@@ -90,6 +95,7 @@ def print_help():
     table.add_row("Models", "/flash", "Gemini 2.5 Flash ⚡ (~$0.008)")
     table.add_row("", "/pro", "Gemini 2.5 Pro 🎯 (~$0.031)")
     table.add_row("", "/ultra", "Gemini 3 Pro 🔥 (~$0.038)")
+    table.add_row("", "/auto", "Route per query: Flash first, Pro when needed 🔀")
     table.add_row("", "", "")
     
     # Agents
@@ -150,7 +156,8 @@ def agent_panel(agent: str, content: str) -> Panel:
         )
 
 
-def status_table(current_model: str, active_agent: str, is_logging: bool) -> Table:
+def status_table(current_model: str, active_agent: str, is_logging: bool, usage: dict = None,
+                 routing: dict = None) -> Table:
     """Create a status display table."""
     table = Table(title="System Status", box=None)
     table.add_column("Property", style="cyan")
@@ -158,10 +165,24 @@ def status_table(current_model: str, active_agent: str, is_logging: bool) -> Tab
     
     table.add_row("Version", f"v{__version__}")
     table.add_row("Location", LOCATION)
-    table.add_row("Active Model", f"{MODELS[current_model]} ({current_model})")
+    if routing is not None:
+        table.add_row(
+            "Active Model",
+            f"AUTO · {routing['requests']} routed · {routing['escalations']} escalated · "
+            f"~${routing['cost_usd']:.4f} (vs ${routing['strong_only_cost_usd']:.4f} without routing)"
+        )
+    else:
+        table.add_row("Active Model", f"{MODELS[current_model]} ({current_model})")
     table.add_row("Active Agent", active_agent.upper())
     table.add_row("Logging", "ON ✓" if is_logging else "OFF")
     table.add_row("Semantic Search", "Enabled 🧠")
+    if usage:
+        session = usage["session"]
+        table.add_row(
+            "Session Usage",
+            f"{session['calls']} calls · {session['prompt_tokens']} in / {session['completion_tokens']} out · "
+            f"~${session['cost_usd']:.4f}"
+        )
     
     return table
 
@@ -212,6 +233,60 @@ def run_with_spinner(agent, query: str, agent_name: str, model: str) -> str:
     return response
 
 
+def stream_with_live(agent, query: str, agent_name: str, model: str, logger: LoggingService,
+                     **run_kwargs) -> AgentResponse:
+    """
+    Render an agent's reply in a live panel as it streams, teeing chunks into the session log.
+    
+    model is the selected model; the reply is labelled with the one that
+    served it (the routed one under /auto), so its log header is written
+    once the first chunk arrives.
+    Extra keyword arguments go to agent.run_stream (e.g. use_semantic_cache).
+    """
+    chunks = []
+    error = None
+    start_time = datetime.now()
+    
+    # Live re-renders at a fixed rate, so Markdown is not re-parsed per chunk
+    with Live(agent_panel(agent_name, f"*{thinking_message(model)}*"),
+              console=console, refresh_per_second=12) as live:
+        
+        async def consume():
+            nonlocal model
+            try:
+                async for chunk in agent.run_stream(query, **run_kwargs):
+                    if not chunks:
+                        model = streamed_model() or model
+                        logger.begin_message(agent.name, model)
+                    chunks.append(chunk)
+                    logger.append_chunk(chunk)
+                    live.update(agent_panel(agent_name, "".join(chunks)))
+            finally:
+                model = streamed_model() or model
+        
+        try:
+            asyncio.run(consume())
+        except KaedraError as e:
+            error = e
+        except KeyboardInterrupt:
+            error = KaedraError("Response interrupted", code="INTERRUPTED")
+        
+        if error:
+            live.update(agent_panel(agent_name, "".join(chunks) + f"\n\n*[{error.code}] {error.message}*"))
+    
+    if not chunks:
+        logger.begin_message(agent.name, model)
+    logger.end_message(error.message if error else None)
+    
+    return AgentResponse(
+        content="".join(chunks),
+        agent_name=agent.name,
+        model=model,
+        latency_ms=(datetime.now() - start_time).total_seconds() * 1000,
+        error=error
+    )
+
+
 def main():
     """Main Rich CLI entry point."""
     # Force UTF-8 for Windows
@@ -227,7 +302,7 @@ def main():
     # Initialize services
     memory = MemoryService()
     logger = LoggingService()
-    prompt = PromptService(model_key=DEFAULT_MODEL)
+    prompt = PromptService(model_key=DEFAULT_MODEL, usage_tracker=UsageTracker(logger))
     web = WebService()
     
     # Initialize video service (optional)
@@ -296,23 +371,35 @@ def main():
                 if cmd == "/flash":
                     current_model = "flash"
                     prompt.set_model(current_model)
+                    prompt.auto_route = False
                     console.print(f"[yellow]⚡ Model:[/] {MODELS[current_model]} (~${MODEL_COSTS[current_model]}/query)")
                     continue
                 
                 if cmd == "/pro":
                     current_model = "pro"
                     prompt.set_model(current_model)
+                    prompt.auto_route = False
                     console.print(f"[yellow]🎯 Model:[/] {MODELS[current_model]} (~${MODEL_COSTS[current_model]}/query)")
                     continue
                 
                 if cmd == "/ultra":
                     current_model = "ultra"
                     prompt.set_model(current_model)
+                    prompt.auto_route = False
                     console.print(f"[yellow]🔥 Model:[/] {MODELS[current_model]} (~${MODEL_COSTS[current_model]}/query)")
                     continue
                 
+                if cmd == "/auto":
+                    prompt.auto_route = True
+                    console.print(f"[yellow]🔀 Model:[/] AUTO ({prompt.router.fast_model} first, "
+                                  f"{prompt.router.strong_model} when needed)")
+                    continue
+                
                 if cmd in ["/models", "/status"]:
-                    console.print(status_table(current_model, active_agent, logger.is_session_active))
+                    console.print(status_table(
+                        current_model, active_agent, logger.is_session_active, prompt.usage.summary(),
+                        prompt.router.stats() if prompt.auto_route else None
+                    ))
                     continue
                 
                 # ═══════════════════════════════════════════════════════════
@@ -396,25 +483,26 @@ def main():
                     if query:
                         console.print("\n[bold yellow]╔═══ COUNCIL INITIATED ═══╗[/]")
                         
-                        # BLADE
-                        response_b = run_with_spinner(blade, query, "blade", MODELS[current_model])
-                        console.print(agent_panel("blade", response_b.content))
-                        
-                        # NYX
-                        nyx_context = f"BLADE's Analysis: {response_b.content}"
-                        response_n = run_with_spinner(nyx, query, "nyx", MODELS[current_model])
-                        console.print(agent_panel("nyx", response_n.content))
+                        council = Council(prompt, memory, kaedra=kaedra, blade=blade, nyx=nyx)
+                        with console.status(f"[bold cyan]{thinking_message(MODELS[current_model])}[/]", spinner="dots"):
+                            try:
+                                result = asyncio.run(council.convene(query, model=current_model))
+                            except AgentError as e:
+                                result = None
+                                console.print(f"[red]Council failed: {e.message}[/]")
                         
-                        # KAEDRA synthesis
-                        synthesis = f"""BLADE: {response_b.content}
-NYX: {response_n.content}
-
-Synthesize and make the final call."""
-                        response_k = run_with_spinner(kaedra, query, "kaedra", MODELS[current_model])
-                        console.print(agent_panel("kaedra", response_k.content))
+                        if result:
+                            for name, content in (("blade", result.blade_response),
+                                                  ("nyx", result.nyx_response),
+                                                  ("kaedra", result.kaedra_synthesis)):
+                                # A failed synthesis is already marked in its fallback text
+                                error = result.errors.get(name.upper()) if name != "kaedra" else None
+                                console.print(agent_panel(name, f"*unavailable: {error}*" if error else content))
+                            timings = ", ".join(f"{k} {v:.0f}ms" for k, v in result.agent_latency_ms.items())
+                            console.print(f"[dim]{timings} | total {result.total_latency_ms:.0f}ms[/]")
+                            logger.log_message("COUNCIL", result.kaedra_synthesis, MODELS[current_model])
                         
                         console.print("[bold yellow]╚═══ COUNCIL CONCLUDED ═══╝[/]\n")
-                        logger.log_message("COUNCIL", response_k.content, MODELS[current_model])
                     continue
                 
                 # ═══════════════════════════════════════════════════════════
@@ -426,8 +514,9 @@ Synthesize and make the final call."""
                     if task:
                         with console.status("[bold cyan]Running Tree of Thought analysis...[/]", spinner="dots"):
                             result = tot.execute(task, current_model)
-                        console.print(Panel(Markdown(result), title="[bold yellow]🌳 Tree of Thought[/]"))
-                        logger.log_message("TOT", result, MODELS[current_model])
+                        console.print(Panel(Markdown(result.full_analysis), title="[bold yellow]🌳 Tree of Thought[/]"))
+                        console.print(f"[dim]{len(result.nodes())} nodes · {result.usage.total_tokens} tokens · {result.latency_ms:.0f}ms[/]")
+                        logger.log_message("TOT", result.full_analysis, MODELS[current_model])
                     continue
                 
                 if cmd.startswith("/battle "):
@@ -435,8 +524,8 @@ Synthesize and make the final call."""
                     if task:
                         with console.status("[bold cyan]Running Battle of Bots...[/]", spinner="dots"):
                             result = battle.execute(task, current_model)
-                        console.print(Panel(Markdown(result), title="[bold yellow]⚔️ Battle of Bots[/]"))
-                        logger.log_message("BATTLE", result, MODELS[current_model])
+                        console.print(Panel(Markdown(result.full_battle), title="[bold yellow]⚔️ Battle of Bots[/]"))
+                        logger.log_message("BATTLE", result.full_battle, MODELS[current_model])
                     continue
                 
                 if cmd.startswith("/optimize "):
@@ -452,21 +541,14 @@ Synthesize and make the final call."""
                 # SEND TO ACTIVE AGENT
                 # ═══════════════════════════════════════════════════════════
                 
-                # Route to active agent with spinner
-                if active_agent == "blade":
-                    response = run_with_spinner(blade, user_input, "blade", MODELS[current_model])
-                    console.print(agent_panel("blade", response.content))
-                elif active_agent == "nyx":
-                    response = run_with_spinner(nyx, user_input, "nyx", MODELS[current_model])
-                    console.print(agent_panel("nyx", response.content))
-                else:
-                    response = run_with_spinner(kaedra, user_input, "kaedra", MODELS[current_model])
-                    console.print(agent_panel("kaedra", response.content))
-                
-                logger.log_message(active_agent.upper(), response.content, response.model)
+                # Route to active agent, streaming into a live panel
+                agent = {"blade": blade, "nyx": nyx}.get(active_agent, kaedra)
+                run_kwargs = {"use_semantic_cache": True} if agent is kaedra else {}
+                response = stream_with_live(agent, user_input, active_agent, MODELS[current_model], logger,
+                                            **run_kwargs)
                 
-                # Auto-memory (silent)
-                if not user_input.startswith("/"):
+                # Auto-memory (silent), never failed generations
+                if not user_input.startswith("/") and response.ok:
                     try:
                         timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                         memory.insert(
@@ -4,6 +4,11 @@ from .memory import MemoryService, MemoryEntry
 from .logging import LoggingService, SessionInfo
 from .prompt import PromptService, PromptResult
 from .web import WebService, WebPage
+from .embedding import EmbeddingService, get_embedding_service
+from .cache import ResponseCache, get_response_cache
+from .usage import TokenUsage, UsageTracker, get_usage_tracker
+from .model_router import ModelRouter, RoutingDecision, get_model_router
+from .session import Conversation, ConversationStore
 
 try:
     from .video import VideoService, VideoResult
@@ -21,11 +26,26 @@ except ImportError:
     BigQueryVectorStore = None
     get_vector_store = None
 
+try:
+    from .local_vector_store import LocalVectorStore
+    LOCAL_VECTOR_STORE_AVAILABLE = True
+except ImportError:
+    LOCAL_VECTOR_STORE_AVAILABLE = False
+    LocalVectorStore = None
+
+from .semantic_cache import SemanticCache, get_semantic_cache
+
 __all__ = [
     'MemoryService', 'MemoryEntry',
     'LoggingService', 'SessionInfo',
     'PromptService', 'PromptResult',
     'WebService', 'WebPage',
+    'EmbeddingService', 'get_embedding_service',
+    'ResponseCache', 'get_response_cache',
+    'TokenUsage', 'UsageTracker', 'get_usage_tracker',
+    'ModelRouter', 'RoutingDecision', 'get_model_router',
+    'Conversation', 'ConversationStore',
+    'SemanticCache', 'get_semantic_cache',
 ]
 
 if VIDEO_AVAILABLE:
@@ -34,3 +54,6 @@ if VIDEO_AVAILABLE:
 if VECTOR_STORE_AVAILABLE:
     __all__.extend(['BigQueryVectorStore', 'get_vector_store'])
 
+if LOCAL_VECTOR_STORE_AVAILABLE:
+    __all__.append('LocalVectorStore')
+
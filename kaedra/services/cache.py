@@ -0,0 +1,375 @@
+"""
+KAEDRA v0.0.6 - Cache Service
+Two-tier (in-memory LRU + SQLite) caches for embeddings and other
+expensive, repeatable results.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.config import (
+    EMBEDDING_CACHE_FILE, EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_DISK_ENTRIES, ENABLE_EMBEDDING_CACHE,
+    RESPONSE_CACHE_FILE, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_DISK_ENTRIES, RESPONSE_CACHE_TTL_S,
+    RESPONSE_CACHE_TTL_BY_MODEL, ENABLE_RESPONSE_CACHE
+)
+
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL
+);
+"""
+
+
+class TieredCache:
+    """
+    Key/value cache with an in-memory LRU in front of a SQLite table.
+
+    Features:
+    - LRU tier bounded by entry count
+    - Optional on-disk tier shared across processes and restarts, bounded
+      by max_disk_entries (oldest writes dropped first)
+    - Optional TTL (per cache, overridable per put); expired rows are
+      deleted when read and purged periodically
+    - Hit/miss counters per tier
+    """
+
+    def __init__(
+        self,
+        db_file: Optional[Path] = None,
+        max_entries: int = 1024,
+        ttl_s: Optional[float] = None,
+        encode: Callable[[Any], bytes] = None,
+        decode: Callable[[bytes], Any] = None,
+        max_disk_entries: Optional[int] = None,
+        purge_every: int = 256
+    ):
+        self.db_file = Path(db_file) if db_file else None
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_s = ttl_s
+        self.purge_every = max(1, purge_every)
+        self._encode = encode or (lambda v: v)
+        self._decode = decode or (lambda b: b)
+
+        self._lru: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes_since_purge = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.purged = 0
+
+        if self.db_file:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._conn as conn:
+                conn.executescript(_CACHE_SCHEMA)
+            self.purge()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections are not thread-safe)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key: str, value: Any, expires_at: Optional[float]):
+        with self._lock:
+            self._lru[key] = (value, expires_at)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss or expiry."""
+        now = time.time()
+        with self._lock:
+            hit = self._lru.get(key)
+            if hit is not None:
+                value, expires_at = hit
+                if expires_at is None or expires_at > now:
+                    self._lru.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._lru[key]
+
+        if self.db_file:
+            try:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"[Cache] Read failed: {e}")
+                row = None
+            if row and (row[1] is None or row[1] > now):
+                value = self._decode(row[0])
+                self._remember(key, value, row[1])
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+            if row:
+                self._delete_expired(key, now)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _delete_expired(self, key: str, now: float):
+        """Drop one expired row (unless another process just refreshed it)."""
+        try:
+            with self._conn as conn:
+                conn.execute("DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, now))
+        except sqlite3.Error as e:
+            print(f"[Cache] Expired row delete failed: {e}")
+
+    def purge(self) -> int:
+        """
+        Delete expired rows, then the oldest writes beyond max_disk_entries.
+
+        Runs on open and after every purge_every disk writes.
+
+        Returns:
+            Rows deleted
+        """
+        if not self.db_file:
+            return 0
+        try:
+            with self._conn as conn:
+                deleted = conn.execute(
+                    "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+                ).rowcount
+                if self.max_disk_entries is not None:
+                    excess = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_disk_entries
+                    if excess > 0:
+                        # INSERT OR REPLACE gives a rewritten key a new rowid, so rowid order is write order
+                        deleted += conn.execute(
+                            "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY rowid LIMIT ?)",
+                            (excess,)
+                        ).rowcount
+        except sqlite3.Error as e:
+            print(f"[Cache] Purge failed: {e}")
+            return 0
+        with self._lock:
+            self.purged += deleted
+        return deleted
+
+    def put(self, key: str, value: Any, ttl_s: Optional[float] = None):
+        """Store a value in both tiers."""
+        self.put_many({key: value}, ttl_s)
+
+    def put_many(self, items: Dict[str, Any], ttl_s: Optional[float] = None):
+        """Store several values, writing the disk tier in one transaction."""
+        ttl = ttl_s if ttl_s is not None else self.ttl_s
+        expires_at = time.time() + ttl if ttl else None
+        for key, value in items.items():
+            self._remember(key, value, expires_at)
+
+        if self.db_file and items:
+            try:
+                with self._conn as conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                        [(k, self._encode(v), expires_at) for k, v in items.items()]
+                    )
+            except sqlite3.Error as e:
+                print(f"[Cache] Write failed: {e}")
+                return
+
+            with self._lock:
+                self._writes_since_purge += len(items)
+                due = self._writes_since_purge >= self.purge_every
+                if due:
+                    self._writes_since_purge = 0
+            if due:
+                self.purge()
+
+    def delete(self, key: str):
+        """Drop a key from both tiers."""
+        with self._lock:
+            self._lru.pop(key, None)
+        if self.db_file:
+            with self._conn as conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        """Drop everything, including expired rows on disk."""
+        with self._lock:
+            self._lru.clear()
+        if self.db_file:
+            with self._conn as conn:
+                conn.execute("DELETE FROM cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and sizes."""
+        with self._lock:
+            memory_entries = len(self._lru)
+            memory_hits, disk_hits, misses, purged = self.memory_hits, self.disk_hits, self.misses, self.purged
+        lookups = memory_hits + disk_hits + misses
+        return {
+            "memory_entries": memory_entries,
+            "memory_hits": memory_hits,
+            "disk_hits": disk_hits,
+            "misses": misses,
+            "purged": purged,
+            "hit_rate": round((memory_hits + disk_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+class EmbeddingCache:
+    """
+    Embedding cache keyed by (model, dimensionality, sha256(text)).
+
+    Vectors are stored on disk as packed float32, so a 3072-d embedding
+    costs 12KB per row. Embeddings are deterministic, so entries never
+    expire; the disk tier is instead capped at max_disk_entries rows,
+    dropping the oldest writes first.
+    """
+
+    def __init__(self, db_file: Optional[Path] = None, max_entries: int = EMBEDDING_CACHE_SIZE,
+                 max_disk_entries: int = EMBEDDING_CACHE_DISK_ENTRIES):
+        self._cache = TieredCache(
+            db_file=db_file,
+            max_entries=max_entries,
+            max_disk_entries=max_disk_entries,
+            encode=lambda vector: array('f', vector).tobytes(),
+            decode=lambda blob: array('f', blob).tolist()
+        )
+
+    @staticmethod
+    def key(model: str, text: str, dimensions: Optional[int] = None) -> str:
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{model}:{dimensions or 0}:{digest}"
+
+    def get(self, model: str, text: str, dimensions: Optional[int] = None) -> Optional[List[float]]:
+        """Cached embedding for text, or None."""
+        return self._cache.get(self.key(model, text, dimensions))
+
+    def get_many(self, model: str, texts: List[str],
+                 dimensions: Optional[int] = None) -> List[Optional[List[float]]]:
+        """Cached embeddings in input order (None for each miss)."""
+        return [self.get(model, text, dimensions) for text in texts]
+
+    def put(self, model: str, text: str, vector: List[float], dimensions: Optional[int] = None):
+        """Cache an embedding (empty vectors are ignored)."""
+        self.put_many(model, [text], [vector], dimensions)
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]],
+                 dimensions: Optional[int] = None):
+        """Cache several embeddings in one disk write."""
+        self._cache.put_many({
+            self.key(model, text, dimensions): list(vector)
+            for text, vector in zip(texts, vectors) if vector
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+class ResponseCache:
+    """
+    Exact-match cache for LLM responses.
+
+    Keyed by sha256 of (model, system_instruction, prompt, temperature,
+    max_tokens, grounded), so any change to the request is a miss. Entries
+    expire after a per-model TTL; failed generations are never stored.
+    """
+
+    def __init__(
+        self,
+        db_file: Optional[Path] = None,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        ttl_s: float = RESPONSE_CACHE_TTL_S,
+        ttl_by_model: Optional[Dict[str, float]] = None,
+        max_disk_entries: int = RESPONSE_CACHE_DISK_ENTRIES
+    ):
+        self.ttl_s = ttl_s
+        self.ttl_by_model = dict(RESPONSE_CACHE_TTL_BY_MODEL if ttl_by_model is None else ttl_by_model)
+        self._cache = TieredCache(
+            db_file=db_file,
+            max_entries=max_entries,
+            max_disk_entries=max_disk_entries,
+            ttl_s=ttl_s,
+            encode=lambda value: json.dumps(value).encode('utf-8'),
+            decode=lambda blob: json.loads(blob)
+        )
+
+    @staticmethod
+    def key(model: str, prompt: str, system_instruction: Optional[str] = None,
+            temperature: float = 0.7, max_tokens: int = 4096, grounded: bool = False) -> str:
+        payload = json.dumps(
+            [model, system_instruction or "", prompt, round(float(temperature), 4), int(max_tokens), bool(grounded)],
+            ensure_ascii=False
+        )
+        return f"{model}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def ttl_for(self, model_key: Optional[str]) -> float:
+        """TTL for a model key (flash/pro/ultra), falling back to the default."""
+        return self.ttl_by_model.get(model_key, self.ttl_s)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached response dict (text, model, grounded), or None."""
+        return self._cache.get(key)
+
+    def put(self, key: str, response: Dict[str, Any], model_key: Optional[str] = None):
+        """Cache a response with the TTL for its model."""
+        self._cache.put(key, response, ttl_s=self.ttl_for(model_key))
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+# Shared instance so every embedding call site hits the same cache
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the global embedding cache (None when disabled)."""
+    global _embedding_cache
+    if not ENABLE_EMBEDDING_CACHE:
+        return None
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            try:
+                _embedding_cache = EmbeddingCache(EMBEDDING_CACHE_FILE)
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Cache] Disk tier unavailable, using memory only: {e}")
+                _embedding_cache = EmbeddingCache(None)
+    return _embedding_cache
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the global response cache (None unless KAEDRA_RESPONSE_CACHE=true)."""
+    global _response_cache
+    if not ENABLE_RESPONSE_CACHE:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            try:
+                _response_cache = ResponseCache(RESPONSE_CACHE_FILE)
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Cache] Disk tier unavailable, using memory only: {e}")
+                _response_cache = ResponseCache(None)
+    return _response_cache
@@ -0,0 +1,322 @@
+"""
+KAEDRA v0.0.6 - Embedding Service
+Single entry point for text embeddings with micro-batching and caching.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..core.config import (
+    PROJECT_ID, LOCATION, EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_WINDOW_MS,
+    EMBEDDING_MODEL_BATCH_LIMITS, EMBEDDING_MAX_CONCURRENCY, EMBEDDING_RESULT_TIMEOUT_S
+)
+from ..core.exceptions import KaedraError
+from .cache import EmbeddingCache, get_embedding_cache
+from .retry import INVALID, Retrier, classify_error
+
+
+logger = logging.getLogger("kaedra.services.embedding")
+
+
+# embed_fn(model, texts) -> one vector per text
+EmbedFn = Callable[[str, List[str]], List[List[float]]]
+
+
+class EmbeddingService:
+    """
+    Shared embedding client used by the vector stores, PromptService and API.
+
+    Features:
+    - One warm Gen AI client for every embedding model
+    - Micro-batching: requests arriving within batch_window_ms are sent
+      as one embed_content call per model, up to the model's per-request
+      input limit; batches the model can't take in one call are sent as
+      parallel calls
+    - Calls and their retries run on a worker pool, so a backing-off batch
+      never holds up the batcher or the batches behind it
+    - 429 / 5xx / timeouts retried with backoff; a batch is split only
+      when it is rejected as too large or invalid
+    - Every queued text is resolved, even if a batch fails unexpectedly,
+      and callers wait at most result_timeout_s
+    - Identical in-flight texts share a single request
+    - Embedding cache in front of the API
+    - Sync (embed, embed_many) and async (embed_async, embed_many_async) APIs
+    """
+
+    def __init__(
+        self,
+        project: str = PROJECT_ID,
+        location: str = LOCATION,
+        default_model: str = EMBEDDING_MODEL,
+        batch_window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+        max_batch: int = EMBEDDING_BATCH_SIZE,
+        embed_fn: Optional[EmbedFn] = None,
+        cache: Optional[EmbeddingCache] = None,
+        retrier: Optional[Retrier] = None,
+        batch_limits: Optional[Dict[str, int]] = None,
+        max_concurrency: int = EMBEDDING_MAX_CONCURRENCY,
+        result_timeout_s: float = EMBEDDING_RESULT_TIMEOUT_S
+    ):
+        self.project = project
+        self.location = location
+        self.default_model = default_model
+        self.batch_window_s = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.retrier = retrier or Retrier()
+        self.batch_limits = dict(EMBEDDING_MODEL_BATCH_LIMITS if batch_limits is None else batch_limits)
+        self.result_timeout_s = result_timeout_s
+
+        self._embed_fn = embed_fn
+        self._genai_client = None
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: List[Tuple[str, str]] = []
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._worker: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency), thread_name_prefix="kaedra-embedding-call"
+        )
+
+        self._requests = 0
+        self._coalesced = 0
+        self._api_calls = 0
+        self._texts_embedded = 0
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # CLIENT
+    # ══════════════════════════════════════════════════════════════════════════
+
+    @property
+    def genai_client(self):
+        """Lazy-load the Gen AI client (kept for the life of the service)."""
+        if self._genai_client is None:
+            from google import genai
+            self._genai_client = genai.Client(
+                vertexai=True,
+                project=self.project,
+                location=self.location
+            )
+        return self._genai_client
+
+    def batch_limit(self, model: str) -> int:
+        """Most texts one embed_content call may carry for `model`."""
+        return max(1, min(self.max_batch, self.batch_limits.get(model, self.max_batch)))
+
+    def _call_api(self, model: str, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self._api_calls += 1
+        if self._embed_fn is not None:
+            return self._embed_fn(model, texts)
+        result = self.genai_client.models.embed_content(model=model, contents=texts)
+        return [list(e.values) for e in result.embeddings]
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # PUBLIC API
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def submit(self, texts: List[str], model: str = None) -> List[Future]:
+        """
+        Queue texts for embedding without waiting.
+
+        Returns:
+            One Future per text resolving to its vector (cache hits are
+            returned already resolved)
+        """
+        model = model or self.default_model
+        futures: List[Future] = []
+        cached = self.cache.get_many(model, texts) if self.cache else [None] * len(texts)
+
+        with self._lock:
+            for text, vector in zip(texts, cached):
+                self._requests += 1
+                if vector is not None:
+                    future = Future()
+                    future.set_result(vector)
+                    futures.append(future)
+                    continue
+
+                key = (model, text)
+                future = self._inflight.get(key)
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    self._pending.append(key)
+                else:
+                    self._coalesced += 1
+                futures.append(future)
+
+            if self._pending:
+                self._ensure_worker()
+                self._wakeup.notify()
+        return futures
+
+    def embed_many(self, texts: List[str], model: str = None) -> List[List[float]]:
+        """
+        Embed texts, blocking until done.
+
+        Returns:
+            One vector per text (empty list where embedding failed)
+        """
+        results = []
+        deadline = time.monotonic() + self.result_timeout_s
+        for future in self.submit(texts, model):
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                logger.error(f"Embedding timed out after {self.result_timeout_s:g}s")
+                results.append([])
+            except Exception:
+                results.append([])
+        return results
+
+    def embed(self, text: str, model: str = None) -> List[float]:
+        """Embed one text (empty list on failure)."""
+        return self.embed_many([text], model)[0]
+
+    async def embed_many_async(self, texts: List[str], model: str = None) -> List[List[float]]:
+        """Async embed_many; awaits the shared batch without blocking the loop."""
+        futures = [asyncio.wrap_future(f) for f in self.submit(texts, model)]
+        # asyncio.wait leaves stragglers running (and shared) instead of cancelling them
+        _, pending = await asyncio.wait(futures, timeout=self.result_timeout_s)
+        if pending:
+            logger.error(f"Embedding timed out after {self.result_timeout_s:g}s")
+        return [
+            f.result() if f.done() and not f.cancelled() and f.exception() is None else []
+            for f in futures
+        ]
+
+    async def embed_async(self, text: str, model: str = None) -> List[float]:
+        """Async embed of one text (empty list on failure)."""
+        return (await self.embed_many_async([text], model))[0]
+
+    def stats(self) -> Dict:
+        """Request, coalescing and batching counters."""
+        return {
+            "requests": self._requests,
+            "coalesced": self._coalesced,
+            "api_calls": self._api_calls,
+            "texts_embedded": self._texts_embedded,
+            "avg_batch": round(self._texts_embedded / self._api_calls, 2) if self._api_calls else 0.0,
+            "pending": len(self._pending),
+            "cache": self.cache.stats() if self.cache else None,
+        }
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # BATCHING WORKER
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def _ensure_worker(self):
+        """Start the batching thread on first use (caller holds the lock)."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="kaedra-embedding-batcher", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._wakeup.wait()
+
+            # Let concurrent callers join the batch
+            if self.batch_window_s > 0:
+                time.sleep(self.batch_window_s)
+
+            with self._lock:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:len(batch)]
+
+            try:
+                by_model: Dict[str, List[str]] = {}
+                for model, text in batch:
+                    by_model.setdefault(model, []).append(text)
+
+                # Calls (and their retry backoff) run on the pool; the batcher moves on
+                for model, texts in by_model.items():
+                    limit = self.batch_limit(model)
+                    for i in range(0, len(texts), limit):
+                        self._executor.submit(self._embed_request, model, texts[i:i + limit])
+            except Exception as e:
+                logger.exception(f"Embedding batcher failed on {len(batch)} text(s)")
+                for model, text in batch:
+                    self._resolve(model, [text], error=e)
+
+    def _embed_request(self, model: str, texts: List[str]):
+        """Pool task for one request: never leaves a future unresolved."""
+        try:
+            self._embed_batch(model, texts)
+        except Exception as e:
+            logger.exception(f"Embedding {len(texts)} text(s) failed unexpectedly")
+            self._resolve(model, texts, error=e)
+
+    def _embed_batch(self, model: str, texts: List[str]):
+        """Embed one request's texts and resolve their futures."""
+        try:
+            vectors = self.retrier.call(lambda: self._call_api(model, texts), model)
+        except Exception as e:
+            kind = e.details.get("kind") if isinstance(e, KaedraError) else classify_error(e)
+            if kind == INVALID and len(texts) > 1:
+                # Too large or one bad input: halve until the offender is alone
+                logger.warning(f"Batch of {len(texts)} rejected, splitting: {e}")
+                self._split(model, texts)
+                return
+            logger.error(f"Embedding {len(texts)} text(s) failed: {e}")
+            self._resolve(model, texts, error=e)
+            return
+
+        if len(vectors) != len(texts):
+            error = ValueError(f"expected {len(texts)} embeddings, got {len(vectors)}")
+            if len(texts) > 1:
+                logger.warning(f"Batch of {len(texts)} returned short, splitting: {error}")
+                self._split(model, texts)
+                return
+            logger.error(f"Embedding failed: {error}")
+            self._resolve(model, texts, error=error)
+            return
+
+        with self._lock:
+            self._texts_embedded += len(texts)
+        self._resolve(model, texts, vectors=vectors)
+        if self.cache:
+            try:
+                self.cache.put_many(model, texts, vectors)
+            except Exception as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+
+    def _split(self, model: str, texts: List[str]):
+        middle = len(texts) // 2
+        self._embed_batch(model, texts[:middle])
+        self._embed_batch(model, texts[middle:])
+
+    def _resolve(self, model: str, texts: List[str], vectors: List[List[float]] = None,
+                 error: Exception = None):
+        with self._lock:
+            futures = [self._inflight.pop((model, text), None) for text in texts]
+        for i, future in enumerate(futures):
+            if future is None or future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(vectors[i])
+
+
+# Singleton instance for easy access
+_embedding_service: Optional[EmbeddingService] = None
+_embedding_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Get the global embedding service instance."""
+    global _embedding_service
+    with _embedding_service_lock:
+        if _embedding_service is None:
+            _embedding_service = EmbeddingService()
+    return _embedding_service
@@ -0,0 +1,412 @@
+"""
+KAEDRA v0.0.6 - Semantic Indexing Worker
+Write-behind queue that streams new memories into the vector store.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Iterable, List, Dict, Any, Optional, Set
+
+
+# Live indexers, closed by one exit hook without being kept alive by it
+_open_indexers: "weakref.WeakSet[SemanticIndexer]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_indexers():
+    for indexer in list(_open_indexers):
+        indexer.close()
+
+
+class SemanticIndexer:
+    """
+    Background worker feeding memories to a vector store.
+
+    Features:
+    - Bounded in-memory queue; submit() never blocks the caller
+    - Batching via vector_store.add_memories
+    - Per-item retry with exponential backoff
+    - Durable JSONL outbox for overflow, exhausted retries and shutdown,
+      replayed when the worker is idle and on next startup
+    - Lifetime attempt and replay counts per record; records replayed
+      more than max_replays times move to a dead-letter file
+    - discard() drops queued, outbox and in-flight work for deleted memories
+    - Queue depth / lag stats and flush() for tests and shutdown
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        outbox_file: Path,
+        max_queue: int = 1000,
+        batch_size: int = 50,
+        batch_wait_s: float = 0.25,
+        max_retries: int = 3,
+        backoff_s: float = 1.0,
+        outbox_retry_s: float = 30.0,
+        max_replays: int = 5
+    ):
+        self.vector_store = vector_store
+        self.outbox_file = Path(outbox_file)
+        self.dead_letter_file = self.outbox_file.with_name(
+            f"{self.outbox_file.stem}.dead{self.outbox_file.suffix}"
+        )
+        self.batch_size = batch_size
+        self.batch_wait_s = batch_wait_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.outbox_retry_s = outbox_retry_s
+        self.max_replays = max_replays
+        self._next_drain_at = 0.0
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._outbox_lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._stop = threading.Event()
+        self._in_flight: List[Dict[str, Any]] = []
+        self._unfinished = 0
+        self._discarded: Set[str] = set()  # Deleted while the worker may hold their records
+        self._discard_lock = threading.Lock()
+
+        self._indexed = 0
+        self._failed = 0
+        self._retries = 0
+        self._spilled = 0
+        self._dead_lettered = 0
+        self._discarded_count = 0
+        self._last_error: Optional[str] = None
+
+        self._thread = threading.Thread(
+            target=self._run, name="kaedra-semantic-indexer", daemon=True
+        )
+        self._thread.start()
+        _open_indexers.add(self)
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # PRODUCER API
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def submit(self, item: Dict[str, Any]):
+        """
+        Queue a memory for indexing (add_memories item format).
+
+        Falls back to the on-disk outbox when the queue is full or the
+        worker has been stopped.
+        """
+        self.submit_many([item])
+
+    def submit_many(self, items: List[Dict[str, Any]]):
+        """Queue several memories for indexing."""
+        overflow = []
+        now = time.time()
+        for item in items:
+            record = {"item": item, "enqueued_at": now, "attempts": 0, "replays": 0}
+            if self._stop.is_set():
+                overflow.append(record)
+                continue
+            with self._idle:
+                self._unfinished += 1
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self._task_done()
+                overflow.append(record)
+        if overflow:
+            self._spill(overflow)
+
+    def discard(self, memory_ids: Iterable[str]) -> int:
+        """
+        Drop pending work for deleted memories (matched on metadata.local_id).
+
+        Removes their records from the queue and the outbox. A record the
+        worker already holds is skipped, or deleted from the vector store
+        again if it was being indexed at the time.
+
+        Returns:
+            Number of queued and outbox records removed
+        """
+        ids = set(memory_ids)
+        if not ids:
+            return 0
+        # Held throughout, so the worker can't forget the ids mid-purge
+        with self._discard_lock:
+            self._discarded |= ids
+
+            with self._queue.mutex:
+                kept = [r for r in self._queue.queue if self._memory_id(r) not in ids]
+                dropped = len(self._queue.queue) - len(kept)
+                if dropped:
+                    self._queue.queue.clear()
+                    self._queue.queue.extend(kept)
+                    self._queue.not_full.notify(dropped)
+            for _ in range(dropped):
+                self._task_done()
+
+            with self._outbox_lock:
+                for path in (self.outbox_file, self._processing_file):
+                    dropped += self._rewrite_without(path, ids)
+
+        self._discarded_count += dropped
+        return dropped
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until everything queued so far has been indexed or spilled.
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._idle:
+            while self._unfinished > 0:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Stop the worker, spilling anything still queued to the outbox."""
+        if self._stop.is_set():
+            return
+        _open_indexers.discard(self)
+        self.flush(timeout)
+        self._stop.set()
+        self._thread.join(timeout)
+
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if leftovers:
+            self._spill(leftovers)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, lag and counters for get_stats()."""
+        with self._queue.mutex:
+            head = self._queue.queue[0] if self._queue.queue else None
+            depth = len(self._queue.queue)
+        oldest = [r["enqueued_at"] for r in self._in_flight]
+        if head:
+            oldest.append(head["enqueued_at"])
+
+        return {
+            "queue_depth": depth,
+            "in_flight": len(self._in_flight),
+            "outbox_depth": self._outbox_depth(),
+            "lag_seconds": round(time.time() - min(oldest), 3) if oldest else 0.0,
+            "indexed": self._indexed,
+            "failed": self._failed,
+            "retries": self._retries,
+            "spilled": self._spilled,
+            "dead_lettered": self._dead_lettered,
+            "discarded": self._discarded_count,
+            "last_error": self._last_error,
+        }
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # WORKER
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.batch_wait_s)
+            except queue.Empty:
+                self._drain_outbox()
+                self._forget_discarded()
+                continue
+
+            batch = [first]
+            deadline = time.time() + self.batch_wait_s
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._index_batch(batch)
+            finally:
+                for _ in batch:
+                    self._task_done()
+                self._forget_discarded()
+
+    @staticmethod
+    def _memory_id(record: Dict[str, Any]) -> Optional[str]:
+        return (record["item"].get("metadata") or {}).get("local_id")
+
+    def _is_discarded(self, record: Dict[str, Any]) -> bool:
+        with self._discard_lock:
+            return self._memory_id(record) in self._discarded
+
+    def _forget_discarded(self):
+        """The worker holds no records between batches, so discarded ids can't reappear."""
+        with self._discard_lock:
+            self._discarded.clear()
+
+    def _index_batch(self, batch: List[Dict[str, Any]]):
+        """Index a batch, retrying failed items, spilling what never succeeds."""
+        self._in_flight = batch
+        pending = batch
+        tries: Dict[int, int] = {}  # Attempts in this pass; record["attempts"] is lifetime
+        try:
+            while pending:
+                pending = [r for r in pending if not self._is_discarded(r)]
+                if not pending:
+                    break
+                try:
+                    results = self.vector_store.add_memories([r["item"] for r in pending])
+                except Exception as e:
+                    results = [{"id": None, "error": str(e)}] * len(pending)
+
+                failed = []
+                for record, result in zip(pending, results):
+                    if result.get("id"):
+                        if self._is_discarded(record):
+                            # Deleted while it was being indexed
+                            self.vector_store.delete_memory(result["id"])
+                        else:
+                            self._indexed += 1
+                        continue
+                    record["attempts"] = record.get("attempts", 0) + 1
+                    tries[id(record)] = tries.get(id(record), 0) + 1
+                    self._last_error = result.get("error")
+                    failed.append(record)
+
+                if not failed:
+                    break
+
+                exhausted = [r for r in failed if tries[id(r)] > self.max_retries]
+                pending = [r for r in failed if tries[id(r)] <= self.max_retries]
+                if exhausted:
+                    self._failed += len(exhausted)
+                    self._spill(exhausted)
+                if pending:
+                    self._retries += len(pending)
+                    delay = self.backoff_s * (2 ** (tries[id(pending[0])] - 1))
+                    if self._stop.wait(delay):
+                        self._spill(pending)
+                        break
+        finally:
+            self._in_flight = []
+
+    def _task_done(self):
+        with self._idle:
+            self._unfinished -= 1
+            self._idle.notify_all()
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # OUTBOX
+    # ══════════════════════════════════════════════════════════════════════════
+
+    @property
+    def _processing_file(self) -> Path:
+        return self.outbox_file.with_suffix(self.outbox_file.suffix + ".processing")
+
+    def _spill(self, records: List[Dict[str, Any]]):
+        """Durably append records to the outbox."""
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with self._outbox_lock:
+            with open(self.outbox_file, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        self._spilled += len(records)
+
+    def _dead_letter(self, records: List[Dict[str, Any]]):
+        """Move records that keep failing out of the replay loop, for inspection."""
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with self._outbox_lock:
+            with open(self.dead_letter_file, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        self._dead_lettered += len(records)
+        print(f"[Indexer] {len(records)} record(s) dead-lettered to {self.dead_letter_file.name}: "
+              f"{self._last_error}")
+
+    def _rewrite_without(self, path: Path, memory_ids: Set[str]) -> int:
+        """Remove records for memory_ids from an outbox file (caller holds the outbox lock)."""
+        if not path.exists():
+            return 0
+        kept, dropped = [], 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    kept.append(line)
+                    continue
+                if self._memory_id(record) in memory_ids:
+                    dropped += 1
+                else:
+                    kept.append(line)
+        if dropped:
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.writelines(kept)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        return dropped
+
+    def _outbox_depth(self) -> int:
+        with self._outbox_lock:
+            if not self.outbox_file.exists():
+                return 0
+            with open(self.outbox_file, 'rb') as f:
+                return sum(1 for line in f if line.strip())
+
+    def _drain_outbox(self):
+        """
+        Replay outbox records through the worker while the queue is idle.
+
+        The outbox is renamed to a .processing file first, so a crash mid
+        replay leaves the records on disk for the next start. Replays are
+        spaced outbox_retry_s apart so a store outage is not hammered, and
+        a record's replay count survives the trip through the outbox: past
+        max_replays it goes to the dead-letter file instead.
+        """
+        if time.time() < self._next_drain_at:
+            return
+        self._next_drain_at = time.time() + self.outbox_retry_s
+
+        with self._outbox_lock:
+            if not self._processing_file.exists():
+                if not self.outbox_file.exists() or self.outbox_file.stat().st_size == 0:
+                    return
+                os.replace(self.outbox_file, self._processing_file)
+
+            records, dead = [], []
+            with open(self._processing_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    record["replays"] = record.get("replays", 0) + 1
+                    (dead if record["replays"] > self.max_replays else records).append(record)
+
+        if dead:
+            self._dead_letter(dead)
+
+        for start in range(0, len(records), self.batch_size):
+            if self._stop.is_set():
+                self._spill(records[start:])
+                break
+            self._index_batch(records[start:start + self.batch_size])
+
+        with self._outbox_lock:
+            self._processing_file.unlink(missing_ok=True)
@@ -0,0 +1,140 @@
+"""
+KAEDRA v0.0.6 - Keyword Index
+Incremental inverted index with BM25 scoring for memory recall.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Indexed fields, in the order per-field tuples are stored
+FIELDS = ("topic", "tags", "content")
+
+DEFAULT_FIELD_BOOSTS = {
+    "topic": 3.0,    # High weight
+    "tags": 2.0,     # Medium weight
+    "content": 1.0,  # Base weight
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into word tokens."""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class KeywordIndex:
+    """
+    Inverted index over memory entries scored with BM25F.
+
+    Features:
+    - term -> {doc_id: per-field term frequencies} posting lists
+    - Incremental add/remove (no full rebuilds)
+    - Per-field length normalization with field boosts
+    - Optional candidate set to restrict scoring to pre-filtered ids
+    """
+
+    def __init__(self, field_boosts: Dict[str, float] = None, k1: float = 1.2, b: float = 0.75):
+        boosts = {**DEFAULT_FIELD_BOOSTS, **(field_boosts or {})}
+        self.field_boosts: Tuple[float, ...] = tuple(boosts[f] for f in FIELDS)
+        self.k1 = k1
+        self.b = b
+
+        self._postings: Dict[str, Dict[str, Tuple[int, ...]]] = {}
+        self._doc_lengths: Dict[str, Tuple[int, ...]] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._total_lengths: List[int] = [0] * len(FIELDS)
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_lengths
+
+    def add(self, doc_id: str, topic: str = "", tags: List[str] = None, content: str = ""):
+        """Index (or re-index) a document."""
+        if doc_id in self._doc_lengths:
+            self.remove(doc_id)
+
+        field_tokens = (
+            tokenize(topic),
+            [token for tag in (tags or []) for token in tokenize(tag)],
+            tokenize(content),
+        )
+        counts = [Counter(tokens) for tokens in field_tokens]
+        terms = set().union(*counts)
+
+        for term in terms:
+            self._postings.setdefault(term, {})[doc_id] = tuple(c[term] for c in counts)
+
+        lengths = tuple(len(tokens) for tokens in field_tokens)
+        for i, length in enumerate(lengths):
+            self._total_lengths[i] += length
+        self._doc_lengths[doc_id] = lengths
+        self._doc_terms[doc_id] = list(terms)
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove a document from the index. Returns True if it was indexed."""
+        lengths = self._doc_lengths.pop(doc_id, None)
+        if lengths is None:
+            return False
+
+        for i, length in enumerate(lengths):
+            self._total_lengths[i] -= length
+
+        for term in self._doc_terms.pop(doc_id, []):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        return True
+
+    def search(self, query: str, candidates: Optional[Set[str]] = None) -> Dict[str, float]:
+        """
+        Score documents matching any query term.
+
+        Only posting lists of the query terms are visited, so cost scales
+        with query selectivity rather than index size.
+
+        Args:
+            query: Free-text query
+            candidates: If given, only these doc ids are scored
+
+        Returns:
+            Mapping of doc_id -> BM25F score
+        """
+        terms = set(tokenize(query))
+        num_docs = len(self._doc_lengths)
+        if not terms or not num_docs:
+            return {}
+
+        avg_lengths = [max(total / num_docs, 1e-9) for total in self._total_lengths]
+        k1, b = self.k1, self.b
+        scores: Dict[str, float] = {}
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+
+            df = len(postings)
+            idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+
+            for doc_id, tfs in postings.items():
+                if candidates is not None and doc_id not in candidates:
+                    continue
+
+                lengths = self._doc_lengths[doc_id]
+                weighted_tf = 0.0
+                for tf, length, avg, boost in zip(tfs, lengths, avg_lengths, self.field_boosts):
+                    if tf:
+                        weighted_tf += boost * tf / (1 - b + b * length / avg)
+
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * weighted_tf * (k1 + 1) / (k1 + weighted_tf)
+
+        return scores
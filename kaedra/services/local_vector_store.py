@@ -0,0 +1,442 @@
+"""
+KAEDRA v0.0.6 - Local Vector Store
+In-process NumPy vector index for offline / low-latency semantic search.
+"""
+
+import atexit
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+import numpy as np
+
+from ..core.config import MEMORY_DIR, EMBEDDING_MODEL, IMPORTANCE_LEVELS
+from .embedding import get_embedding_service
+from .vector_sql import SearchFilters
+
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+_TIMESTAMP_DTYPE = "<U32"  # isoformat() with microseconds and a UTC offset
+
+
+class LocalVectorStore:
+    """
+    Vector store held in RAM as a contiguous float32 matrix.
+
+    Same interface as BigQueryVectorStore (add_memory, add_memories,
+    search_similar, delete_memory, get_stats).
+
+    Features:
+    - Rows are L2-normalized on insert, so cosine similarity is a single
+      matrix-vector product
+    - Top-k selection with argpartition (no full sort)
+    - Search filters are array comparisons on per-row topic, tag,
+      importance and timestamp columns kept beside the matrix
+    - O(1) delete by swapping the last row into the hole
+    - Persisted as vectors.npy + vectors.json next to the memory index,
+      saved every `autosave_every` changes and on exit
+    - Pluggable embedding function (inject a fake one for offline tests)
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        embed_fn: Optional[EmbedFn] = None,
+        autosave_every: int = 64
+    ):
+        self.db_path = Path(db_path or MEMORY_DIR)
+        self.db_path.mkdir(parents=True, exist_ok=True)
+        self.matrix_file = self.db_path / "vectors.npy"
+        self.records_file = self.db_path / "vectors.json"
+        self.autosave_every = autosave_every
+
+        self._embed_fn = embed_fn
+
+        self._matrix: Optional[np.ndarray] = None  # capacity x dim, rows [0, _size) live
+        self._size = 0
+        self._records: List[Dict[str, Any]] = []
+        self._row_of: Dict[str, int] = {}
+        self._unsaved = 0
+
+        # Filter columns, row-aligned with the matrix; topics and tags are vocabulary codes
+        self._topic_codes: Dict[Any, int] = {}
+        self._tag_codes: Dict[str, int] = {}
+        self._topic_ids = np.empty(0, dtype=np.int32)
+        self._tag_ids = np.empty((0, 0), dtype=np.int32)   # -1 pads rows with fewer tags
+        self._importance = np.empty(0, dtype=np.int8)      # IMPORTANCE_LEVELS value, -1 unknown
+        self._timestamps = np.empty(0, dtype=_TIMESTAMP_DTYPE)
+        self._lock = threading.RLock()  # indexer thread writes while callers search
+
+        self._load()
+        atexit.register(self.save)
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # EMBEDDING
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with the injected function or the shared EmbeddingService."""
+        if self._embed_fn is not None:
+            return self._embed_fn(texts)
+        return get_embedding_service().embed_many(texts, EMBEDDING_MODEL)
+
+    def get_embedding(self, text: str) -> List[float]:
+        """Embed a single text (empty list on failure)."""
+        try:
+            return self._embed([text])[0]
+        except Exception as e:
+            print(f"[VectorStore] Embedding failed: {e}")
+            return []
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # MATRIX MANAGEMENT
+    # ══════════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _append_rows(self, vectors: np.ndarray, records: List[Dict[str, Any]]):
+        """Append normalized rows, growing capacity geometrically."""
+        if self._matrix is None:
+            self._matrix = np.empty((max(len(vectors), 64), vectors.shape[1]), dtype=np.float32)
+        elif vectors.shape[1] != self._matrix.shape[1]:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} != index dimension {self._matrix.shape[1]}"
+            )
+
+        needed = self._size + len(vectors)
+        if needed > self._matrix.shape[0]:
+            grown = np.empty((max(needed, self._matrix.shape[0] * 2), self._matrix.shape[1]),
+                             dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._resize_columns(self._matrix.shape[0])
+
+        self._matrix[self._size:needed] = self._normalize(vectors.astype(np.float32))
+        self._fill_columns(self._size, records)
+        for offset, record in enumerate(records):
+            self._row_of[record["id"]] = self._size + offset
+            self._records.append(record)
+        self._size = needed
+        self._mark_dirty(len(records))
+
+    def _resize_columns(self, capacity: int):
+        """Give the filter columns the matrix's capacity, keeping live rows."""
+        if len(self._topic_ids) == capacity:
+            return
+
+        def grow(column: np.ndarray, fill) -> np.ndarray:
+            grown = np.full((capacity,) + column.shape[1:], fill, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            return grown
+
+        self._topic_ids = grow(self._topic_ids, -1)
+        self._tag_ids = grow(self._tag_ids, -1)
+        self._importance = grow(self._importance, -1)
+        self._timestamps = grow(self._timestamps, "")
+
+    @staticmethod
+    def _code(vocabulary: Dict[Any, int], value: Any) -> int:
+        code = vocabulary.get(value)
+        if code is None:
+            code = vocabulary[value] = len(vocabulary)
+        return code
+
+    def _fill_columns(self, start: int, records: List[Dict[str, Any]]):
+        """Encode records into the filter columns at rows [start, start + len(records))."""
+        tag_sets = [{self._code(self._tag_codes, t.lower()) for t in r.get("tags") or []} for r in records]
+        width = max(map(len, tag_sets), default=0)
+        if width > self._tag_ids.shape[1]:
+            wider = np.full((len(self._tag_ids), width), -1, dtype=np.int32)
+            wider[:, :self._tag_ids.shape[1]] = self._tag_ids
+            self._tag_ids = wider
+
+        for row, (record, tags) in enumerate(zip(records, tag_sets), start):
+            self._topic_ids[row] = self._code(self._topic_codes, record.get("topic"))
+            self._importance[row] = IMPORTANCE_LEVELS.get(record.get("importance", "normal"), -1)
+            self._timestamps[row] = record.get("timestamp") or ""
+            self._tag_ids[row] = -1
+            self._tag_ids[row, :len(tags)] = sorted(tags)
+
+    def _filter_mask(self, filters: SearchFilters, size: int) -> np.ndarray:
+        """Rows [0, size) that pass the filters, same semantics as SearchFilters.matches."""
+        keep = np.ones(size, dtype=bool)
+        if filters.topic:
+            code = self._topic_codes.get(filters.topic)
+            if code is None:
+                return np.zeros(size, dtype=bool)
+            keep &= self._topic_ids[:size] == code
+        if filters.tags:
+            codes = [self._tag_codes[t] for t in filters.normalized_tags() if t in self._tag_codes]
+            if not codes:
+                return np.zeros(size, dtype=bool)
+            keep &= np.isin(self._tag_ids[:size], codes).any(axis=1)
+        if filters.min_importance:
+            keep &= self._importance[:size] >= IMPORTANCE_LEVELS.get(filters.min_importance, 0)
+        since, until = filters.time_bounds()
+        if since:
+            keep &= self._timestamps[:size] >= since
+        if until:
+            keep &= self._timestamps[:size] <= until
+        return keep
+
+    def _mark_dirty(self, changes: int = 1):
+        self._unsaved += changes
+        if self._unsaved >= self.autosave_every:
+            self.save()
+
+    def _load(self):
+        """Load a previously saved index, if any."""
+        if not (self.matrix_file.exists() and self.records_file.exists()):
+            return
+        try:
+            matrix = np.load(self.matrix_file)
+            with open(self.records_file, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[VectorStore] Local index unreadable, starting empty: {e}")
+            return
+
+        if len(records) != len(matrix):
+            print("[VectorStore] Local index files out of sync, starting empty")
+            return
+
+        self._matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self._resize_columns(len(records))
+        self._fill_columns(0, records)
+        self._size = len(records)
+        self._records = records
+        self._row_of = {r["id"]: i for i, r in enumerate(records)}
+
+    def save(self):
+        """Atomically write the matrix and records to disk."""
+        with self._lock:
+            if self._unsaved == 0:
+                return
+            matrix = self._matrix[:self._size].copy() if self._matrix is not None \
+                else np.empty((0, 0), np.float32)
+            records = list(self._records)
+            self._unsaved = 0
+
+        tmp_matrix = self.matrix_file.with_suffix(".tmp.npy")
+        tmp_records = self.records_file.with_suffix(".json.tmp")
+        np.save(tmp_matrix, matrix)
+        with open(tmp_records, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_matrix, self.matrix_file)
+        os.replace(tmp_records, self.records_file)
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # VECTOR STORE API
+    # ══════════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _build_record(content: str, topic: str = "general", tags: List[str] = None,
+                      importance: str = "normal", metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build the stored record; reuses the local memory id when given."""
+        memory_id = (metadata or {}).get("local_id") or \
+            f"vec_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        return {
+            "id": memory_id,
+            "content": content,
+            "topic": topic,
+            "tags": list(tags or []),
+            "importance": importance,
+            "metadata": metadata,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def add_memory(
+        self,
+        content: str,
+        topic: str = "general",
+        tags: List[str] = None,
+        importance: str = "normal",
+        metadata: Dict[str, Any] = None
+    ) -> Optional[str]:
+        """
+        Add a memory with its embedding.
+
+        Returns:
+            Memory ID if successful, None otherwise
+        """
+        result = self.add_memories([{
+            "content": content, "topic": topic, "tags": tags,
+            "importance": importance, "metadata": metadata
+        }])[0]
+        return result["id"]
+
+    def add_memories(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Add many memories with one batched embedding pass.
+
+        Returns:
+            One {"id", "error"} dict per item, in input order
+        """
+        results: List[Dict[str, Any]] = [{"id": None, "error": None} for _ in items]
+        if not items:
+            return results
+
+        try:
+            embeddings = self._embed([item["content"] for item in items])
+        except Exception as e:
+            for r in results:
+                r["error"] = f"embedding failed: {e}"
+            return results
+
+        with self._lock:
+            return self._store(items, embeddings, results)
+
+    def _store(self, items: List[Dict[str, Any]], embeddings: List[List[float]],
+               results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append embedded items to the matrix (caller holds the lock)."""
+        vectors, records = [], []
+        for i, (item, embedding) in enumerate(zip(items, embeddings)):
+            if not embedding:
+                results[i]["error"] = "embedding failed"
+                continue
+            record = self._build_record(
+                item["content"],
+                topic=item.get("topic", "general"),
+                tags=item.get("tags"),
+                importance=item.get("importance", "normal"),
+                metadata=item.get("metadata")
+            )
+            if record["id"] in self._row_of:
+                self.delete_memory(record["id"])
+            vectors.append(embedding)
+            records.append(record)
+            results[i]["id"] = record["id"]
+
+        if records:
+            try:
+                self._append_rows(np.asarray(vectors, dtype=np.float32), records)
+            except ValueError as e:
+                for r in results:
+                    if r["id"] is not None:
+                        r["id"], r["error"] = None, str(e)
+        return results
+
+    def search_similar(
+        self,
+        query: str,
+        limit: int = 5,
+        min_similarity: float = 0.0,
+        topic: str = None,
+        tags: List[str] = None,
+        min_importance: str = None,
+        since: Any = None,
+        until: Any = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for semantically similar memories.
+
+        Filters match BigQueryVectorStore.search_similar and are applied
+        as a mask before top-k selection.
+
+        Returns:
+            List of matching memories with similarity scores
+        """
+        if self._size == 0 or limit <= 0:
+            return []
+
+        query_embedding = self.get_embedding(query)
+        if not query_embedding:
+            return []
+
+        query_vec = self._normalize(np.asarray(query_embedding, dtype=np.float32))
+        filters = SearchFilters(topic, tags, min_importance, since, until)
+
+        with self._lock:
+            size = self._size
+            if size == 0:
+                return []
+            if query_vec.shape[0] != self._matrix.shape[1]:
+                print("[VectorStore] Query embedding dimension mismatch")
+                return []
+
+            scores = self._matrix[:size] @ query_vec
+
+            candidates = size
+            if not filters.is_empty():
+                keep = self._filter_mask(filters, size)
+                scores[~keep] = -np.inf
+                candidates = int(keep.sum())
+            limit = min(limit, candidates)
+            if limit == 0:
+                return []
+
+            if limit < size:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+            else:
+                top = np.arange(size)
+            top = top[np.argsort(-scores[top])]
+
+            results = []
+            for row in top:
+                similarity = float(scores[row])
+                if similarity < min_similarity:
+                    break
+                results.append({**self._records[row], "similarity": similarity})
+        return results
+
+    def delete_memory(self, memory_id: str) -> bool:
+        """Delete a memory by ID."""
+        with self._lock:
+            row = self._row_of.pop(memory_id, None)
+            if row is None:
+                return False
+
+            last = self._size - 1
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                for column in (self._topic_ids, self._tag_ids, self._importance, self._timestamps):
+                    column[row] = column[last]
+                moved = self._records[last]
+                self._records[row] = moved
+                self._row_of[moved["id"]] = row
+            self._records.pop()
+            self._size = last
+            self._mark_dirty()
+        return True
+
+    def prune(self, older_than: Optional[str] = None, max_rows: Optional[int] = None) -> int:
+        """
+        Delete rows stamped before `older_than` (ISO timestamp), then the
+        oldest rows beyond `max_rows`.
+
+        Returns:
+            Number of rows deleted
+        """
+        with self._lock:
+            by_age = sorted(self._records, key=lambda r: r["timestamp"])
+            doomed = [r["id"] for r in by_age if older_than and r["timestamp"] < older_than]
+            if max_rows is not None:
+                excess = len(by_age) - len(doomed) - max_rows
+                if excess > 0:
+                    doomed.extend(r["id"] for r in by_age[len(doomed):len(doomed) + excess])
+            for memory_id in doomed:
+                self.delete_memory(memory_id)
+        return len(doomed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get vector store statistics."""
+        with self._lock:
+            timestamps = [r["timestamp"] for r in self._records]
+            topics = {r["topic"] for r in self._records}
+        return {
+            "total": self._size,
+            "topics": len(topics),
+            "oldest": min(timestamps) if timestamps else None,
+            "newest": max(timestamps) if timestamps else None,
+            "dimensions": int(self._matrix.shape[1]) if self._matrix is not None else None,
+            "backend": "Local"
+        }
@@ -139,7 +139,42 @@ class LoggingService:
         self._session_file.flush()
         
         self._session.log_count += 1
-    
+
+    def begin_message(self, role: str, model: str = None, agent: str = None):
+        """
+        Start a streamed message; follow with append_chunk() and end_message().
+
+        Args:
+            role: Who sent the message (KAEDRA, BLADE, NYX, ...)
+            model: The model used (optional)
+            agent: The agent name (optional)
+        """
+        if not self._session_file:
+            return
+
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        tags = [t for t in (model, agent) if t]
+        tag_str = f" [{', '.join(tags)}]" if tags else ""
+        self._session_file.write(f"### [{role}]{tag_str} - {timestamp}\n")
+        self._session_file.flush()
+
+    def append_chunk(self, chunk: str):
+        """Write one chunk of a streamed message as it arrives."""
+        if not self._session_file:
+            return
+        self._session_file.write(chunk)
+        self._session_file.flush()
+
+    def end_message(self, note: str = None):
+        """Finish a streamed message (optionally noting an interruption or error)."""
+        if not self._session_file:
+            return
+        if note:
+            self._session_file.write(f"\n\n_{note}_")
+        self._session_file.write("\n\n")
+        self._session_file.flush()
+        self._session.log_count += 1
+
     # ══════════════════════════════════════════════════════════════════════════
     # SYSTEM LOGGING
     # ══════════════════════════════════════════════════════════════════════════
@@ -172,8 +207,11 @@ class LoggingService:
         """Log operation latency for performance tracking."""
         self._logger.info(f"LATENCY [{operation}]: {duration_ms:.2f}ms")
     
-    def log_api_call(self, model: str, tokens_in: int, tokens_out: int, duration_ms: float):
+    def log_api_call(self, model: str, tokens_in: int, tokens_out: int, duration_ms: float,
+                     tokens_cached: int = 0, cost_usd: Optional[float] = None):
         """Log API call metrics."""
+        cost_str = f", cost=${cost_usd:.6f}" if cost_usd is not None else ""
         self._logger.info(
-            f"API [{model}]: in={tokens_in}, out={tokens_out}, time={duration_ms:.2f}ms"
+            f"API [{model}]: in={tokens_in}, out={tokens_out}, cached={tokens_cached}, "
+            f"time={duration_ms:.2f}ms{cost_str}"
         )
@@ -3,13 +3,15 @@ KAEDRA v0.0.6 - Memory Service
 Persistent memory storage and retrieval with hybrid keyword + semantic search.
 """
 
-import json
+import uuid
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 from dataclasses import dataclass, asdict
 
-from ..core.config import MEMORY_DIR
+from ..core.config import MEMORY_DIR, VECTOR_BACKEND
+from .memory_store import MemoryBackend, create_backend
+from .indexing import SemanticIndexer
 
 # Optional vector store for semantic search
 try:
@@ -18,6 +20,13 @@ try:
 except ImportError:
     VECTOR_STORE_AVAILABLE = False
 
+# Optional in-process NumPy vector index
+try:
+    from .local_vector_store import LocalVectorStore
+    LOCAL_VECTOR_STORE_AVAILABLE = True
+except ImportError:
+    LOCAL_VECTOR_STORE_AVAILABLE = False
+
 
 @dataclass
 class MemoryEntry:
@@ -42,47 +51,111 @@ class MemoryService:
     Manages persistent memory storage and retrieval.
     
     Features:
-    - JSON-based local storage
-    - Keyword search with scoring
-    - Semantic search via BigQuery vector store (optional)
+    - Pluggable storage: JSON journal (default) or SQLite/FTS5
+    - Keyword search ranked by BM25 inside the storage backend
+    - Semantic search via BigQuery or a local NumPy index (optional),
+      indexed asynchronously by a write-behind worker
     - Hybrid search combining keyword + semantic
-    - Tag-based filtering
+    - Bulk inserts with batched persistence and embedding
+    - O(1) id, tag and importance lookups
     - Importance levels
     - Recent memory listing
     """
     
-    def __init__(self, db_path: Optional[Path] = None, enable_semantic: bool = True):
+    def __init__(self, db_path: Optional[Path] = None, enable_semantic: bool = True,
+                 backend: Union[MemoryBackend, str, None] = None,
+                 vector_store: Any = None):
+        """
+        Initialize the memory service.
+        
+        Args:
+            db_path: Memory directory (defaults to MEMORY_DIR)
+            enable_semantic: Whether to connect the vector store
+            backend: MemoryBackend instance or name ("json"/"sqlite");
+                defaults to KAEDRA_MEMORY_BACKEND
+            vector_store: Vector store instance or name ("bigquery"/"local");
+                defaults to KAEDRA_VECTOR_BACKEND
+        """
         self.db_path = db_path or MEMORY_DIR
         self.db_path.mkdir(parents=True, exist_ok=True)
-        self.index_file = self.db_path / "memory_index.json"
-        self._index: List[Dict] = self._load_index()
+        
+        if isinstance(backend, MemoryBackend):
+            self.backend = backend
+        else:
+            self.backend = create_backend(backend, db_path)
         
         # Initialize vector store for semantic search
-        self.vector_store: Optional[BigQueryVectorStore] = None
+        self.vector_store = None
+        self.indexer: Optional[SemanticIndexer] = None
         self.semantic_enabled = False
         
-        if enable_semantic and VECTOR_STORE_AVAILABLE:
+        if enable_semantic:
             try:
-                self.vector_store = get_vector_store()
+                if vector_store is None or isinstance(vector_store, str):
+                    self.vector_store = self._create_vector_store(vector_store)
+                else:
+                    self.vector_store = vector_store
+                self.indexer = SemanticIndexer(
+                    self.vector_store,
+                    outbox_file=self.db_path / "semantic_outbox.jsonl"
+                )
                 self.semantic_enabled = True
-                print("[Memory] Semantic search enabled (BigQuery)")
+                print(f"[Memory] Semantic search enabled ({type(self.vector_store).__name__})")
             except Exception as e:
+                self.vector_store = None
                 print(f"[Memory] Semantic search unavailable: {e}")
     
-    def _load_index(self) -> List[Dict]:
-        """Load the memory index from disk."""
-        if self.index_file.exists():
-            try:
-                with open(self.index_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return []
-        return []
+    def _create_vector_store(self, name: Optional[str] = None):
+        """Build the vector store named by `name` or KAEDRA_VECTOR_BACKEND."""
+        name = (name or VECTOR_BACKEND).lower()
+        if name == "local":
+            if not LOCAL_VECTOR_STORE_AVAILABLE:
+                raise RuntimeError("local vector store requires numpy (pip install numpy)")
+            return LocalVectorStore(self.db_path)
+        if name == "bigquery":
+            if not VECTOR_STORE_AVAILABLE:
+                raise RuntimeError("google-cloud-bigquery is not installed")
+            return get_vector_store()
+        raise ValueError(f"Unknown vector backend: {name!r} (expected 'bigquery' or 'local')")
+    
+    def compact(self):
+        """Compact the storage backend (fold journal / optimize FTS)."""
+        self.backend.compact()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for queued semantic indexing to finish.
+        
+        Returns:
+            True if the queue drained within the timeout
+        """
+        if not self.indexer:
+            return True
+        return self.indexer.flush(timeout)
     
-    def _save_index(self):
-        """Save the memory index to disk."""
-        with open(self.index_file, 'w', encoding='utf-8') as f:
-            json.dump(self._index, f, indent=2, ensure_ascii=False)
+    def close(self):
+        """Stop the indexing worker (spilling pending work) and close storage."""
+        if self.indexer:
+            self.indexer.close()
+        if LOCAL_VECTOR_STORE_AVAILABLE and isinstance(self.vector_store, LocalVectorStore):
+            self.vector_store.save()
+        self.backend.close()
+    
+    @staticmethod
+    def _vector_item(entry: Dict) -> Dict:
+        """Build a vector store item for a stored entry."""
+        return {
+            'content': entry['content'],
+            'topic': entry['topic'],
+            'tags': entry['tags'],
+            'importance': entry['importance'],
+            'metadata': {'local_id': entry['id']}
+        }
+    
+    @staticmethod
+    def _new_id() -> str:
+        """Generate a unique memory id (timestamp + random suffix)."""
+        return f"mem_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:6]}"
     
     def insert(self, content: str, topic: str = "general", 
                tags: List[str] = None, importance: str = "normal",
@@ -101,7 +174,7 @@ class MemoryService:
             The memory ID
         """
         timestamp = datetime.now().isoformat()
-        memory_id = f"mem_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        memory_id = self._new_id()
         
         entry = MemoryEntry(
             id=memory_id,
@@ -112,40 +185,83 @@ class MemoryService:
             importance=importance
         )
         
-        # Save individual memory file
-        mem_file = self.db_path / f"{memory_id}.json"
         entry_dict = entry.to_dict()
         if metadata:
             entry_dict['metadata'] = metadata
-            
-        with open(mem_file, 'w', encoding='utf-8') as f:
-            json.dump(entry_dict, f, indent=2, ensure_ascii=False)
         
-        # Update index
-        self._index.append(entry_dict)
-        self._save_index()
+        self.backend.put(entry_dict)
         
-        # Also store in vector store for semantic search
-        if self.semantic_enabled and self.vector_store:
-            try:
-                self.vector_store.add_memory(
-                    content=content,
-                    topic=topic,
-                    tags=tags,
-                    importance=importance,
-                    metadata={'local_id': memory_id}
-                )
-            except Exception as e:
-                print(f"[Memory] Vector store sync failed: {e}")
+        # Queue for semantic indexing; returns without waiting on embeddings
+        if self.semantic_enabled and self.indexer:
+            self.indexer.submit(self._vector_item(entry_dict))
         
         return memory_id
     
+    def insert_many(self, entries: List[Dict]) -> List[Dict]:
+        """
+        Store many memory entries at once.
+        
+        All valid entries are persisted in one backend write and queued for
+        semantic indexing, which embeds them in as few calls as the model
+        allows and streams them to the vector store in batches.
+        
+        Args:
+            entries: Dicts with content and optional topic, tags,
+                importance and metadata (same fields as insert)
+        
+        Returns:
+            One {"id", "error"} dict per entry, in input order. id is None
+            and error is set when the entry was rejected.
+        """
+        results: List[Dict] = []
+        stored: List[Dict] = []
+        
+        for item in entries:
+            content = item.get('content')
+            if not content or not isinstance(content, str):
+                results.append({'id': None, 'error': "content is required"})
+                continue
+            
+            entry_dict = MemoryEntry(
+                id=self._new_id(),
+                topic=item.get('topic', 'general'),
+                content=content,
+                tags=list(item.get('tags') or []),
+                timestamp=datetime.now().isoformat(),
+                importance=item.get('importance', 'normal')
+            ).to_dict()
+            if item.get('metadata'):
+                entry_dict['metadata'] = item['metadata']
+            
+            stored.append(entry_dict)
+            results.append({'id': entry_dict['id'], 'error': None})
+        
+        if not stored:
+            return results
+        
+        try:
+            self.backend.put_many(stored)
+        except Exception as e:
+            for r in results:
+                if r['id'] is not None:
+                    r['id'], r['error'] = None, f"storage failed: {e}"
+            return results
+        
+        if self.semantic_enabled and self.indexer:
+            self.indexer.submit_many([self._vector_item(e) for e in stored])
+        
+        return results
+    
     def recall(self, query: str, top_k: int = 5, 
                tags: List[str] = None,
                min_importance: str = None) -> List[Dict]:
         """
         Search memory for relevant entries.
         
+        Entries are ranked by BM25 over topic, tags and content (topic and
+        tags boosted), plus a small importance boost. Only entries sharing
+        at least one term with the query are considered.
+        
         Args:
             query: Search query (keywords)
             top_k: Maximum number of results
@@ -155,127 +271,57 @@ class MemoryService:
         Returns:
             List of matching memory entries, scored and sorted
         """
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
-        scored = []
-        
-        importance_levels = {'low': 1, 'normal': 2, 'high': 3, 'critical': 4}
-        min_imp_value = importance_levels.get(min_importance, 0)
-        
-        for entry in self._index:
-            # Filter by importance
-            entry_imp = importance_levels.get(entry.get('importance', 'normal'), 2)
-            if entry_imp < min_imp_value:
-                continue
-            
-            # Filter by tags
-            if tags:
-                entry_tags = set(t.lower() for t in entry.get('tags', []))
-                if not any(t.lower() in entry_tags for t in tags):
-                    continue
-            
-            # Score by relevance
-            score = 0
-            
-            # Topic match (high weight)
-            topic_lower = entry.get('topic', '').lower()
-            if query_lower in topic_lower:
-                score += 5
-            for word in query_words:
-                if word in topic_lower:
-                    score += 2
-            
-            # Content match (medium weight)
-            content_lower = entry.get('content', '').lower()
-            if query_lower in content_lower:
-                score += 3
-            for word in query_words:
-                if word in content_lower:
-                    score += 1
-            
-            # Tag match (medium weight)
-            for tag in entry.get('tags', []):
-                tag_lower = tag.lower()
-                if query_lower in tag_lower:
-                    score += 2
-                for word in query_words:
-                    if word in tag_lower:
-                        score += 1
-            
-            # Importance boost
-            score += entry_imp * 0.5
-            
-            if score > 0:
-                scored.append((score, entry))
-        
-        # Sort by score descending
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return [entry for _, entry in scored[:top_k]]
+        return self.backend.search(query, top_k=top_k, tags=tags, min_importance=min_importance)
     
     def list_recent(self, limit: int = 10) -> List[Dict]:
         """Get the most recent memories."""
-        sorted_entries = sorted(
-            self._index,
-            key=lambda x: x.get('timestamp', ''),
-            reverse=True
-        )
-        return sorted_entries[:limit]
+        return self.backend.recent(limit)
     
     def get_by_id(self, memory_id: str) -> Optional[Dict]:
         """Retrieve a specific memory by ID."""
-        for entry in self._index:
-            if entry.get('id') == memory_id:
-                return entry
-        return None
+        return self.backend.get(memory_id)
     
     def delete(self, memory_id: str) -> bool:
         """Delete a memory entry."""
-        # Remove from index
-        self._index = [e for e in self._index if e.get('id') != memory_id]
-        self._save_index()
+        found = self.backend.delete(memory_id)
+        
+        # Pending indexing work would re-add the deleted memory
+        if self.indexer:
+            self.indexer.discard([memory_id])
+        
+        # The local index is keyed by memory id, so it can be kept in sync cheaply
+        if LOCAL_VECTOR_STORE_AVAILABLE and isinstance(self.vector_store, LocalVectorStore):
+            self.vector_store.delete_memory(memory_id)
         
-        # Remove file
+        # Remove per-entry file written by older versions
         mem_file = self.db_path / f"{memory_id}.json"
         if mem_file.exists():
             mem_file.unlink()
-            return True
-        return False
+            found = True
+        return found
     
     def search_by_tag(self, tag: str) -> List[Dict]:
         """Get all memories with a specific tag."""
-        tag_lower = tag.lower()
-        return [
-            entry for entry in self._index
-            if any(t.lower() == tag_lower for t in entry.get('tags', []))
-        ]
+        return self.backend.by_tag(tag)
     
     def get_stats(self) -> Dict:
         """Get memory statistics."""
-        total = len(self._index)
-        by_importance = {}
-        by_tag = {}
-        
-        for entry in self._index:
-            imp = entry.get('importance', 'normal')
-            by_importance[imp] = by_importance.get(imp, 0) + 1
-            
-            for tag in entry.get('tags', []):
-                by_tag[tag] = by_tag.get(tag, 0) + 1
-        
         return {
-            'total': total,
-            'by_importance': by_importance,
-            'top_tags': sorted(by_tag.items(), key=lambda x: x[1], reverse=True)[:10],
-            'semantic_enabled': self.semantic_enabled
+            **self.backend.stats(),
+            'backend': self.backend.name,
+            'semantic_enabled': self.semantic_enabled,
+            'indexing': self.indexer.stats() if self.indexer else None
         }
     
-    def semantic_recall(self, query: str, top_k: int = 5) -> List[Dict]:
+    def semantic_recall(self, query: str, top_k: int = 5, **filters) -> List[Dict]:
         """
         Search memories using semantic similarity (vector search).
         
         Args:
             query: Natural language search query
             top_k: Maximum results to return
+            **filters: Optional topic, tags, min_importance, since, until,
+                applied inside the vector store query
             
         Returns:
             List of semantically similar memories with similarity scores
@@ -284,7 +330,7 @@ class MemoryService:
             return []
         
         try:
-            results = self.vector_store.search_similar(query, limit=top_k)
+            results = self.vector_store.search_similar(query, limit=top_k, **filters)
             return results
         except Exception as e:
             print(f"[Memory] Semantic recall failed: {e}")
@@ -0,0 +1,639 @@
+"""
+KAEDRA v0.0.6 - Memory Storage Backends
+Pluggable persistence for MemoryService: JSON journal or SQLite/FTS5.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Dict, Optional, Set
+
+from ..core.config import MEMORY_DIR, MEMORY_BACKEND, MEMORY_SQLITE_PATH, IMPORTANCE_LEVELS
+from .keyword_index import KeywordIndex, tokenize
+
+
+# Rewrite the snapshot once the journal holds at least this many operations
+# (or as many as there are live entries, whichever is larger). Keeps every
+# write O(1) amortized while bounding replay time on startup.
+JOURNAL_COMPACT_MIN_OPS = 1000
+
+
+class MemoryBackend(ABC):
+    """
+    Storage interface behind MemoryService.
+
+    Entries are plain dicts with id, topic, content, tags, timestamp,
+    importance and optional metadata. Keyword ranking is owned by the
+    backend so each store can search where the data lives.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def put(self, entry: Dict):
+        """Insert or replace an entry."""
+
+    def put_many(self, entries: List[Dict]):
+        """Insert or replace several entries in a single write."""
+        for entry in entries:
+            self.put(entry)
+
+    @abstractmethod
+    def delete(self, memory_id: str) -> bool:
+        """Delete an entry. Returns True if it existed."""
+
+    @abstractmethod
+    def get(self, memory_id: str) -> Optional[Dict]:
+        """Fetch a single entry by id."""
+
+    @abstractmethod
+    def search(self, query: str, top_k: int = 5,
+               tags: List[str] = None,
+               min_importance: str = None) -> List[Dict]:
+        """Keyword search with tag and importance filters, best first."""
+
+    @abstractmethod
+    def by_tag(self, tag: str) -> List[Dict]:
+        """All entries carrying a tag (case-insensitive)."""
+
+    @abstractmethod
+    def recent(self, limit: int = 10) -> List[Dict]:
+        """Most recent entries, newest first."""
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """Counts: total, by_importance, top_tags."""
+
+    def compact(self):
+        """Reclaim space / fold logs. No-op unless the backend needs it."""
+
+    def close(self):
+        """Release any open resources."""
+
+
+class JsonMemoryBackend(MemoryBackend):
+    """
+    In-memory store persisted as a JSON snapshot plus JSONL journal.
+
+    Features:
+    - Append-only journal with tombstones for deletes
+    - Crash-safe replay and periodic compaction into the snapshot
+    - BM25 inverted index plus id, tag and importance hash indexes
+    - Thread-safe: one re-entrant lock covers the indexes, journal appends
+      and compaction, so a journal record always matches the index state
+    """
+
+    name = "json"
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or MEMORY_DIR
+        self.db_path.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.db_path / "memory_index.json"
+        self.journal_file = self.db_path / "memory_journal.jsonl"
+        self._journal_ops = 0
+        self._lock = threading.RLock()
+
+        # In-memory lookup structures, maintained incrementally.
+        # _by_id is the primary store (insertion ordered); the rest hold ids.
+        self._by_id: Dict[str, Dict] = {}
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._by_importance: Dict[str, Set[str]] = {}
+        self._keywords = KeywordIndex()
+        for entry in self._load_index():
+            self._index_entry(entry)
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # PERSISTENCE
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def _load_index(self) -> List[Dict]:
+        """Load the snapshot from disk and replay the journal on top of it."""
+        entries: Dict[str, Dict] = {}
+
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    for entry in json.load(f):
+                        entries[entry.get('id')] = entry
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"[Memory] Snapshot unreadable, replaying journal only: {e}")
+
+        for record in self._read_journal():
+            op = record.get('op')
+            if op == 'put':
+                entry = record.get('entry', {})
+                entries[entry.get('id')] = entry
+            elif op == 'del':
+                entries.pop(record.get('id'), None)
+            self._journal_ops += 1
+
+        return list(entries.values())
+
+    def _read_journal(self) -> List[Dict]:
+        """
+        Read all complete journal records.
+
+        A crash mid-append can leave a torn final line; it is truncated away
+        so the next append starts on a clean line boundary.
+        """
+        if not self.journal_file.exists():
+            return []
+
+        with open(self.journal_file, 'rb') as f:
+            data = f.read()
+
+        if data and not data.endswith(b'\n'):
+            cut = data.rfind(b'\n') + 1
+            print(f"[Memory] Discarding torn journal tail ({len(data) - cut} bytes)")
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(cut)
+            data = data[:cut]
+
+        records = []
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print("[Memory] Skipping corrupt journal record")
+        return records
+
+    def _append_journal(self, *records: Dict):
+        """Durably append operations to the journal, compacting when due."""
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with self._lock:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._journal_ops += len(records)
+            if self._journal_ops >= max(JOURNAL_COMPACT_MIN_OPS, len(self._by_id)):
+                self.compact()
+
+    def _save_index(self):
+        """Atomically write the full index snapshot to disk."""
+        tmp_file = self.index_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(list(self._by_id.values()), f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.index_file)
+
+    def compact(self):
+        """
+        Fold the journal into a fresh snapshot and truncate it.
+
+        Replaying puts and tombstones is idempotent, so a crash between the
+        snapshot swap and the truncate loses nothing.
+        """
+        with self._lock:
+            self._save_index()
+            with open(self.journal_file, 'w', encoding='utf-8'):
+                pass
+            self._journal_ops = 0
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # IN-MEMORY INDEXES
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def _index_entry(self, entry: Dict):
+        """Add an entry to the in-memory lookup structures."""
+        memory_id = entry.get('id')
+        if memory_id in self._by_id:
+            self._unindex_entry(memory_id)
+
+        self._by_id[memory_id] = entry
+        for tag in entry.get('tags', []):
+            self._by_tag.setdefault(tag.lower(), set()).add(memory_id)
+        self._by_importance.setdefault(entry.get('importance', 'normal'), set()).add(memory_id)
+        self._keywords.add(
+            memory_id,
+            topic=entry.get('topic', ''),
+            tags=entry.get('tags', []),
+            content=entry.get('content', '')
+        )
+
+    def _unindex_entry(self, memory_id: str):
+        """Remove an entry from the in-memory lookup structures."""
+        entry = self._by_id.pop(memory_id, None)
+        if entry is None:
+            return
+
+        for tag in entry.get('tags', []):
+            self._discard_from(self._by_tag, tag.lower(), memory_id)
+        self._discard_from(self._by_importance, entry.get('importance', 'normal'), memory_id)
+        self._keywords.remove(memory_id)
+
+    @staticmethod
+    def _discard_from(index: Dict[str, Set[str]], key: str, memory_id: str):
+        """Remove an id from a secondary index bucket, dropping empty buckets."""
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(memory_id)
+            if not ids:
+                del index[key]
+
+    def _filter_ids(self, tags: List[str] = None, min_importance: str = None) -> Optional[Set[str]]:
+        """
+        Resolve tag and importance filters to a candidate id set.
+
+        Returns None when no filter applies (every entry is a candidate).
+        """
+        candidates: Optional[Set[str]] = None
+
+        if tags:
+            candidates = set().union(*(self._by_tag.get(t.lower(), set()) for t in tags))
+
+        min_imp_value = IMPORTANCE_LEVELS.get(min_importance, 0)
+        if min_imp_value:
+            eligible = set().union(*(
+                ids for imp, ids in self._by_importance.items()
+                if IMPORTANCE_LEVELS.get(imp, 2) >= min_imp_value
+            ))
+            candidates = eligible if candidates is None else candidates & eligible
+
+        return candidates
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # BACKEND API
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def put(self, entry: Dict):
+        with self._lock:
+            self._index_entry(entry)
+            self._append_journal({'op': 'put', 'entry': entry})
+
+    def put_many(self, entries: List[Dict]):
+        with self._lock:
+            for entry in entries:
+                self._index_entry(entry)
+            self._append_journal(*({'op': 'put', 'entry': entry} for entry in entries))
+
+    def delete(self, memory_id: str) -> bool:
+        with self._lock:
+            if memory_id not in self._by_id:
+                return False
+            self._unindex_entry(memory_id)
+            self._append_journal({'op': 'del', 'id': memory_id})
+            return True
+
+    def get(self, memory_id: str) -> Optional[Dict]:
+        return self._by_id.get(memory_id)
+
+    def search(self, query: str, top_k: int = 5,
+               tags: List[str] = None,
+               min_importance: str = None) -> List[Dict]:
+        with self._lock:
+            candidates = self._filter_ids(tags, min_importance)
+            if candidates is not None and not candidates:
+                return []
+
+            scored = []
+            for memory_id, score in self._keywords.search(query, candidates).items():
+                entry = self._by_id[memory_id]
+
+                # Importance boost
+                entry_imp = IMPORTANCE_LEVELS.get(entry.get('importance', 'normal'), 2)
+                score += entry_imp * 0.5
+                scored.append((score, entry))
+
+        # Sort by score descending
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [entry for _, entry in scored[:top_k]]
+
+    def by_tag(self, tag: str) -> List[Dict]:
+        with self._lock:
+            return [self._by_id[mid] for mid in self._by_tag.get(tag.lower(), ())]
+
+    def recent(self, limit: int = 10) -> List[Dict]:
+        with self._lock:
+            return heapq.nlargest(
+                limit,
+                self._by_id.values(),
+                key=lambda x: x.get('timestamp', '')
+            )
+
+    def stats(self) -> Dict:
+        with self._lock:
+            by_tag = {tag: len(ids) for tag, ids in self._by_tag.items()}
+            return {
+                'total': len(self._by_id),
+                'by_importance': {imp: len(ids) for imp, ids in self._by_importance.items()},
+                'top_tags': sorted(by_tag.items(), key=lambda x: x[1], reverse=True)[:10],
+            }
+
+    def all_entries(self) -> List[Dict]:
+        """Every live entry, in insertion order."""
+        with self._lock:
+            return list(self._by_id.values())
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL DEFAULT '',
+    content TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '[]',
+    timestamp TEXT NOT NULL,
+    importance TEXT NOT NULL DEFAULT 'normal',
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories(timestamp);
+CREATE INDEX IF NOT EXISTS idx_memories_importance ON memories(importance);
+
+CREATE TABLE IF NOT EXISTS memory_tags (
+    tag TEXT NOT NULL,
+    memory_id TEXT NOT NULL,
+    PRIMARY KEY (tag, memory_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_memory_tags_id ON memory_tags(memory_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+    topic, tags, content,
+    content='memories', content_rowid='rowid', tokenize='unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+    INSERT INTO memories_fts(rowid, topic, tags, content)
+    VALUES (new.rowid, new.topic, new.tags, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, topic, tags, content)
+    VALUES ('delete', old.rowid, old.topic, old.tags, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_au AFTER UPDATE ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, topic, tags, content)
+    VALUES ('delete', old.rowid, old.topic, old.tags, old.content);
+    INSERT INTO memories_fts(rowid, topic, tags, content)
+    VALUES (new.rowid, new.topic, new.tags, new.content);
+END;
+"""
+
+# bm25() column weights for (topic, tags, content), matching KeywordIndex
+_FTS_WEIGHTS = "3.0, 2.0, 1.0"
+
+_IMPORTANCE_SQL = (
+    "CASE m.importance WHEN 'low' THEN 1 WHEN 'high' THEN 3 "
+    "WHEN 'critical' THEN 4 ELSE 2 END"
+)
+
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """
+    SQLite store with an FTS5 index over topic, tags and content.
+
+    Features:
+    - WAL mode: concurrent readers alongside a writer, safe across
+      processes (e.g. multiple uvicorn workers)
+    - Transactional writes, nothing loaded into RAM up front
+    - Keyword recall ranked by FTS5 bm25() inside the database
+    - One connection per thread, all tracked so close() releases every one
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_file: Optional[Path] = None, busy_timeout_ms: int = 5000):
+        self.db_file = Path(db_file or MEMORY_SQLITE_PATH)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self._generation = 0  # Bumped by close(); older thread-local connections are stale
+
+        conn = self._conn
+        with conn:
+            conn.executescript(_SQLITE_SCHEMA)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections are not thread-safe)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            # check_same_thread is off only so close() can release every
+            # thread's connection; each one is still used by its own thread
+            conn = sqlite3.connect(self.db_file, timeout=self.busy_timeout_ms / 1000,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            with self._conns_lock:
+                self._conns.append(conn)
+                self._local.conn = conn
+                self._local.generation = self._generation
+        return conn
+
+    @staticmethod
+    def _row_to_entry(row: sqlite3.Row) -> Dict:
+        entry = {
+            'id': row['id'],
+            'topic': row['topic'],
+            'content': row['content'],
+            'tags': json.loads(row['tags'] or '[]'),
+            'timestamp': row['timestamp'],
+            'importance': row['importance'],
+        }
+        if row['metadata']:
+            entry['metadata'] = json.loads(row['metadata'])
+        return entry
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """Build an FTS5 MATCH expression OR-ing the quoted query tokens."""
+        terms = dict.fromkeys(tokenize(query))
+        return " OR ".join('"{}"'.format(t.replace('"', '""')) for t in terms)
+
+    def _write_entry(self, conn: sqlite3.Connection, entry: Dict):
+        memory_id = entry['id']
+        tags = entry.get('tags', [])
+        metadata = entry.get('metadata')
+        conn.execute(
+            """
+            INSERT INTO memories (id, topic, content, tags, timestamp, importance, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                topic=excluded.topic, content=excluded.content, tags=excluded.tags,
+                timestamp=excluded.timestamp, importance=excluded.importance,
+                metadata=excluded.metadata
+            """,
+            (
+                memory_id,
+                entry.get('topic', ''),
+                entry.get('content', ''),
+                json.dumps(tags, ensure_ascii=False),
+                entry.get('timestamp', ''),
+                entry.get('importance', 'normal'),
+                json.dumps(metadata, ensure_ascii=False) if metadata else None,
+            )
+        )
+        conn.execute("DELETE FROM memory_tags WHERE memory_id = ?", (memory_id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO memory_tags (tag, memory_id) VALUES (?, ?)",
+            [(t.lower(), memory_id) for t in tags]
+        )
+
+    def put(self, entry: Dict):
+        conn = self._conn
+        with conn:
+            self._write_entry(conn, entry)
+
+    def put_many(self, entries: List[Dict]):
+        conn = self._conn
+        with conn:
+            for entry in entries:
+                self._write_entry(conn, entry)
+
+    def delete(self, memory_id: str) -> bool:
+        conn = self._conn
+        with conn:
+            conn.execute("DELETE FROM memory_tags WHERE memory_id = ?", (memory_id,))
+            cursor = conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
+        return cursor.rowcount > 0
+
+    def get(self, memory_id: str) -> Optional[Dict]:
+        row = self._conn.execute("SELECT * FROM memories WHERE id = ?", (memory_id,)).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def search(self, query: str, top_k: int = 5,
+               tags: List[str] = None,
+               min_importance: str = None) -> List[Dict]:
+        match = self._match_expression(query)
+        if not match:
+            return []
+
+        sql = f"""
+            SELECT m.*, (-bm25(memories_fts, {_FTS_WEIGHTS}) + {_IMPORTANCE_SQL} * 0.5) AS score
+            FROM memories_fts
+            JOIN memories m ON m.rowid = memories_fts.rowid
+            WHERE memories_fts MATCH ?
+        """
+        params: list = [match]
+
+        if tags:
+            placeholders = ",".join("?" * len(tags))
+            sql += f" AND m.id IN (SELECT memory_id FROM memory_tags WHERE tag IN ({placeholders}))"
+            params.extend(t.lower() for t in tags)
+
+        min_imp_value = IMPORTANCE_LEVELS.get(min_importance, 0)
+        if min_imp_value:
+            sql += f" AND {_IMPORTANCE_SQL} >= ?"
+            params.append(min_imp_value)
+
+        sql += " ORDER BY score DESC LIMIT ?"
+        params.append(top_k)
+
+        try:
+            rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"[Memory] FTS query failed: {e}")
+            return []
+        return [self._row_to_entry(row) for row in rows]
+
+    def by_tag(self, tag: str) -> List[Dict]:
+        rows = self._conn.execute(
+            """
+            SELECT m.* FROM memory_tags t JOIN memories m ON m.id = t.memory_id
+            WHERE t.tag = ? ORDER BY m.rowid
+            """,
+            (tag.lower(),)
+        ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def recent(self, limit: int = 10) -> List[Dict]:
+        rows = self._conn.execute(
+            "SELECT * FROM memories ORDER BY timestamp DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def stats(self) -> Dict:
+        conn = self._conn
+        total = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+        by_importance = dict(conn.execute(
+            "SELECT importance, COUNT(*) FROM memories GROUP BY importance"
+        ).fetchall())
+        top_tags = [tuple(r) for r in conn.execute(
+            "SELECT tag, COUNT(*) AS n FROM memory_tags GROUP BY tag ORDER BY n DESC LIMIT 10"
+        ).fetchall()]
+        return {
+            'total': total,
+            'by_importance': by_importance,
+            'top_tags': top_tags,
+        }
+
+    def compact(self):
+        """Merge FTS segments and checkpoint the WAL."""
+        conn = self._conn
+        with conn:
+            conn.execute("INSERT INTO memories_fts(memories_fts) VALUES ('optimize')")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        """Close the connections opened by every thread, not just this one."""
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+            self._generation += 1
+        for conn in conns:
+            conn.close()
+        self._local.conn = None
+
+
+def create_backend(name: str = None, db_path: Optional[Path] = None) -> MemoryBackend:
+    """
+    Build a memory backend by name ("json" or "sqlite").
+
+    Args:
+        name: Backend name (defaults to MEMORY_BACKEND from config)
+        db_path: Memory directory; the SQLite file lives inside it when given
+    """
+    name = (name or MEMORY_BACKEND).lower()
+    if name == "sqlite":
+        db_file = (db_path / "memory.db") if db_path else None
+        return SQLiteMemoryBackend(db_file)
+    if name == "json":
+        return JsonMemoryBackend(db_path)
+    raise ValueError(f"Unknown memory backend: {name}")
+
+
+def import_json_index(source_dir: Path, target: MemoryBackend) -> int:
+    """
+    Import an existing memory_index.json (plus any pending journal) into
+    another backend.
+
+    Args:
+        source_dir: Directory containing memory_index.json
+        target: Backend to write into
+
+    Returns:
+        Number of entries imported
+    """
+    entries = JsonMemoryBackend(Path(source_dir)).all_entries()
+    target.put_many(entries)
+    return len(entries)
+
+
+def main():
+    """Migration entry point: python -m kaedra.services.memory_store"""
+    parser = argparse.ArgumentParser(description="Import a JSON memory index into SQLite.")
+    parser.add_argument("--source", type=Path, default=MEMORY_DIR,
+                        help="Directory containing memory_index.json")
+    parser.add_argument("--db", type=Path, default=MEMORY_SQLITE_PATH,
+                        help="SQLite database file to create or update")
+    args = parser.parse_args()
+
+    target = SQLiteMemoryBackend(args.db)
+    count = import_json_index(args.source, target)
+    target.compact()
+    target.close()
+    print(f"[Memory] Imported {count} entries from {args.source} into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+KAEDRA v0.0.6 - Model Router
+Picks flash or pro per request: cheap features decide where to start, and a
+flash answer that fails a self-check or heuristic is escalated to pro.
+"""
+
+import logging
+import re
+import statistics
+import threading
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..core.config import (
+    MODEL_COSTS, ROUTER_FAST_MODEL, ROUTER_STRONG_MODEL, ROUTER_LONG_PROMPT_TOKENS,
+    ROUTER_STRONG_SCORE, ROUTER_SELF_CHECK, ROUTER_MIN_CONFIDENCE, ROUTER_MIN_ANSWER_CHARS,
+    ROUTER_STRONG_STRATEGIES
+)
+from .usage import estimate_tokens
+
+
+logger = logging.getLogger("kaedra.services.model_router")
+
+_HARD_INTENT = re.compile(
+    r"\b(prove|derive|step[- ]by[- ]step|architect\w*|design|refactor|debug|root cause|analy[sz]e|"
+    r"compare|trade-?offs?|optimi[sz]e|explain why|in depth|comprehensive|report)\b",
+    re.IGNORECASE
+)
+_CODE = re.compile(r"```|\bTraceback \(most recent call last\)|^\s*(def|class|function|import) ", re.MULTILINE)
+_NEEDS_TOOLS = re.compile(
+    r"\b(search|look up|latest|today|right now|current(ly)?|news|price|weather|trending)\b",
+    re.IGNORECASE
+)
+_REFUSAL = re.compile(
+    r"^\W*(I('m| am) (sorry|unable|not able)|I can(no|')t (help|assist|do|answer|provide)|"
+    r"As an AI\b|I don't have (enough|access))",
+    re.IGNORECASE
+)
+_CONFIDENCE = re.compile(r"\n?[ \t*_]*CONFIDENCE\W*(\d+(?:\.\d+)?)\W*\s*$", re.IGNORECASE)
+
+SELF_CHECK_INSTRUCTION = (
+    "\n\nAfter your answer, add one final line 'CONFIDENCE: <0-10>' rating how sure "
+    "you are that the answer is complete and correct."
+)
+
+
+@dataclass
+class RouteFeatures:
+    """Cheap request features the route is chosen from."""
+    prompt_tokens: int
+    hard_intent: bool
+    code: bool
+    needs_tools: bool
+    strategy: Optional[str]
+
+    @property
+    def score(self) -> int:
+        """Difficulty score; ROUTER_STRONG_SCORE or more starts on the strong model."""
+        return (
+            2 * (self.prompt_tokens > ROUTER_LONG_PROMPT_TOKENS)
+            + 2 * self.hard_intent
+            + self.code
+            + self.needs_tools
+            + 3 * (self.strategy in ROUTER_STRONG_STRATEGIES)
+        )
+
+
+@dataclass
+class RoutingDecision:
+    """Where a request started, where it ended and why."""
+    start: str                                 # Model key tried first
+    model_key: str                             # Model key that produced the answer
+    features: RouteFeatures
+    cascade: bool = False                      # Started on fast with escalation armed
+    escalated: bool = False
+    reason: Optional[str] = None               # Escalation reason
+    confidence: Optional[float] = None         # Fast model's self-rated confidence
+    # (model key, latency_ms, cached): cached attempts were served without a model call
+    attempts: List[Tuple[str, float, bool]] = field(default_factory=list)
+
+    @property
+    def latency_ms(self) -> float:
+        return sum(latency for _, latency, _ in self.attempts)
+
+    @property
+    def cost_usd(self) -> float:
+        """Estimated cost from MODEL_COSTS (per query, per attempt that called the model)."""
+        return sum(MODEL_COSTS.get(key, 0.0) for key, _, cached in self.attempts if not cached)
+
+    @property
+    def cached(self) -> bool:
+        """True if every attempt was served from a cache (nothing was spent)."""
+        return bool(self.attempts) and all(cached for _, _, cached in self.attempts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start": self.start,
+            "model_key": self.model_key,
+            "score": self.features.score,
+            "features": asdict(self.features),
+            "escalated": self.escalated,
+            "reason": self.reason,
+            "confidence": self.confidence,
+            "attempts": [
+                {"model_key": key, "latency_ms": latency, "cached": cached}
+                for key, latency, cached in self.attempts
+            ],
+            "cost_usd": self.cost_usd,
+        }
+
+
+class ModelRouter:
+    """
+    Routes a request to the fast or the strong model.
+
+    Features:
+    - Starting model from cheap features: prompt length, intent keywords,
+      code, tool/freshness needs and the calling strategy
+    - Confidence cascade: the fast model also rates its own answer
+      (one extra line, no extra call); a low rating, a refusal, an error or
+      a too-short answer to a hard prompt is retried on the strong model
+    - Cost accounting from MODEL_COSTS, compared against always-strong
+      (attempts answered from the response cache cost nothing)
+    - Routing metrics: requests per start/final model, escalation reasons,
+      p50/p95 latency per final model
+    """
+
+    def __init__(self,
+                 fast_model: str = ROUTER_FAST_MODEL,
+                 strong_model: str = ROUTER_STRONG_MODEL,
+                 self_check: bool = ROUTER_SELF_CHECK,
+                 min_confidence: float = ROUTER_MIN_CONFIDENCE,
+                 min_answer_chars: int = ROUTER_MIN_ANSWER_CHARS,
+                 latency_window: int = 500):
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.self_check = self_check
+        self.min_confidence = min_confidence
+        self.min_answer_chars = min_answer_chars
+        self._lock = threading.Lock()
+        self._latency_window = latency_window
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self._started: Dict[str, int] = {}
+            self._answered: Dict[str, int] = {}
+            self._reasons: Dict[str, int] = {}
+            self._latencies: Dict[str, Deque[float]] = {}
+            self.cost_usd = 0.0
+            self.strong_cost_usd = 0.0   # What the same requests would cost on strong only
+
+    @staticmethod
+    def features(prompt: str, agent: str = None) -> RouteFeatures:
+        tail = prompt[-4000:]  # Intent lives near the end (after profile/context)
+        return RouteFeatures(
+            prompt_tokens=estimate_tokens(prompt),
+            hard_intent=bool(_HARD_INTENT.search(tail)),
+            code=bool(_CODE.search(prompt)),
+            needs_tools=bool(_NEEDS_TOOLS.search(tail)),
+            strategy=agent.upper() if agent else None
+        )
+
+    def route(self, prompt: str, agent: str = None, cascade: bool = True) -> RoutingDecision:
+        """
+        Choose the starting model.
+
+        Args:
+            prompt: Full prompt (system instruction included)
+            agent: Calling agent/strategy name (e.g. "RESEARCH")
+            cascade: Whether the caller can escalate a fast answer
+                (False for streams, which are already on screen)
+        """
+        features = self.features(prompt, agent)
+        start = self.strong_model if features.score >= ROUTER_STRONG_SCORE else self.fast_model
+        return RoutingDecision(
+            start=start,
+            model_key=start,
+            features=features,
+            cascade=cascade and start == self.fast_model
+        )
+
+    def prepare(self, decision: RoutingDecision, prompt: str) -> str:
+        """Prompt for the first attempt: adds the self-check line request when cascading."""
+        if decision.cascade and self.self_check:
+            return prompt + SELF_CHECK_INSTRUCTION
+        return prompt
+
+    def review(self, decision: RoutingDecision, text: str, error: Any = None) -> Tuple[str, Optional[str]]:
+        """
+        Check a fast answer.
+
+        Returns:
+            (text without the self-check line, escalation reason or None)
+        """
+        match = _CONFIDENCE.search(text) if decision.cascade and self.self_check else None
+        if match:
+            decision.confidence = float(match.group(1))
+            text = text[:match.start()].rstrip()
+        if not decision.cascade:
+            return text, None
+
+        if error is not None:
+            return text, "error"
+        if not text.strip():
+            return text, "empty"
+        if _REFUSAL.search(text[:200]):
+            return text, "refusal"
+        if decision.features.hard_intent and len(text.strip()) < self.min_answer_chars:
+            return text, "too_short"
+        if decision.confidence is not None and decision.confidence < self.min_confidence:
+            return text, "low_confidence"
+        return text, None
+
+    def escalate(self, decision: RoutingDecision, reason: str):
+        decision.escalated = True
+        decision.reason = reason
+        decision.model_key = self.strong_model
+        logger.info(f"Routing: {decision.start} -> {self.strong_model} ({reason})")
+
+    def record(self, decision: RoutingDecision):
+        """Add a finished request to the routing metrics."""
+        with self._lock:
+            self.requests += 1
+            self._started[decision.start] = self._started.get(decision.start, 0) + 1
+            self._answered[decision.model_key] = self._answered.get(decision.model_key, 0) + 1
+            if decision.reason:
+                self._reasons[decision.reason] = self._reasons.get(decision.reason, 0) + 1
+            self._latencies.setdefault(
+                decision.model_key, deque(maxlen=self._latency_window)
+            ).append(decision.latency_ms)
+            self.cost_usd += decision.cost_usd
+            if not decision.cached:
+                self.strong_cost_usd += MODEL_COSTS.get(self.strong_model, 0.0)
+        logger.debug(f"Routed: {decision.to_dict()}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            escalations = sum(self._reasons.values())
+            return {
+                "requests": self.requests,
+                "started": dict(self._started),
+                "answered": dict(self._answered),
+                "escalations": escalations,
+                "escalation_rate": escalations / self.requests if self.requests else 0.0,
+                "escalation_reasons": dict(self._reasons),
+                "latency_ms": {
+                    key: {
+                        "p50": statistics.median(values),
+                        "p95": sorted(values)[int(0.95 * (len(values) - 1))],
+                    }
+                    for key, values in self._latencies.items() if values
+                },
+                "cost_usd": round(self.cost_usd, 4),
+                "strong_only_cost_usd": round(self.strong_cost_usd, 4),
+            }
+
+
+# Shared instance so routing metrics cover every PromptService in a process
+_model_router: Optional[ModelRouter] = None
+_model_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Get the global model router."""
+    global _model_router
+    with _model_router_lock:
+        if _model_router is None:
+            _model_router = ModelRouter()
+    return _model_router
@@ -280,8 +280,8 @@ class NotionService:
             topic=page.title,
             content=page.content,
             tags=["notion", "sync"],
-            source="notion",
             metadata={
+                "source": "notion",
                 "notion_page_id": page_id,
                 "notion_url": page.url,
                 "synced_at": datetime.now().isoformat()
@@ -308,49 +308,75 @@ class NotionService:
         if not self.memory:
             raise NotionError("Memory service not configured")
         
-        entry = self.memory.get(memory_id)
+        entry = self.memory.get_by_id(memory_id)
         if not entry:
             raise NotionError(f"Memory entry not found: {memory_id}")
         
+        tags = entry.get("tags", [])
         if page_id:
-            self.update_page(page_id, content=entry.content)
+            self.update_page(page_id, content=entry["content"])
             return page_id
         else:
             return self.create_page(
-                title=entry.topic,
-                content=entry.content,
+                title=entry.get("topic", "general"),
+                content=entry["content"],
                 properties={
-                    "Tags": {"multi_select": [{"name": tag} for tag in entry.tags]}
-                } if entry.tags else None
+                    "Tags": {"multi_select": [{"name": tag} for tag in tags]}
+                } if tags else None
             )
     
-    async def sync_database_to_memory(self, database_id: str = None) -> int:
+    async def sync_database_to_memory(self, database_id: str = None, concurrency: int = 8) -> int:
         """
         Sync all pages in a database to memory.
         
+        Pages are fetched concurrently and stored with a single
+        MemoryService.insert_many call.
+        
         Returns:
             Number of pages synced
         """
+        if not self.memory:
+            raise NotionError("Memory service not configured")
+        
         pages = self.query_database(database_id)
-        count = 0
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(page_id: str) -> Optional[NotionPage]:
+            async with semaphore:
+                try:
+                    return await self.get_page_async(page_id)
+                except Exception as e:
+                    logger.warning(f"Failed to fetch page {page_id}: {e}")
+                    return None
+        
+        full_pages = [
+            p for p in await asyncio.gather(*(fetch(page.id) for page in pages))
+            if p and self._sync_hashes.get(p.id) != self._content_hash(p.content)
+        ]
+        
+        results = self.memory.insert_many([
+            {
+                "topic": full_page.title,
+                "content": full_page.content,
+                "tags": ["notion", "sync"],
+                "metadata": {
+                    "source": "notion",
+                    "notion_page_id": full_page.id,
+                    "notion_url": full_page.url
+                }
+            }
+            for full_page in full_pages
+        ])
         
-        for page in pages:
-            try:
-                full_page = await self.get_page_async(page.id)
-                
-                self.memory.insert(
-                    topic=full_page.title,
-                    content=full_page.content,
-                    tags=["notion", "sync"],
-                    source="notion",
-                    metadata={
-                        "notion_page_id": full_page.id,
-                        "notion_url": full_page.url
-                    }
-                )
-                count += 1
-            except Exception as e:
-                logger.warning(f"Failed to sync page {page.id}: {e}")
+        count = 0
+        for full_page, result in zip(full_pages, results):
+            if result["id"] is None:
+                logger.warning(f"Failed to sync page {full_page.id}: {result['error']}")
+                continue
+            if result["error"]:
+                logger.warning(f"Page {full_page.id} stored without semantic index: {result['error']}")
+            self._sync_hashes[full_page.id] = self._content_hash(full_page.content)
+            count += 1
         
         self._last_sync = datetime.now()
         return count
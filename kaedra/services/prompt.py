@@ -3,16 +3,60 @@ KAEDRA v0.0.6 - Prompt Service
 Handles LLM interactions with Vertex AI / Gemini.
 """
 
+import asyncio
 import time
-from typing import Optional, Generator, Dict, Any, List
-from dataclasses import dataclass
+import weakref
+from contextlib import AsyncExitStack, ExitStack
+from contextvars import ContextVar
+from typing import Optional, Generator, AsyncIterator, Awaitable, Callable, Dict, Any, List, Tuple
+from dataclasses import dataclass, replace
 
-import vertexai
 import vertexai
 from vertexai.generative_models import GenerativeModel, Tool
-from vertexai.language_models import TextEmbeddingModel
 
-from ..core.config import MODELS, PROJECT_ID, LOCATION, MODEL_LOCATION, DEFAULT_MODEL
+from ..core.config import MODELS, PROJECT_ID, LOCATION, MODEL_LOCATION, DEFAULT_MODEL, AUTO_MODEL_KEY, ROUTER_ENABLED
+from ..core.exceptions import KaedraError
+from .cache import ResponseCache, get_response_cache
+from .model_router import ModelRouter, RoutingDecision, get_model_router
+from .embedding import get_embedding_service
+from .rate_limit import Admission, AdmissionController, get_admission_controller
+from .retry import Retrier, to_kaedra_error
+from .singleflight import SingleFlight
+from .usage import TokenUsage, UsageTracker, estimate_tokens, get_usage_tracker, usage_from_response
+
+
+# Model name of the stream being consumed in this context. Async generators
+# run in their consumer's context, so it is readable once the first chunk
+# (or the error) arrives.
+_stream_model: ContextVar[Optional[str]] = ContextVar("kaedra_stream_model", default=None)
+# Whether that stream's answer used search grounding (known once it is drained)
+_stream_grounded: ContextVar[bool] = ContextVar("kaedra_stream_grounded", default=False)
+
+_GROUNDING_FIELDS = ("web_search_queries", "grounding_chunks", "grounding_attributions", "retrieval_queries")
+
+
+def streamed_model() -> Optional[str]:
+    """Model serving the latest generate_stream_async in this context (routed under /auto)."""
+    return _stream_model.get()
+
+
+def streamed_grounded() -> bool:
+    """True if the latest drained generate_stream_async in this context used search grounding."""
+    return _stream_grounded.get()
+
+
+def response_grounded(response: Any) -> bool:
+    """
+    True if a Gemini response (or stream chunk) actually used search grounding.
+    
+    With the search tool enabled the model still answers most prompts
+    without searching; only non-empty grounding metadata counts.
+    """
+    for candidate in getattr(response, "candidates", None) or ():
+        metadata = getattr(candidate, "grounding_metadata", None)
+        if metadata and any(getattr(metadata, name, None) for name in _GROUNDING_FIELDS):
+            return True
+    return False
 
 
 @dataclass
@@ -21,8 +65,20 @@ class PromptResult:
     text: str
     model: str
     latency_ms: float
-    grounded: bool = False
+    grounded: bool = False               # The answer used live search results
     metadata: Optional[Dict] = None
+    error: Optional[KaedraError] = None  # Set when generation failed after retries
+    usage: Optional[TokenUsage] = None   # Prompt/completion/cached token counts
+    
+    @property
+    def ok(self) -> bool:
+        """False if generation failed (text is then only a display message)."""
+        return self.error is None
+    
+    def raise_for_error(self):
+        """Raise the structured error (RateLimitError, PromptError, ...) if any."""
+        if self.error is not None:
+            raise self.error
 
 
 class PromptService:
@@ -32,16 +88,33 @@ class PromptService:
     Features:
     - Multiple model support (flash/pro/ultra)
     - Google Search grounding
-    - Streaming responses
-    - Retry logic with exponential backoff
+    - Streaming responses (sync generator and async iterator)
+    - Non-blocking async generation
+    - Retries on 429/5xx/timeouts with jittered backoff, Retry-After and a
+      shared retry budget; failures come back as PromptResult.error
+    - Per-model admission control (max in flight, RPM/TPM buckets)
+    - Identical concurrent requests share one upstream call
     - Latency tracking
+    - Token usage per call (PromptResult.usage), rolled up per model,
+      agent and session by a UsageTracker
+    - Opt-in exact-match response cache (hit/miss in PromptResult.metadata)
+    - Model routing (model_key="auto", or every unpinned call when
+      auto_route is on): flash first, escalated to pro when the answer
+      fails a self-check; the decision is in PromptResult.metadata["route"]
+    - Embeddings via the shared EmbeddingService
     """
     
     def __init__(self, 
                  model_key: str = DEFAULT_MODEL,
                  project: str = PROJECT_ID,
                  location: str = LOCATION,
-                 enable_grounding: bool = True):
+                 enable_grounding: bool = True,
+                 response_cache: Optional[ResponseCache] = None,
+                 retrier: Optional[Retrier] = None,
+                 admission: Optional[AdmissionController] = None,
+                 usage_tracker: Optional[UsageTracker] = None,
+                 router: Optional[ModelRouter] = None,
+                 auto_route: bool = ROUTER_ENABLED):
         """
         Initialize the prompt service.
         
@@ -50,6 +123,13 @@ class PromptService:
             project: GCP project ID
             location: GCP region
             enable_grounding: Whether to enable Google Search grounding
+            response_cache: Response cache (defaults to the shared one when
+                KAEDRA_RESPONSE_CACHE=true)
+            retrier: Retry policy/budget for model calls
+            admission: Per-model concurrency/rate limits (shared by default)
+            usage_tracker: Token usage roll-up (shared by default)
+            router: Model router for "auto" requests (shared by default)
+            auto_route: Route calls that don't pin a model_key
         """
         self.project = project
         self.location = location
@@ -63,6 +143,15 @@ class PromptService:
         
         # Model cache
         self._models: Dict[str, GenerativeModel] = {}
+        self._async_models: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+        self.retrier = retrier or Retrier()
+        self.admission = admission or get_admission_controller()
+        self.inflight = SingleFlight()
+        self.usage = usage_tracker or get_usage_tracker()
+        self.router = router or get_model_router()
+        self.auto_route = auto_route
     
     @property
     def current_model(self) -> str:
@@ -88,84 +177,342 @@ class PromptService:
             self._current_model_key = model_key
         return self.current_model
     
+    def _build_model(self, model_name: str) -> GenerativeModel:
+        """Create a GenerativeModel, with grounding when enabled."""
+        try:
+            if self.enable_grounding:
+                tools = [
+                    Tool.from_google_search_retrieval(
+                        google_search_retrieval=vertexai.generative_models.GoogleSearchRetrieval()
+                    ),
+                ]
+                return GenerativeModel(model_name, tools=tools)
+            return GenerativeModel(model_name)
+        except Exception:
+            # Fallback without grounding
+            return GenerativeModel(model_name)
+    
     def _get_model(self, model_key: str = None) -> GenerativeModel:
         """Get or create a GenerativeModel instance."""
         key = model_key or self._current_model_key
         model_name = MODELS.get(key, MODELS[DEFAULT_MODEL])
         
         if model_name not in self._models:
-            try:
-                if self.enable_grounding:
-                    tools = [
-                        Tool.from_google_search_retrieval(
-                            google_search_retrieval=vertexai.generative_models.GoogleSearchRetrieval()
-                        ),
-                    ]
-                    self._models[model_name] = GenerativeModel(model_name, tools=tools)
-                else:
-                    self._models[model_name] = GenerativeModel(model_name)
-            except Exception:
-                # Fallback without grounding
-                self._models[model_name] = GenerativeModel(model_name)
+            self._models[model_name] = self._build_model(model_name)
         
         return self._models[model_name]
     
+    def _get_async_model(self, model_key: str = None) -> GenerativeModel:
+        """
+        Get a GenerativeModel for the running event loop.
+        
+        The SDK's async client is bound to the loop it was first used on,
+        so run_sync callers (a fresh loop per call) get their own instance.
+        """
+        key = model_key or self._current_model_key
+        model_name = MODELS.get(key, MODELS[DEFAULT_MODEL])
+        
+        models = self._async_models.setdefault(asyncio.get_running_loop(), {})
+        if model_name not in models:
+            models[model_name] = self._build_model(model_name)
+        return models[model_name]
+    
+    @staticmethod
+    def _full_prompt(prompt: str, system_instruction: str = None) -> str:
+        """Prepend the system instruction, if any."""
+        if system_instruction:
+            return f"{system_instruction}\n\n{prompt}"
+        return prompt
+    
+    def _result(self, response, model_name: str, start_time: float,
+                usage: TokenUsage = None, agent: str = None) -> PromptResult:
+        """Result for a fresh upstream call; its usage is rolled up."""
+        result = PromptResult(
+            text=response.text if hasattr(response, 'text') else str(response),
+            model=model_name,
+            latency_ms=(time.time() - start_time) * 1000,
+            grounded=response_grounded(response),
+            usage=usage
+        )
+        if usage is not None:
+            self.usage.record(usage, model_name, agent, result.latency_ms)
+        return result
+    
+    @staticmethod
+    def _error_result(error: Exception, model_name: str, start_time: float) -> PromptResult:
+        error = to_kaedra_error(error, model_name)
+        return PromptResult(
+            text=f"[ERROR] Generation failed: {error}",
+            model=model_name,
+            latency_ms=(time.time() - start_time) * 1000,
+            metadata={'error': error.to_dict()},
+            error=error
+        )
+    
+    @staticmethod
+    def _estimate_tokens(full_prompt: str, max_tokens: int) -> int:
+        """Worst-case tokens to reserve: estimated input plus max output."""
+        return estimate_tokens(full_prompt) + max_tokens
+    
+    @staticmethod
+    def _settle(admission: Optional[Admission], full_prompt: str, response, text: str = None) -> TokenUsage:
+        """Read the call's token usage and refund the unused part of its reservation."""
+        usage = usage_from_response(response, full_prompt, text)
+        if admission is not None:
+            admission.settle(usage.total_tokens)
+        return usage
+    
+    # Every attempt the retrier makes is admitted on its own: a retry takes a
+    # fresh slot and token reservation instead of reusing the first one.
+    
+    def _call_admitted(self, call: Callable[[], Any], model_name: str, full_prompt: str,
+                       max_tokens: int) -> Tuple[Any, TokenUsage]:
+        """Run `call` under the retrier, admitting each attempt; returns (response, usage)."""
+        def attempt():
+            with self.admission.admit(model_name, self._estimate_tokens(full_prompt, max_tokens)) as admission:
+                response = call()
+                return response, self._settle(admission, full_prompt, response)
+        return self.retrier.call(attempt, model_name)
+    
+    async def _call_admitted_async(self, call: Callable[[], Awaitable[Any]], model_name: str,
+                                   full_prompt: str, max_tokens: int) -> Tuple[Any, TokenUsage]:
+        """Async version of _call_admitted."""
+        async def attempt():
+            async with self.admission.admit_async(
+                model_name, self._estimate_tokens(full_prompt, max_tokens)
+            ) as admission:
+                response = await call()
+                return response, self._settle(admission, full_prompt, response)
+        return await self.retrier.call_async(attempt, model_name)
+    
+    def _open_stream(self, open_stream: Callable[[], Any], model_name: str, full_prompt: str,
+                     max_tokens: int) -> Tuple[Any, Optional[Admission], ExitStack]:
+        """
+        Open a stream under the retrier, admitting each attempt.
+        
+        Returns:
+            (stream, admission, stack); closing the stack releases the
+            admission, so hold it until the stream is drained
+        """
+        def attempt():
+            stack = ExitStack()
+            admission = stack.enter_context(
+                self.admission.admit(model_name, self._estimate_tokens(full_prompt, max_tokens))
+            )
+            try:
+                return open_stream(), admission, stack
+            except BaseException:
+                stack.close()
+                raise
+        return self.retrier.call(attempt, model_name)
+    
+    async def _open_stream_async(self, open_stream: Callable[[], Awaitable[Any]], model_name: str,
+                                 full_prompt: str, max_tokens: int) -> Tuple[Any, Optional[Admission], AsyncExitStack]:
+        """Async version of _open_stream."""
+        async def attempt():
+            stack = AsyncExitStack()
+            admission = await stack.enter_async_context(
+                self.admission.admit_async(model_name, self._estimate_tokens(full_prompt, max_tokens))
+            )
+            try:
+                return await open_stream(), admission, stack
+            except BaseException:
+                await stack.aclose()
+                raise
+        return await self.retrier.call_async(attempt, model_name)
+    
+    # ══════════════════════════════════════════════════════════════════════════
+    # MODEL ROUTING
+    # ══════════════════════════════════════════════════════════════════════════
+    
+    def _routed(self, model_key: Optional[str]) -> bool:
+        """True if the router should pick the model for this call."""
+        return model_key == AUTO_MODEL_KEY or (model_key is None and self.auto_route)
+    
+    def _review_route(self, decision: RoutingDecision, result: PromptResult) -> PromptResult:
+        """Strip the self-check line from a first attempt; escalate the decision if it failed."""
+        decision.attempts.append((decision.start, result.latency_ms, self._served_without_call(result)))
+        text, reason = self.router.review(decision, result.text, result.error)
+        if reason:
+            self.router.escalate(decision, reason)
+        return replace(result, text=text)
+    
+    @staticmethod
+    def _served_without_call(result: PromptResult) -> bool:
+        """True for a response cache hit or a follower of another in-flight call."""
+        metadata = result.metadata or {}
+        return metadata.get('cache') == 'hit' or bool(metadata.get('coalesced'))
+    
+    def _routed_result(self, decision: RoutingDecision, result: PromptResult,
+                       escalated: Optional[PromptResult] = None) -> PromptResult:
+        """Final result of a routed call: both attempts' usage, plus the decision."""
+        usage = result.usage
+        if escalated is not None:
+            decision.attempts.append((decision.model_key, escalated.latency_ms, self._served_without_call(escalated)))
+            if usage is not None and escalated.usage is not None:
+                usage = usage + escalated.usage
+            else:
+                usage = escalated.usage
+            result = escalated
+        self.router.record(decision)
+        return replace(
+            result,
+            latency_ms=decision.latency_ms,
+            usage=usage,
+            metadata={**(result.metadata or {}), 'route': decision.to_dict()}
+        )
+    
+    def _generate_routed(self, prompt: str, system_instruction: str, temperature: float,
+                         max_tokens: int, bypass_cache: bool, agent: str) -> PromptResult:
+        decision = self.router.route(self._full_prompt(prompt, system_instruction), agent)
+        result = self._review_route(decision, self.generate(
+            self.router.prepare(decision, prompt), decision.start, system_instruction,
+            temperature, max_tokens, bypass_cache, agent
+        ))
+        if not decision.escalated:
+            return self._routed_result(decision, result)
+        return self._routed_result(decision, result, self.generate(
+            prompt, decision.model_key, system_instruction, temperature, max_tokens, bypass_cache, agent
+        ))
+    
+    async def _generate_routed_async(self, prompt: str, system_instruction: str, temperature: float,
+                                     max_tokens: int, bypass_cache: bool, agent: str) -> PromptResult:
+        decision = self.router.route(self._full_prompt(prompt, system_instruction), agent)
+        result = self._review_route(decision, await self.generate_async(
+            self.router.prepare(decision, prompt), decision.start, system_instruction,
+            temperature, max_tokens, bypass_cache, agent
+        ))
+        if not decision.escalated:
+            return self._routed_result(decision, result)
+        return self._routed_result(decision, result, await self.generate_async(
+            prompt, decision.model_key, system_instruction, temperature, max_tokens, bypass_cache, agent
+        ))
+    
+    # ══════════════════════════════════════════════════════════════════════════
+    # RESPONSE CACHE
+    # ══════════════════════════════════════════════════════════════════════════
+    
+    def _request_key(self, prompt: str, model_name: str, system_instruction: str,
+                     temperature: float, max_tokens: int) -> str:
+        """Identity of a request, shared by the response cache and coalescing."""
+        return ResponseCache.key(
+            model_name, prompt, system_instruction, temperature, max_tokens, self.enable_grounding
+        )
+    
+    def _cache_key(self, request_key: str, bypass_cache: bool) -> Optional[str]:
+        if self.response_cache is None or bypass_cache:
+            return None
+        return request_key
+    
+    @staticmethod
+    def _coalesced(result: PromptResult, shared: bool) -> PromptResult:
+        """Followers get their own copy, tagged as coalesced."""
+        if not shared:
+            return result
+        return replace(result, metadata={**(result.metadata or {}), 'coalesced': True})
+    
+    def _cache_metadata(self, status: str) -> Dict[str, Any]:
+        metadata: Dict[str, Any] = {'cache': status}
+        if self.response_cache is not None:
+            metadata['cache_stats'] = self.response_cache.stats()
+        return metadata
+    
+    def _cached_result(self, cache_key: Optional[str], start_time: float) -> Optional[PromptResult]:
+        """PromptResult for a cache hit, or None."""
+        if cache_key is None:
+            return None
+        hit = self.response_cache.get(cache_key)
+        if hit is None:
+            return None
+        return PromptResult(
+            text=hit['text'],
+            model=hit['model'],
+            latency_ms=(time.time() - start_time) * 1000,
+            grounded=hit.get('grounded', False),
+            metadata=self._cache_metadata('hit'),
+            usage=TokenUsage.from_dict(hit.get('usage'))  # The original call's usage; nothing is spent
+        )
+    
+    def _store_result(self, cache_key: Optional[str], result: PromptResult,
+                      model_key: str = None, bypass_cache: bool = False) -> PromptResult:
+        """Cache a successful result and tag it with the cache status."""
+        if self.response_cache is None:
+            return result
+        if cache_key is not None and result.ok:
+            self.response_cache.put(
+                cache_key,
+                {
+                    'text': result.text, 'model': result.model, 'grounded': result.grounded,
+                    'usage': result.usage.to_dict() if result.usage else None
+                },
+                model_key or self._current_model_key
+            )
+        result.metadata = {**(result.metadata or {}), **self._cache_metadata('bypass' if bypass_cache else 'miss')}
+        return result
+    
     def generate(self, 
                  prompt: str, 
                  model_key: str = None,
                  system_instruction: str = None,
                  temperature: float = 0.7,
-                 max_tokens: int = 4096) -> PromptResult:
+                 max_tokens: int = 4096,
+                 bypass_cache: bool = False,
+                 agent: str = None) -> PromptResult:
         """
         Generate a response from the LLM.
         
         Args:
             prompt: The user prompt
-            model_key: Override model key
+            model_key: Override model key ("auto" lets the router choose)
             system_instruction: System instruction to prepend
             temperature: Generation temperature (0.0-1.0)
             max_tokens: Maximum output tokens
+            bypass_cache: Skip the response cache and in-flight coalescing
+                (always a fresh sample)
+            agent: Agent name the call's token usage is attributed to
             
         Returns:
             PromptResult with response text and metadata
         """
-        model = self._get_model(model_key)
-        model_name = MODELS.get(model_key or self._current_model_key)
+        if self._routed(model_key):
+            return self._generate_routed(prompt, system_instruction, temperature, max_tokens, bypass_cache, agent)
         
-        # Build full prompt
-        full_prompt = prompt
-        if system_instruction:
-            full_prompt = f"{system_instruction}\n\n{prompt}"
+        model_name = MODELS.get(model_key or self._current_model_key, self.current_model)
         
         # Generate with timing
         start_time = time.time()
         
-        try:
-            response = model.generate_content(
-                full_prompt,
-                generation_config={
-                    "temperature": temperature,
-                    "max_output_tokens": max_tokens,
-                }
-            )
-            
-            latency_ms = (time.time() - start_time) * 1000
-            
-            return PromptResult(
-                text=response.text if hasattr(response, 'text') else str(response),
-                model=model_name,
-                latency_ms=latency_ms,
-                grounded=self.enable_grounding
-            )
+        request_key = self._request_key(prompt, model_name, system_instruction, temperature, max_tokens)
+        cache_key = self._cache_key(request_key, bypass_cache)
+        cached = self._cached_result(cache_key, start_time)
+        if cached is not None:
+            return cached
+        
+        model = self._get_model(model_key)
+        full_prompt = self._full_prompt(prompt, system_instruction)
+        
+        def fresh() -> PromptResult:
+            try:
+                response, usage = self._call_admitted(
+                    lambda: model.generate_content(
+                        full_prompt,
+                        generation_config={
+                            "temperature": temperature,
+                            "max_output_tokens": max_tokens,
+                        }
+                    ),
+                    model_name, full_prompt, max_tokens
+                )
+                result = self._result(response, model_name, start_time, usage, agent)
+                
+            except Exception as e:
+                result = self._error_result(e, model_name, start_time)
             
-        except Exception as e:
-            latency_ms = (time.time() - start_time) * 1000
-            return PromptResult(
-                text=f"[ERROR] Generation failed: {e}",
-                model=model_name,
-                latency_ms=latency_ms,
-                metadata={'error': str(e)}
-            )
+            return self._store_result(cache_key, result, model_key, bypass_cache)
+        
+        if bypass_cache:
+            return fresh()
+        return self._coalesced(*self.inflight.do(request_key, fresh))
     
     def generate_stream(self, 
                         prompt: str,
@@ -181,33 +528,218 @@ class PromptService:
             
         Yields:
             Text chunks as they're generated
+            
+        Raises:
+            KaedraError: RateLimitError / PromptError if generation fails,
+                before or during the stream
         """
         model = self._get_model(model_key)
+        model_name = MODELS.get(model_key or self._current_model_key, self.current_model)
+        full_prompt = self._full_prompt(prompt, system_instruction)
         
-        full_prompt = prompt
-        if system_instruction:
-            full_prompt = f"{system_instruction}\n\n{prompt}"
+        start_time = time.time()
         
         try:
-            response = model.generate_content(full_prompt, stream=True)
-            for chunk in response:
-                if hasattr(chunk, 'text'):
-                    yield chunk.text
+            # Retries cover opening the stream; a failure mid-stream is final
+            response, admission, stack = self._open_stream(
+                lambda: model.generate_content(full_prompt, stream=True),
+                model_name, full_prompt, 4096
+            )
+            # The admission is held until the stream is drained
+            with stack:
+                chunks: List[str] = []
+                chunk = None
+                for chunk in response:
+                    if hasattr(chunk, 'text'):
+                        chunks.append(chunk.text)
+                        yield chunk.text
+                # The final chunk carries usage_metadata for the whole stream
+                usage = self._settle(admission, full_prompt, chunk, "".join(chunks))
+            self.usage.record(usage, model_name, duration_ms=(time.time() - start_time) * 1000)
         except Exception as e:
-            yield f"[ERROR] Streaming failed: {e}"
+            raise to_kaedra_error(e, model_name) from e
     
     async def generate_async(self,
                              prompt: str,
                              model_key: str = None,
-                             system_instruction: str = None) -> PromptResult:
+                             system_instruction: str = None,
+                             temperature: float = 0.7,
+                             max_tokens: int = 4096,
+                             bypass_cache: bool = False,
+                             agent: str = None) -> PromptResult:
         """
         Async version of generate for concurrent operations.
         
-        Note: Currently wraps sync call. Full async support pending
-        Vertex AI SDK updates.
+        Uses the SDK's generate_content_async so the event loop keeps
+        serving other requests during the round-trip. Falls back to running
+        the blocking call in a worker thread if the SDK lacks it.
+        """
+        if self._routed(model_key):
+            return await self._generate_routed_async(
+                prompt, system_instruction, temperature, max_tokens, bypass_cache, agent
+            )
+        
+        model = self._get_async_model(model_key)
+        model_name = MODELS.get(model_key or self._current_model_key, self.current_model)
+        
+        generate_content_async = getattr(model, "generate_content_async", None)
+        if generate_content_async is None:
+            return await asyncio.to_thread(
+                self.generate, prompt, model_key, system_instruction, temperature, max_tokens, bypass_cache, agent
+            )
+        
+        start_time = time.time()
+        
+        request_key = self._request_key(prompt, model_name, system_instruction, temperature, max_tokens)
+        cache_key = self._cache_key(request_key, bypass_cache)
+        cached = self._cached_result(cache_key, start_time)
+        if cached is not None:
+            return cached
+        
+        full_prompt = self._full_prompt(prompt, system_instruction)
+        
+        async def fresh() -> PromptResult:
+            try:
+                response, usage = await self._call_admitted_async(
+                    lambda: generate_content_async(
+                        full_prompt,
+                        generation_config={
+                            "temperature": temperature,
+                            "max_output_tokens": max_tokens,
+                        }
+                    ),
+                    model_name, full_prompt, max_tokens
+                )
+                result = self._result(response, model_name, start_time, usage, agent)
+                
+            except Exception as e:
+                result = self._error_result(e, model_name, start_time)
+            
+            return self._store_result(cache_key, result, model_key, bypass_cache)
+        
+        if bypass_cache:
+            return await fresh()
+        return self._coalesced(*await self.inflight.do_async(request_key, fresh))
+    
+    async def generate_stream_async(self,
+                                    prompt: str,
+                                    model_key: str = None,
+                                    system_instruction: str = None,
+                                    temperature: float = 0.7,
+                                    max_tokens: int = 4096,
+                                    bypass_cache: bool = False,
+                                    agent: str = None) -> AsyncIterator[str]:
         """
-        # TODO: Use true async when Vertex AI SDK supports it
-        return self.generate(prompt, model_key, system_instruction)
+        Stream a response as text chunks without blocking the event loop.
+        
+        Admission is held until the stream is drained; retries cover
+        opening the stream. A response cache hit is yielded as one chunk,
+        and a completed stream is stored in the cache. Routed streams pick
+        their model up front (a streamed answer can't be escalated).
+        
+        Raises:
+            KaedraError: RateLimitError / PromptError if generation fails,
+                before or during the stream
+        """
+        decision = None
+        if self._routed(model_key):
+            decision = self.router.route(self._full_prompt(prompt, system_instruction), agent, cascade=False)
+            model_key = decision.start
+        
+        model = self._get_async_model(model_key)
+        model_name = MODELS.get(model_key or self._current_model_key, self.current_model)
+        _stream_model.set(model_name)
+        _stream_grounded.set(False)
+        start_time = time.time()
+        
+        request_key = self._request_key(prompt, model_name, system_instruction, temperature, max_tokens)
+        cache_key = self._cache_key(request_key, bypass_cache)
+        cached = self._cached_result(cache_key, start_time)
+        if cached is not None:
+            _stream_grounded.set(cached.grounded)
+            yield cached.text
+            return
+        
+        full_prompt = self._full_prompt(prompt, system_instruction)
+        generation_config = {"temperature": temperature, "max_output_tokens": max_tokens}
+        chunks: List[str] = []
+        last_chunk = None
+        grounded = False
+        
+        try:
+            generate_content_async = getattr(model, "generate_content_async", None)
+            if generate_content_async is None:
+                # Blocking SDK: open (and admit) in a worker thread, iterate there too
+                response, admission, opened = await asyncio.to_thread(
+                    self._open_stream,
+                    lambda: model.generate_content(full_prompt, generation_config=generation_config, stream=True),
+                    model_name, full_prompt, max_tokens
+                )
+                stack = AsyncExitStack()
+                stack.enter_context(opened)
+                stream = self._stream_in_thread(response)
+            else:
+                stream, admission, stack = await self._open_stream_async(
+                    lambda: generate_content_async(
+                        full_prompt, generation_config=generation_config, stream=True
+                    ),
+                    model_name, full_prompt, max_tokens
+                )
+            # The admission is held until the stream is drained
+            async with stack:
+                async for chunk in stream:
+                    last_chunk = chunk
+                    grounded = grounded or response_grounded(chunk)
+                    text = getattr(chunk, 'text', None)
+                    if text:
+                        chunks.append(text)
+                        yield text
+                # The final chunk carries usage_metadata for the whole stream
+                usage = self._settle(admission, full_prompt, last_chunk, "".join(chunks))
+        except Exception as e:
+            raise to_kaedra_error(e, model_name) from e
+        
+        result = PromptResult(
+            text="".join(chunks),
+            model=model_name,
+            latency_ms=(time.time() - start_time) * 1000,
+            grounded=grounded,
+            usage=usage
+        )
+        _stream_grounded.set(grounded)
+        self.usage.record(usage, model_name, agent, result.latency_ms)
+        self._store_result(cache_key, result, model_key, bypass_cache)
+        if decision is not None:
+            decision.attempts.append((model_key, result.latency_ms, False))
+            self.router.record(decision)
+    
+    async def _stream_in_thread(self, response) -> AsyncIterator[Any]:
+        """Bridge an opened blocking stream to an async iterator via a worker thread."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        
+        def produce():
+            try:
+                for chunk in response:
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+        
+        producer = asyncio.ensure_future(asyncio.to_thread(produce))
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Consumer stopped early: stop waiting (the thread drains on its own)
+            if not producer.done():
+                producer.cancel()
 
     def embed(self, text: str, model: str = "text-embedding-004") -> List[float]:
         """
@@ -220,12 +752,8 @@ class PromptService:
         Returns:
             List of floats representing the embedding vector
         """
-        try:
-            embedding_model = TextEmbeddingModel.from_pretrained(model)
-            embeddings = embedding_model.get_embeddings([text])
-            if embeddings:
-                return embeddings[0].values
-            return []
-        except Exception as e:
-            print(f"[!] Embedding error: {e}")
-            return []
+        return get_embedding_service().embed(text, model)
+
+    async def embed_async(self, text: str, model: str = "text-embedding-004") -> List[float]:
+        """Async embed; shares batches with concurrent sync and async callers."""
+        return await get_embedding_service().embed_async(text, model)
@@ -0,0 +1,168 @@
+"""
+KAEDRA v0.0.6 - Prompt Assembler
+Builds agent prompts from prioritized sections within a per-model token budget.
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+from ..core.config import PROMPT_TOKEN_BUDGETS, DEFAULT_PROMPT_TOKEN_BUDGET
+from .usage import estimate_tokens
+
+
+# Section priorities (lower is more important). The profile and the user
+# message (priority <= PRIORITY_USER_MESSAGE) are never cut.
+PRIORITY_PROFILE = 0
+PRIORITY_USER_MESSAGE = 1
+PRIORITY_RECENT_TURNS = 2
+PRIORITY_MEMORIES = 3
+PRIORITY_TOOL_OUTPUT = 4
+
+
+@dataclass
+class PromptSection:
+    """One block of a prompt."""
+    name: str
+    content: Optional[str]
+    priority: int
+    header: Optional[str] = None   # e.g. "[USER MESSAGE]", rendered above the content
+    keep: str = "head"             # Which end survives truncation: "head" or "tail" (newest turns)
+
+    @property
+    def required(self) -> bool:
+        return self.priority <= PRIORITY_USER_MESSAGE
+
+    def render(self) -> str:
+        return f"{self.header}\n{self.content}" if self.header else self.content
+
+
+@dataclass
+class AssembledPrompt:
+    """An assembled prompt plus what had to be cut to fit."""
+    text: str
+    tokens: int
+    budget: int
+    sections: Dict[str, int] = field(default_factory=dict)  # Tokens kept per section
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+    @property
+    def over_budget(self) -> bool:
+        """True if required sections alone exceed the budget."""
+        return self.tokens > self.budget
+
+    def to_dict(self) -> dict:
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "sections": self.sections,
+            "truncated": self.truncated,
+            "dropped": self.dropped,
+            "over_budget": self.over_budget,
+        }
+
+
+class PromptAssembler:
+    """
+    Fits prompt sections into a token budget.
+
+    Features:
+    - Per-model budgets (PROMPT_TOKEN_BUDGETS)
+    - Lowest-priority sections are cut first: tool output, then recalled
+      memories, then recent turns; the profile and user message are kept
+    - Line-aware truncation that keeps the most useful end (the newest
+      turns, the most relevant memories) and marks what was omitted
+    - Sections that would shrink below min_section_tokens are dropped
+    - Reports kept/truncated/dropped sections
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None,
+                 default_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET,
+                 min_section_tokens: int = 48):
+        self.budgets = PROMPT_TOKEN_BUDGETS if budgets is None else budgets
+        self.default_budget = default_budget
+        self.min_section_tokens = min_section_tokens
+
+    def budget_for(self, model: str) -> int:
+        return self.budgets.get(model, self.default_budget)
+
+    def assemble(self, sections: List[PromptSection], model: str, budget: int = None) -> AssembledPrompt:
+        """
+        Join sections (in the given order) into a prompt within budget.
+
+        Args:
+            sections: Sections in display order; empty ones are skipped
+            model: Model name the budget is looked up for
+            budget: Explicit token budget (overrides the model's)
+        """
+        budget = budget or self.budget_for(model)
+        live = [replace(section) for section in sections if section.content]
+        cost = {id(section): self._tokens(section) for section in live}
+        total = sum(cost.values())
+        truncated: List[str] = []
+        dropped: List[str] = []
+
+        # Least important first; among equals, the later section goes first
+        for section in sorted(reversed(live), key=lambda s: -s.priority):
+            over = total - budget
+            if over <= 0:
+                break
+            if section.required:
+                continue
+
+            allowed = cost[id(section)] - over
+            header_tokens = estimate_tokens(section.header or "") + 1
+            if allowed - header_tokens < self.min_section_tokens:
+                total -= cost[id(section)]
+                cost.pop(id(section))
+                dropped.append(section.name)
+                continue
+
+            section.content = self._truncate(section.content, allowed - header_tokens, section.keep)
+            new_cost = self._tokens(section)
+            total += new_cost - cost[id(section)]
+            cost[id(section)] = new_cost
+            truncated.append(section.name)
+
+        kept = [section for section in live if id(section) in cost]
+        return AssembledPrompt(
+            text="\n\n".join(section.render() for section in kept),
+            tokens=total,
+            budget=budget,
+            sections={section.name: cost[id(section)] for section in kept},
+            truncated=truncated,
+            dropped=dropped
+        )
+
+    @staticmethod
+    def _tokens(section: PromptSection) -> int:
+        return estimate_tokens(section.render()) + 1  # + separator
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int, keep: str) -> str:
+        """Keep whole lines from one end of text within max_tokens."""
+        marker_tokens = 12
+        room = max(1, max_tokens - marker_tokens)
+        lines = text.splitlines()
+        ordered = lines if keep == "head" else list(reversed(lines))
+
+        kept: List[str] = []
+        used = 0
+        for line in ordered:
+            line_tokens = estimate_tokens(line) + 1
+            if used + line_tokens > room:
+                break
+            kept.append(line)
+            used += line_tokens
+
+        if kept:
+            omitted = f"{len(lines) - len(kept)} {'more' if keep == 'head' else 'earlier'} lines omitted"
+        else:
+            # A single oversized line: cut characters (~4 per token)
+            chars = room * 4
+            kept = [ordered[0][:chars] if keep == "head" else ordered[0][-chars:]]
+            omitted = "truncated"
+
+        if keep == "head":
+            return "\n".join(kept + [f"[... {omitted}]"])
+        return "\n".join([f"[... {omitted}]"] + kept[::-1])
@@ -0,0 +1,341 @@
+"""
+KAEDRA v0.0.6 - Admission Control
+Per-model concurrency limits and RPM/TPM token buckets for LLM calls.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Iterator, AsyncIterator, Optional
+
+from ..core.config import (
+    MODEL_LIMITS, DEFAULT_MODEL_LIMITS, ADMISSION_QUEUE_TIMEOUT_S, ENABLE_ADMISSION_CONTROL
+)
+from ..core.exceptions import RateLimitError
+
+
+class TokenBucket:
+    """
+    Per-minute token bucket that hands out reservations.
+
+    A reservation takes tokens immediately (the balance may go negative)
+    and returns how long the caller must wait, so waiters are served in
+    reservation order and sync and async callers can share one bucket.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate_per_s = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_s)
+        self._updated = now
+
+    def reserve(self, amount: float, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Reserve `amount` tokens.
+
+        Returns:
+            Seconds to wait before using them, or None (nothing reserved)
+            if that would exceed max_wait
+        """
+        amount = min(float(amount), self.capacity)  # Oversized requests still get through
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, amount - self._tokens) / self.rate_per_s
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= amount
+            return wait
+
+    def credit(self, amount: float):
+        """Return unused tokens (e.g. an over-estimate) to the bucket."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, event: threading.Event = None, loop=None, future=None):
+        self.event = event
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+class _Slots:
+    """
+    FIFO counting semaphore usable from threads and event loops.
+
+    A released slot is handed directly to the oldest waiter, so a burst
+    cannot overtake callers that are already queued.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _try_take(self) -> bool:
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            return True
+        return False
+
+    def acquire(self, timeout: Optional[float]) -> bool:
+        with self._lock:
+            if self._try_take():
+                return True
+            waiter = _Waiter(event=threading.Event())
+            self._waiters.append(waiter)
+
+        if waiter.event.wait(timeout):
+            return True
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    async def acquire_async(self, timeout: Optional[float]) -> bool:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_take():
+                return True
+            waiter = _Waiter(loop=loop, future=loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            with self._lock:
+                if waiter.granted:
+                    return True
+                self._waiters.remove(waiter)
+                return False
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self.in_use -= 1
+                return
+            waiter = self._waiters.popleft()
+            waiter.granted = True  # Slot moves to the waiter; in_use is unchanged
+
+        if waiter.event is not None:
+            waiter.event.set()
+            return
+        try:
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+        except RuntimeError:
+            # Waiter's loop is gone; pass the slot on
+            self.release()
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(True)
+
+
+class Admission:
+    """A granted slot plus token reservation; settle() refunds over-estimates."""
+
+    def __init__(self, limiter: "ModelLimiter", reserved_tokens: int):
+        self._limiter = limiter
+        self.reserved_tokens = reserved_tokens
+
+    def settle(self, actual_tokens: Optional[int]):
+        """Credit back the difference between reserved and actual token use."""
+        if actual_tokens is None or self._limiter.tpm is None:
+            return
+        unused = self.reserved_tokens - int(actual_tokens)
+        if unused > 0:
+            self._limiter.tpm.credit(unused)
+        self.reserved_tokens = int(actual_tokens)
+
+
+class ModelLimiter:
+    """
+    Admission control for one model.
+
+    Features:
+    - Max in-flight requests (FIFO queue when full)
+    - Requests-per-minute and tokens-per-minute buckets
+    - Queueing bounded by a deadline; rejected callers get RateLimitError
+    """
+
+    def __init__(self, model: str, max_in_flight: int = 8,
+                 rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.model = model
+        self.slots = _Slots(max_in_flight)
+        self.rpm = TokenBucket(rpm) if rpm else None
+        self.tpm = TokenBucket(tpm) if tpm else None
+
+        self.admitted = 0
+        self.rejected = 0
+        self._wait_s_total = 0.0
+
+    def _reject(self, retry_after: float) -> RateLimitError:
+        self.rejected += 1
+        error = RateLimitError(self.model, max(1, math.ceil(retry_after)))
+        error.details["source"] = "admission"
+        return error
+
+    def _reserve(self, tokens: int, remaining: float) -> float:
+        """Reserve one request and `tokens` from the buckets; returns the wait."""
+        wait = 0.0
+        if self.rpm is not None:
+            rpm_wait = self.rpm.reserve(1, remaining)
+            if rpm_wait is None:
+                raise self._reject(1 / self.rpm.rate_per_s)
+            wait = rpm_wait
+        if self.tpm is not None:
+            tpm_wait = self.tpm.reserve(tokens, remaining)
+            if tpm_wait is None:
+                if self.rpm is not None:
+                    self.rpm.credit(1)
+                raise self._reject(min(tokens, self.tpm.capacity) / self.tpm.rate_per_s)
+            wait = max(wait, tpm_wait)
+        return wait
+
+    def _admitted(self, started: float, tokens: int) -> Admission:
+        self.admitted += 1
+        self._wait_s_total += time.monotonic() - started
+        return Admission(self, tokens)
+
+    @contextmanager
+    def admit(self, tokens: int, timeout: Optional[float]) -> Iterator[Admission]:
+        """Block until admitted (or raise RateLimitError at the deadline)."""
+        started = time.monotonic()
+        if not self.slots.acquire(timeout):
+            raise self._reject(timeout or 1)
+        try:
+            remaining = None if timeout is None else max(0.0, timeout - (time.monotonic() - started))
+            wait = self._reserve(tokens, remaining)
+            if wait:
+                time.sleep(wait)
+            yield self._admitted(started, tokens)
+        finally:
+            self.slots.release()
+
+    @asynccontextmanager
+    async def admit_async(self, tokens: int, timeout: Optional[float]) -> AsyncIterator[Admission]:
+        """Async admit; queueing never blocks the event loop."""
+        started = time.monotonic()
+        if not await self.slots.acquire_async(timeout):
+            raise self._reject(timeout or 1)
+        try:
+            remaining = None if timeout is None else max(0.0, timeout - (time.monotonic() - started))
+            wait = self._reserve(tokens, remaining)
+            if wait:
+                await asyncio.sleep(wait)
+            yield self._admitted(started, tokens)
+        finally:
+            self.slots.release()
+
+    def utilization(self) -> Dict[str, Any]:
+        """Current load and counters."""
+        return {
+            "in_flight": self.slots.in_use,
+            "max_in_flight": self.slots.limit,
+            "queued": self.slots.queued,
+            "rpm_available": round(self.rpm.available, 1) if self.rpm else None,
+            "tpm_available": round(self.tpm.available) if self.tpm else None,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._wait_s_total / self.admitted * 1000, 1) if self.admitted else 0.0,
+        }
+
+
+class AdmissionController:
+    """
+    Per-model limiters built from MODEL_LIMITS.
+
+    Limits are keyed by model name, so model keys that share a model
+    (pro and ultra) share its quota.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Any]]] = None,
+                 default_limits: Optional[Dict[str, Any]] = None,
+                 queue_timeout_s: Optional[float] = ADMISSION_QUEUE_TIMEOUT_S,
+                 enabled: bool = True):
+        self.limits = MODEL_LIMITS if limits is None else limits
+        self.default_limits = DEFAULT_MODEL_LIMITS if default_limits is None else default_limits
+        self.queue_timeout_s = queue_timeout_s
+        self.enabled = enabled
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, model: str) -> ModelLimiter:
+        with self._lock:
+            if model not in self._limiters:
+                self._limiters[model] = ModelLimiter(model, **self.limits.get(model, self.default_limits))
+            return self._limiters[model]
+
+    @contextmanager
+    def admit(self, model: str, tokens: int, timeout: Optional[float] = None) -> Iterator[Optional[Admission]]:
+        """Hold an admission for `model` for the duration of the block."""
+        if not self.enabled:
+            yield None
+            return
+        with self.limiter(model).admit(tokens, timeout if timeout is not None else self.queue_timeout_s) as admission:
+            yield admission
+
+    @asynccontextmanager
+    async def admit_async(self, model: str, tokens: int,
+                          timeout: Optional[float] = None) -> AsyncIterator[Optional[Admission]]:
+        """Async version of admit."""
+        if not self.enabled:
+            yield None
+            return
+        async with self.limiter(model).admit_async(
+            tokens, timeout if timeout is not None else self.queue_timeout_s
+        ) as admission:
+            yield admission
+
+    def utilization(self) -> Dict[str, Dict[str, Any]]:
+        """Utilization per model that has seen traffic."""
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {model: limiter.utilization() for model, limiter in limiters.items()}
+
+
+# Shared instance: quotas are per project, so every PromptService shares it
+_admission_controller: Optional[AdmissionController] = None
+_admission_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the global admission controller."""
+    global _admission_controller
+    with _admission_controller_lock:
+        if _admission_controller is None:
+            _admission_controller = AdmissionController(enabled=ENABLE_ADMISSION_CONTROL)
+    return _admission_controller
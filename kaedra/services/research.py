@@ -10,6 +10,7 @@ import time
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 
+from ..core.config import AUTO_MODEL_KEY
 from ..core.google_tools import GOOGLE_TOOLS
 from .web import WebService
 from .prompt import PromptService
@@ -80,23 +81,25 @@ class ResearchService:
         try:
             # 1. Search
             logger.info(f"Researching: {task.query}")
-            search_results = GOOGLE_TOOLS["google_search"](task.query, num_results=5)
+            search_results = await asyncio.to_thread(GOOGLE_TOOLS["google_search"], task.query, num_results=5)
             
             if search_results.get("status") == "error":
                 raise Exception(f"Search failed: {search_results.get('message')}")
                 
             urls = [item['link'] for item in search_results.get('results', [])[:3]]
             
-            # 2. Scrape (Concurrent)
+            # 2. Scrape (Concurrent, in worker threads so the event loop stays free)
+            pages = await asyncio.gather(
+                *(asyncio.to_thread(self.web_service.fetch, url) for url in urls),
+                return_exceptions=True
+            )
             scraped_data = []
-            for url in urls:
-                try:
-                    # Note: synchronous calls in asyncio for now, ideally make web_service async
-                    page = self.web_service.fetch(url)
-                    if page.status_code == 200:
-                        scraped_data.append(f"SOURCE: {page.url}\nTITLE: {page.title}\nCONTENT:\n{page.content[:5000]}")
-                except Exception as e:
-                    logger.warning(f"Failed to scrape {url}: {e}")
+            for url, page in zip(urls, pages):
+                if isinstance(page, Exception):
+                    logger.warning(f"Failed to scrape {url}: {page}")
+                    continue
+                if page.status_code == 200:
+                    scraped_data.append(f"SOURCE: {page.url}\nTITLE: {page.title}\nCONTENT:\n{page.content[:5000]}")
             
             combined_context = "\n\n---\n\n".join(scraped_data)
             
@@ -120,11 +123,12 @@ class ResearchService:
             # Sources
             """
             
-            # Use Gemini 3 Pro for synthesis if available
+            # Routed: research synthesis starts on the strong model
             result = await self.prompt_service.generate_async(
                 prompt=prompt,
-                model_key="pro",
-                system_instruction="You are an expert research analyst."
+                model_key=AUTO_MODEL_KEY,
+                system_instruction="You are an expert research analyst.",
+                agent="RESEARCH"
             )
             
             task.results = {
@@ -0,0 +1,267 @@
+"""
+KAEDRA v0.0.6 - Retry Policy
+Error classification, exponential backoff with jitter and a shared retry
+budget for LLM calls.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from ..core.config import (
+    PROMPT_MAX_ATTEMPTS, PROMPT_RETRY_BASE_DELAY_S, PROMPT_RETRY_MAX_DELAY_S,
+    PROMPT_RETRY_DEADLINE_S, PROMPT_RETRY_BUDGET_RATIO
+)
+from ..core.exceptions import AuthenticationError, KaedraError, PromptError, RateLimitError
+
+
+T = TypeVar("T")
+
+# Error kinds
+RATE_LIMIT = "rate_limit"
+TRANSIENT = "transient"
+TIMEOUT = "timeout"
+AUTH = "auth"
+INVALID = "invalid"
+UNKNOWN = "unknown"
+
+RETRYABLE = frozenset({RATE_LIMIT, TRANSIENT, TIMEOUT})
+
+# HTTP status -> kind (google.api_core exceptions carry .code, HTTP errors .status_code)
+_STATUS_KINDS = {
+    429: RATE_LIMIT,
+    408: TIMEOUT, 504: TIMEOUT,
+    500: TRANSIENT, 502: TRANSIENT, 503: TRANSIENT,
+    401: AUTH, 403: AUTH,
+    400: INVALID, 404: INVALID, 409: INVALID, 412: INVALID, 413: INVALID,
+}
+
+# Exception class names -> kind, for SDKs that raise without a status code
+_NAME_KINDS = {
+    "ResourceExhausted": RATE_LIMIT, "TooManyRequests": RATE_LIMIT,
+    "ServiceUnavailable": TRANSIENT, "InternalServerError": TRANSIENT,
+    "BadGateway": TRANSIENT, "Aborted": TRANSIENT, "ConnectionError": TRANSIENT,
+    "DeadlineExceeded": TIMEOUT, "GatewayTimeout": TIMEOUT, "TimeoutError": TIMEOUT,
+    "Unauthenticated": AUTH, "Unauthorized": AUTH, "PermissionDenied": AUTH, "Forbidden": AUTH,
+    "DefaultCredentialsError": AUTH, "RefreshError": AUTH,
+    "InvalidArgument": INVALID, "BadRequest": INVALID, "NotFound": INVALID,
+    "FailedPrecondition": INVALID,
+}
+
+_MESSAGE_KINDS = (
+    (re.compile(r"\b429\b|resource[ _]exhausted|quota|rate limit", re.I), RATE_LIMIT),
+    (re.compile(r"\b50[023]\b|unavailable|try again|connection reset", re.I), TRANSIENT),
+    (re.compile(r"\b504\b|deadline[ _]exceeded|timed out", re.I), TIMEOUT),
+)
+
+_RETRY_AFTER = re.compile(r"retry(?:[ -]after| in)\s*:?\s*(\d+(?:\.\d+)?)\s*s?", re.I)
+
+
+def classify_error(error: BaseException) -> str:
+    """Map an SDK/transport exception to an error kind."""
+    if isinstance(error, RateLimitError):
+        return RATE_LIMIT
+    if isinstance(error, AuthenticationError):
+        return AUTH
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return TIMEOUT
+
+    status = getattr(error, "code", None)
+    if callable(status):  # grpc.RpcError.code()
+        try:
+            status = status()
+        except Exception:
+            status = None
+    status = getattr(error, "status_code", None) or status
+    try:
+        status = int(getattr(status, "value", status))
+    except (TypeError, ValueError):
+        status = None
+    if status in _STATUS_KINDS:
+        return _STATUS_KINDS[status]
+
+    for cls in type(error).__mro__:
+        if cls.__name__ in _NAME_KINDS:
+            return _NAME_KINDS[cls.__name__]
+
+    message = str(error)
+    for pattern, kind in _MESSAGE_KINDS:
+        if pattern.search(message):
+            return kind
+    return UNKNOWN
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Server-suggested wait in seconds (Retry-After header or message), if any."""
+    value = getattr(error, "retry_after", None)
+    if value is None and isinstance(error, KaedraError):
+        value = error.details.get("retry_after_seconds")
+
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if value is None and headers:
+        try:
+            value = headers.get("retry-after") or headers.get("Retry-After")
+        except AttributeError:
+            value = None
+
+    if value is None:
+        match = _RETRY_AFTER.search(str(error))
+        value = match.group(1) if match else None
+
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def to_kaedra_error(error: BaseException, model: str = None, attempts: int = 1) -> KaedraError:
+    """Convert a final failure into the matching KAEDRA exception."""
+    if isinstance(error, KaedraError):
+        return error
+
+    kind = classify_error(error)
+    if kind == RATE_LIMIT:
+        wait = retry_after(error)
+        converted: KaedraError = RateLimitError(model, int(wait) if wait is not None else None)
+    elif kind == AUTH:
+        converted = AuthenticationError(str(error))
+    else:
+        converted = PromptError(str(error), model=model)
+    converted.details.update({"kind": kind, "attempts": attempts})
+    return converted
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of successful calls.
+
+    Each success deposits `ratio` tokens (capped at `max_tokens`); each retry
+    spends one. When an upstream is down the bucket drains and callers fail
+    fast instead of multiplying load with retry storms.
+    """
+
+    def __init__(self, ratio: float = PROMPT_RETRY_BUDGET_RATIO, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff settings for one class of calls."""
+    max_attempts: int = PROMPT_MAX_ATTEMPTS
+    base_delay_s: float = PROMPT_RETRY_BASE_DELAY_S
+    max_delay_s: float = PROMPT_RETRY_MAX_DELAY_S
+    deadline_s: Optional[float] = PROMPT_RETRY_DEADLINE_S  # Total time across attempts
+
+    def backoff(self, attempt: int, error: BaseException = None) -> float:
+        """
+        Delay before retry number `attempt` (1-based).
+
+        Full jitter over an exponential cap. A server Retry-After is a floor
+        (never retry sooner than asked); the deadline decides whether it is
+        worth waiting that long.
+        """
+        delay = random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** (attempt - 1))))
+        suggested = retry_after(error) if error is not None else None
+        if suggested is not None:
+            delay = max(delay, suggested)
+        return delay
+
+
+class Retrier:
+    """
+    Runs calls under a RetryPolicy and a shared RetryBudget.
+
+    Only rate-limit, transient and timeout errors are retried. Final
+    failures are raised as RateLimitError / AuthenticationError /
+    PromptError with the error kind and attempt count in details.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None, budget: Optional[RetryBudget] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.policy = policy or RetryPolicy()
+        self.budget = budget or RetryBudget()
+        self._sleep = sleep
+
+        self.retries = 0
+        self.failures = 0
+
+    def _next_delay(self, attempt: int, error: BaseException, started: float) -> Optional[float]:
+        """Delay before the next attempt, or None to give up."""
+        if classify_error(error) not in RETRYABLE or attempt >= self.policy.max_attempts:
+            return None
+        if isinstance(error, KaedraError) and error.details.get("source") == "admission":
+            return None  # Already queued until the admission deadline
+
+        delay = self.policy.backoff(attempt, error)
+        if self.policy.deadline_s is not None and time.time() - started + delay > self.policy.deadline_s:
+            return None
+        if not self.budget.try_spend():
+            return None
+        self.retries += 1
+        return delay
+
+    def call(self, fn: Callable[[], T], model: str = None) -> T:
+        """Call fn(), retrying retryable failures."""
+        started = time.time()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = fn()
+                self.budget.record_success()
+                return result
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started)
+                if delay is None:
+                    self.failures += 1
+                    raise to_kaedra_error(e, model, attempt) from e
+                print(f"[Prompt] {classify_error(e)} error, retry {attempt} in {delay:.2f}s: {e}")
+                self._sleep(delay)
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]], model: str = None) -> T:
+        """Async call; backoff sleeps without blocking the event loop."""
+        started = time.time()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = await fn()
+                self.budget.record_success()
+                return result
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started)
+                if delay is None:
+                    self.failures += 1
+                    raise to_kaedra_error(e, model, attempt) from e
+                print(f"[Prompt] {classify_error(e)} error, retry {attempt} in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "retries": self.retries,
+            "failures": self.failures,
+            "budget_tokens": round(self.budget.tokens, 2),
+        }
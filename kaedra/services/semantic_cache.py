@@ -0,0 +1,207 @@
+"""
+KAEDRA v0.0.6 - Semantic Cache
+Reuses recent answers for paraphrased queries via embedding similarity.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..core.config import (
+    ENABLE_SEMANTIC_CACHE, SEMANTIC_CACHE_DIR, SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_MAX_AGE_S, SEMANTIC_CACHE_MAX_ENTRIES
+)
+
+try:
+    from .local_vector_store import LocalVectorStore
+    LOCAL_VECTOR_STORE_AVAILABLE = True
+except ImportError:
+    LOCAL_VECTOR_STORE_AVAILABLE = False
+    LocalVectorStore = None
+
+
+logger = logging.getLogger("kaedra.services.semantic_cache")
+
+# Queries that ask for a live lookup; answering them from cache would be wrong
+_TIME_SENSITIVE = re.compile(
+    r"\b(right now|as of now|breaking|latest news|search( for)?|google|look ?up|"
+    r"just now|this minute|last (few )?minutes?|what time|time is it)\b",
+    re.IGNORECASE
+)
+
+# Answers that triggered local tool execution are tied to that run
+_TOOL_MARKER = "[EXEC:"
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class SemanticHit:
+    """A cached answer close enough to the incoming query."""
+    response: str
+    query: str
+    similarity: float
+    age_s: float
+    model: str
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour answer cache backed by a LocalVectorStore.
+
+    Features:
+    - Queries are normalized (case, punctuation, whitespace) before embedding
+    - Embeddings go through the shared EmbeddingService and its cache
+    - Hits need similarity >= threshold, the same model, the same scope
+      (fingerprint of the rest of the prompt, e.g. recalled memories and
+      the date) and an entry younger than max_age_s
+    - Live-lookup queries and tool-triggered answers are never cached
+    - Hits are logged with their similarity so the threshold can be tuned
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_age_s: float = SEMANTIC_CACHE_MAX_AGE_S,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        store: Optional[Any] = None
+    ):
+        if store is None:
+            if not LOCAL_VECTOR_STORE_AVAILABLE:
+                raise ImportError("numpy is required for the semantic cache (pip install kaedra[local])")
+            store = LocalVectorStore(db_path or SEMANTIC_CACHE_DIR)
+        self.store = store
+        self.threshold = threshold
+        self.max_age_s = max_age_s
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._writes = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Lowercase, strip punctuation and collapse whitespace."""
+        return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", query.lower())).strip()
+
+    @staticmethod
+    def scope(*parts: str) -> str:
+        """Fingerprint of the prompt context an answer depended on besides the query."""
+        digest = hashlib.sha256("\x1f".join(part or "" for part in parts).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def _partition(model: str, scope: str) -> str:
+        return f"{model}#{scope}" if scope else model
+
+    @staticmethod
+    def is_cacheable(query: str) -> bool:
+        """False for queries that explicitly ask for a live lookup."""
+        return not _TIME_SENSITIVE.search(query)
+
+    def _cutoff(self) -> str:
+        return (datetime.now() - timedelta(seconds=self.max_age_s)).isoformat()
+
+    def lookup(self, query: str, model: str, scope: str = "") -> Optional[SemanticHit]:
+        """
+        Find a fresh cached answer for a paraphrase of query.
+
+        Only answers stored under the same model and scope are candidates.
+
+        Returns:
+            SemanticHit, or None on a miss or a non-cacheable query
+        """
+        if not self.is_cacheable(query):
+            self.bypassed += 1
+            return None
+
+        normalized = self.normalize(query)
+        if not normalized:
+            return None
+
+        matches = self.store.search_similar(
+            normalized,
+            limit=1,
+            min_similarity=self.threshold,
+            topic=self._partition(model, scope),
+            since=self._cutoff()
+        )
+        if not matches:
+            self.misses += 1
+            return None
+
+        match = matches[0]
+        metadata = match.get("metadata") or {}
+        age_s = (datetime.now() - datetime.fromisoformat(match["timestamp"])).total_seconds()
+        self.hits += 1
+        logger.info(
+            "Semantic cache hit (similarity=%.3f, age=%.0fs): %r ~ %r",
+            match["similarity"], age_s, query, metadata.get("query")
+        )
+        return SemanticHit(
+            response=metadata.get("response", ""),
+            query=metadata.get("query", match["content"]),
+            similarity=match["similarity"],
+            age_s=age_s,
+            model=model
+        )
+
+    def store_response(self, query: str, response: str, model: str, scope: str = "") -> bool:
+        """
+        Cache an answer for query.
+
+        Returns:
+            True if stored (skips live-lookup queries and tool-triggered answers)
+        """
+        if not response or _TOOL_MARKER in response or not self.is_cacheable(query):
+            return False
+
+        normalized = self.normalize(query)
+        if not normalized:
+            return False
+
+        stored = self.store.add_memory(
+            normalized,
+            topic=self._partition(model, scope),
+            metadata={"query": query, "response": response}
+        ) is not None
+
+        self._writes += 1
+        if self._writes % 64 == 0:
+            self.store.prune(older_than=self._cutoff(), max_rows=self.max_entries)
+        return stored
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": self.store.get_stats().get("total", 0),
+            "threshold": self.threshold,
+        }
+
+
+# Shared instance so the API and CLI agents reuse one index
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Get the global semantic cache (None unless enabled and numpy is installed)."""
+    global _semantic_cache
+    if not ENABLE_SEMANTIC_CACHE or not LOCAL_VECTOR_STORE_AVAILABLE:
+        return None
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticCache()
+    return _semantic_cache
@@ -0,0 +1,295 @@
+"""
+KAEDRA v0.0.6 - Conversation Sessions
+Server-side conversation state: rolling summary plus the last N turns verbatim.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..core.config import (
+    SESSION_DB_FILE, SESSION_PERSIST, SESSION_MAX_ACTIVE, SESSION_MAX_STORED, SESSION_TTL_S,
+    SESSION_RECENT_TURNS, SESSION_SUMMARY_MAX_CHARS
+)
+from .cache import TieredCache
+
+
+logger = logging.getLogger("kaedra.services.session")
+
+Message = Tuple[str, str]  # (role, content)
+Summarizer = Callable[[str, List[Dict[str, str]]], str]
+
+
+def chain_digest(previous: str, role: str, content: str) -> str:
+    """Hash chain over a transcript; equal digests mean equal prefixes."""
+    return hashlib.sha256(f"{previous}\x1f{role}\x1f{content}".encode("utf-8")).hexdigest()
+
+
+def extractive_summary(summary: str, turns: List[Dict[str, str]], line_chars: int = 240) -> str:
+    """Fold turns into the summary as one clipped line each (no model call)."""
+    lines = [summary] if summary else []
+    for turn in turns:
+        text = re.sub(r"\s+", " ", turn["content"]).strip()
+        if len(text) > line_chars:
+            text = text[:line_chars - 3] + "..."
+        lines.append(f"- {turn['role']}: {text}")
+    return "\n".join(lines)
+
+
+def llm_summarizer(prompt_service, model_key: str = "flash") -> Summarizer:
+    """
+    Summarizer that asks the model to fold turns into the summary.
+
+    Falls back to extractive_summary if the call fails.
+    """
+    def summarize(summary: str, turns: List[Dict[str, str]]) -> str:
+        transcript = "\n".join(f"{t['role']}: {t['content']}" for t in turns)
+        result = prompt_service.generate(
+            f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}\n\n"
+            "Update the summary to include the new turns. Keep facts, decisions, names "
+            "and open questions; drop pleasantries. Reply with the summary only.",
+            model_key=model_key,
+            temperature=0.2,
+            max_tokens=512,
+            agent="SESSION"
+        )
+        if not result.ok:
+            return extractive_summary(summary, turns)
+        return result.text.strip()
+    return summarize
+
+
+@dataclass
+class Conversation:
+    """One conversation: rolling summary plus recent verbatim turns."""
+    id: str
+    summary: str = ""
+    turns: List[Dict[str, str]] = field(default_factory=list)  # [{"role", "content"}], oldest first
+    message_count: int = 0     # Every message seen, including summarized ones
+    digest: str = ""           # chain_digest over all message_count messages
+    first_digest: str = ""     # Digest of the first message (detects edited histories)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    # In-flight turn state (not persisted): the stored digest this turn
+    # started from and the messages it has added since
+    base_digest: str = field(default="", repr=False)
+    pending: List[Dict[str, str]] = field(default_factory=list, repr=False)
+
+    _TRANSIENT = ("base_digest", "pending")
+
+    def context(self) -> str:
+        """Prompt context: summary of older turns, then recent turns verbatim."""
+        parts = []
+        if self.summary:
+            parts.append(f"[CONVERSATION SUMMARY]\n{self.summary}")
+        if self.turns:
+            parts.append("[RECENT TURNS]\n" + "\n".join(f"{t['role']}: {t['content']}" for t in self.turns))
+        return "\n\n".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        for key in self._TRANSIENT:
+            data.pop(key)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Conversation":
+        # The memory tier hands back the stored dict itself; don't share its turns
+        return cls(**{**data, "turns": [dict(turn) for turn in data.get("turns", [])]})
+
+
+class ConversationStore:
+    """
+    Server-side conversations for the OpenAI-compatible endpoint.
+
+    Clients may send only new messages with a conversation_id; clients
+    that resend full history still work, because the stored transcript's
+    hash chain is prefix-matched against what they send.
+
+    Features:
+    - LRU of active conversations with TTL eviction (TieredCache)
+    - Pluggable persistent backend: any object with TieredCache's
+      get/put/delete/stats (defaults to a SQLite tier)
+    - Bounded context: last N turns verbatim, older ones folded into a
+      rolling summary capped at summary_max_chars
+    - Pluggable summarizer (extractive by default, llm_summarizer optional)
+    - Turns commit atomically per conversation: complete_turn re-reads the
+      stored conversation under a per-id lock and, if another turn was
+      saved since begin_turn, replays this turn on top of it
+    """
+
+    def __init__(self,
+                 backend=None,
+                 recent_turns: int = SESSION_RECENT_TURNS,
+                 summary_max_chars: int = SESSION_SUMMARY_MAX_CHARS,
+                 summarizer: Optional[Summarizer] = None):
+        self._cache = backend or TieredCache(
+            db_file=SESSION_DB_FILE if SESSION_PERSIST else None,
+            max_entries=SESSION_MAX_ACTIVE,
+            max_disk_entries=SESSION_MAX_STORED,
+            ttl_s=SESSION_TTL_S,
+            encode=lambda conversation: json.dumps(conversation).encode("utf-8"),
+            decode=lambda blob: json.loads(blob)
+        )
+        self.recent_turns = recent_turns
+        self.summary_max_chars = summary_max_chars
+        self.summarizer = summarizer or extractive_summary
+
+        self.full_history_requests = 0
+        self.incremental_requests = 0
+        self.resets = 0
+        self.conflicts = 0
+
+        self._locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, conversation_id: str) -> threading.Lock:
+        """Lock serializing commits to one conversation (dropped when unused)."""
+        with self._locks_guard:
+            lock = self._locks.get(conversation_id)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks[conversation_id] = lock
+            return lock
+
+    def get(self, conversation_id: str) -> Optional[Conversation]:
+        data = self._cache.get(conversation_id)
+        return Conversation.from_dict(data) if data else None
+
+    def save(self, conversation: Conversation):
+        """Persist a conversation (refreshes its TTL)."""
+        conversation.updated_at = time.time()
+        self._cache.put(conversation.id, conversation.to_dict())
+
+    def delete(self, conversation_id: str):
+        self._cache.delete(conversation_id)
+
+    @staticmethod
+    def append(conversation: Conversation, role: str, content: str):
+        """Add a message to the transcript."""
+        conversation.turns.append({"role": role, "content": content})
+        conversation.digest = chain_digest(conversation.digest, role, content)
+        if conversation.message_count == 0:
+            conversation.first_digest = conversation.digest
+        conversation.message_count += 1
+
+    def fold(self, conversation: Conversation):
+        """Fold turns beyond the verbatim window into the rolling summary (one summarizer call)."""
+        overflow = len(conversation.turns) - self.recent_turns
+        if overflow > 0:
+            folded = conversation.turns[:overflow]
+            conversation.turns = conversation.turns[overflow:]
+            conversation.summary = self._cap(self.summarizer(conversation.summary, folded))
+
+    def _cap(self, summary: str) -> str:
+        """Keep the newest part of the summary within summary_max_chars."""
+        if len(summary) <= self.summary_max_chars:
+            return summary
+        tail = summary[-self.summary_max_chars:]
+        newline = tail.find("\n")
+        return "..." + (tail[newline:] if 0 <= newline < 200 else tail)
+
+    def sync(self, conversation_id: str, messages: Sequence[Message]) -> Tuple[Conversation, List[Message]]:
+        """
+        Reconcile a request's messages with the stored conversation.
+
+        Returns:
+            (conversation, new_messages) where new_messages are the ones
+            not yet in the stored transcript, in order
+        """
+        stored = self.get(conversation_id)
+        conversation, new_messages = self._sync(stored, conversation_id, messages)
+        conversation.base_digest = stored.digest if stored else ""
+        conversation.pending = []
+        return conversation, new_messages
+
+    def _sync(self, conversation: Optional[Conversation], conversation_id: str,
+              messages: Sequence[Message]) -> Tuple[Conversation, List[Message]]:
+        if conversation is None or conversation.message_count == 0:
+            return Conversation(id=conversation_id), list(messages)
+
+        if len(messages) >= conversation.message_count:
+            # Full-history client: the stored transcript is a prefix of what was sent
+            digest = ""
+            for role, content in messages[:conversation.message_count]:
+                digest = chain_digest(digest, role, content)
+            if digest == conversation.digest:
+                self.full_history_requests += 1
+                return conversation, list(messages[conversation.message_count:])
+
+        messages = list(messages)
+        if messages and chain_digest("", *messages[0]) == conversation.first_digest:
+            if any(role == "assistant" for role, _ in messages[1:]):
+                # Same start, different transcript (edited or regenerated history): rebuild
+                self.resets += 1
+                logger.info(f"Conversation {conversation_id}: history diverged, rebuilding")
+                return Conversation(id=conversation_id, created_at=conversation.created_at), messages
+            # A repeated opening message (e.g. the system prompt) is already stored
+            messages = messages[1:]
+
+        # Incremental client: everything else sent is new
+        self.incremental_requests += 1
+        return conversation, messages
+
+    def begin_turn(self, conversation_id: str, messages: Sequence[Message]) -> Tuple[Conversation, Optional[Message]]:
+        """
+        Sync a request and add its new messages, except the last, to the transcript.
+
+        Returns:
+            (conversation, query) where query is the last new message, or
+            None if the request added nothing. Nothing is saved until
+            complete_turn, so a failed generation leaves the store unchanged.
+        """
+        conversation, new_messages = self.sync(conversation_id, messages)
+        if not new_messages:
+            return conversation, None
+        for role, content in new_messages[:-1]:
+            self.append(conversation, role, content)
+            conversation.pending.append({"role": role, "content": content})
+        return conversation, new_messages[-1]
+
+    def complete_turn(self, conversation: Conversation, query: Message, reply: str) -> Conversation:
+        """
+        Record the query and the assistant's reply, fold, then save.
+
+        If another turn on the same conversation was saved after this one's
+        begin_turn, this turn's messages are replayed on top of the stored
+        conversation instead of overwriting it.
+
+        Returns:
+            The conversation as saved
+        """
+        with self._lock_for(conversation.id):
+            stored = self.get(conversation.id)
+            if (stored.digest if stored else "") != conversation.base_digest:
+                self.conflicts += 1
+                logger.info(f"Conversation {conversation.id}: concurrent turn, replaying on latest")
+                latest = stored or Conversation(id=conversation.id, created_at=conversation.created_at)
+                pending = [(m["role"], m["content"]) for m in conversation.pending]
+                if pending and chain_digest("", *pending[0]) == latest.first_digest:
+                    pending = pending[1:]  # Same opening message (e.g. system prompt) as the stored turn
+                for role, content in pending:
+                    self.append(latest, role, content)
+                conversation = latest
+            self.append(conversation, *query)
+            self.append(conversation, "assistant", reply)
+            self.fold(conversation)
+            self.save(conversation)
+            conversation.base_digest = conversation.digest
+            conversation.pending = []
+        return conversation
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._cache.stats(),
+            "full_history_requests": self.full_history_requests,
+            "incremental_requests": self.incremental_requests,
+            "resets": self.resets,
+            "conflicts": self.conflicts,
+        }
@@ -0,0 +1,132 @@
+"""
+KAEDRA v0.0.6 - Single Flight
+Coalesces identical concurrent calls into one upstream request.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("future", "task", "waiters")
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 1
+
+
+class SingleFlight:
+    """
+    In-flight deduplication keyed by request identity.
+
+    The first caller for a key (the leader) runs the work; callers that
+    arrive while it is running wait for and share its result.
+
+    Features:
+    - Sync (do) and async (do_async) callers share the same flights, across
+      threads and event loops
+    - Async work runs in its own task, so cancelling the leader's caller
+      does not fail the followers
+    - The shared task is cancelled only when every async waiter has gone
+    - Exceptions propagate to every waiter
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.followers = 0
+
+    def _join(self, key: str) -> Tuple[_Call, bool]:
+        """Get or create the flight for key; returns (call, is_leader)."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.followers += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self.leaders += 1
+            return call, True
+
+    def _finish(self, key: str, call: _Call):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        Run fn() once per concurrent key.
+
+        Returns:
+            (result, shared) where shared is True for followers
+        """
+        call, leader = self._join(key)
+        if not leader:
+            return call.future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.future.set_exception(e)
+            raise
+        else:
+            call.future.set_result(result)
+        finally:
+            self._finish(key, call)
+        return result, False
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Async do; awaiting never blocks the event loop.
+
+        Returns:
+            (result, shared) where shared is True for followers
+        """
+        call, leader = self._join(key)
+        if leader:
+            call.task = asyncio.get_running_loop().create_task(self._run(key, call, fn))
+
+        try:
+            result = await asyncio.shield(asyncio.wrap_future(call.future))
+        except asyncio.CancelledError:
+            self._abandon(call)
+            raise
+        return result, not leader
+
+    async def _run(self, key: str, call: _Call, fn: Callable[[], Awaitable[Any]]):
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.future.cancel()
+        except BaseException as e:
+            if not call.future.done():
+                call.future.set_exception(e)
+        else:
+            if not call.future.done():
+                call.future.set_result(result)
+        finally:
+            self._finish(key, call)
+
+    def _abandon(self, call: _Call):
+        """A waiter was cancelled; cancel the work if nobody else is waiting."""
+        with self._lock:
+            call.waiters -= 1
+            orphaned = call.waiters == 0 and not call.future.done()
+        if orphaned and call.task is not None:
+            call.task.get_loop().call_soon_threadsafe(call.task.cancel)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.followers,
+        }
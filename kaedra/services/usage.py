@@ -0,0 +1,207 @@
+"""
+KAEDRA v0.0.6 - Usage Accounting
+Token counts per LLM call and roll-ups per model, agent and session.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+from ..core.config import MODEL_PRICING, DEFAULT_MODEL_PRICING
+
+
+logger = logging.getLogger("kaedra.services.usage")
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local token estimate (~4 characters per token for Gemini)."""
+    if not text:
+        return 0
+    return max(1, (len(text) + 3) // 4)
+
+
+@dataclass
+class TokenUsage:
+    """Token counts for one call (or a sum of calls)."""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0       # Part of prompt_tokens served from context cache
+    estimated: bool = False      # True if any count came from estimate_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def __add__(self, other: "TokenUsage") -> "TokenUsage":
+        return TokenUsage(
+            prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+            completion_tokens=self.completion_tokens + other.completion_tokens,
+            cached_tokens=self.cached_tokens + other.cached_tokens,
+            estimated=self.estimated or other.estimated
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "total_tokens": self.total_tokens}
+
+    def to_openai(self) -> Dict[str, Any]:
+        """OpenAI `usage` object."""
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "prompt_tokens_details": {"cached_tokens": self.cached_tokens},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["TokenUsage"]:
+        if not data:
+            return None
+        return cls(
+            prompt_tokens=data.get("prompt_tokens", 0),
+            completion_tokens=data.get("completion_tokens", 0),
+            cached_tokens=data.get("cached_tokens", 0),
+            estimated=data.get("estimated", False)
+        )
+
+
+def usage_from_response(response: Any, prompt: str, text: str = None) -> TokenUsage:
+    """
+    Read usage_metadata from a Gemini response (or final stream chunk).
+
+    Counts the API did not report are estimated locally.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    completion_tokens = getattr(usage, "candidates_token_count", None)
+    cached_tokens = getattr(usage, "cached_content_token_count", None) or 0
+
+    estimated = False
+    if not prompt_tokens:
+        prompt_tokens = estimate_tokens(prompt)
+        estimated = True
+    if completion_tokens is None:
+        if text is None:
+            text = getattr(response, "text", "") or ""
+        completion_tokens = estimate_tokens(text)
+        estimated = True
+
+    return TokenUsage(
+        prompt_tokens=int(prompt_tokens),
+        completion_tokens=int(completion_tokens),
+        cached_tokens=int(cached_tokens),
+        estimated=estimated
+    )
+
+
+def cost_usd(usage: TokenUsage, model: str) -> float:
+    """Cost of a call from MODEL_PRICING (USD per 1M tokens)."""
+    pricing = MODEL_PRICING.get(model, DEFAULT_MODEL_PRICING)
+    uncached = usage.prompt_tokens - usage.cached_tokens
+    return (
+        uncached * pricing["input"]
+        + usage.cached_tokens * pricing.get("cached_input", pricing["input"])
+        + usage.completion_tokens * pricing["output"]
+    ) / 1_000_000
+
+
+class _Rollup:
+    __slots__ = ("calls", "usage", "cost_usd")
+
+    def __init__(self):
+        self.calls = 0
+        self.usage = TokenUsage()
+        self.cost_usd = 0.0
+
+    def add(self, usage: TokenUsage, cost: float):
+        self.calls += 1
+        self.usage = self.usage + usage
+        self.cost_usd += cost
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"calls": self.calls, **self.usage.to_dict(), "cost_usd": round(self.cost_usd, 6)}
+
+
+class UsageTracker:
+    """
+    Rolls up token usage of upstream LLM calls.
+
+    Cache hits and coalesced followers are not recorded: only calls that
+    reached the model spend tokens.
+
+    Features:
+    - Totals per model, per agent and for the session
+    - Cost from MODEL_PRICING
+    - Every call is fed to LoggingService.log_api_call when a logging
+      service is attached (otherwise to the kaedra.services.usage logger)
+    """
+
+    def __init__(self, logging_service=None):
+        self.logging_service = logging_service
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new session."""
+        with self._lock:
+            self.session_started = time.time()
+            self._session = _Rollup()
+            self._by_model: Dict[str, _Rollup] = {}
+            self._by_agent: Dict[str, _Rollup] = {}
+
+    def record(self, usage: TokenUsage, model: str, agent: str = None, duration_ms: float = 0.0) -> float:
+        """
+        Record one upstream call.
+
+        Returns:
+            The call's cost in USD
+        """
+        cost = cost_usd(usage, model)
+        with self._lock:
+            self._session.add(usage, cost)
+            self._by_model.setdefault(model, _Rollup()).add(usage, cost)
+            self._by_agent.setdefault(agent or "direct", _Rollup()).add(usage, cost)
+
+        if self.logging_service is not None:
+            self.logging_service.log_api_call(
+                model, usage.prompt_tokens, usage.completion_tokens, duration_ms,
+                tokens_cached=usage.cached_tokens, cost_usd=cost
+            )
+        else:
+            logger.info(
+                f"API [{model}]: in={usage.prompt_tokens}, out={usage.completion_tokens}, "
+                f"cached={usage.cached_tokens}, time={duration_ms:.2f}ms, cost=${cost:.6f}"
+            )
+        return cost
+
+    @property
+    def session_usage(self) -> TokenUsage:
+        with self._lock:
+            return self._session.usage
+
+    def summary(self) -> Dict[str, Any]:
+        """Session totals plus per-model and per-agent breakdowns."""
+        with self._lock:
+            return {
+                "session": {
+                    **self._session.to_dict(),
+                    "duration_s": round(time.time() - self.session_started, 1),
+                },
+                "by_model": {name: rollup.to_dict() for name, rollup in self._by_model.items()},
+                "by_agent": {name: rollup.to_dict() for name, rollup in self._by_agent.items()},
+            }
+
+
+# Shared instance so every PromptService in a process rolls up together
+_usage_tracker: Optional[UsageTracker] = None
+_usage_tracker_lock = threading.Lock()
+
+
+def get_usage_tracker() -> UsageTracker:
+    """Get the global usage tracker."""
+    global _usage_tracker
+    with _usage_tracker_lock:
+        if _usage_tracker is None:
+            _usage_tracker = UsageTracker()
+    return _usage_tracker
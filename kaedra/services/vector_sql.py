@@ -0,0 +1,242 @@
+"""
+KAEDRA v0.0.6 - Vector Search SQL
+Pure BigQuery SQL builders for the vector store (no GCP imports, so the
+generated SQL and parameters can be checked offline).
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..core.config import IMPORTANCE_LEVELS
+
+
+# Columns returned by every search query
+RESULT_COLUMNS = ("id", "content", "topic", "tags", "importance", "metadata", "timestamp")
+
+# Columns stored in the vector index so filters can be applied during the search
+INDEX_STORED_COLUMNS = ("topic", "tags", "importance", "timestamp")
+
+_IDENTIFIER = re.compile(r"^[A-Za-z0-9_\-.]+$")
+
+
+@dataclass
+class QueryParam:
+    """A named BigQuery query parameter (array when is_array is set)."""
+    name: str
+    type: str  # STRING, FLOAT64, INT64, TIMESTAMP
+    value: Any
+    is_array: bool = False
+
+
+@dataclass
+class VectorQuery:
+    """Generated SQL plus the parameters it references."""
+    sql: str
+    params: List[QueryParam] = field(default_factory=list)
+
+    def param_values(self) -> Dict[str, Any]:
+        return {p.name: p.value for p in self.params}
+
+
+@dataclass
+class SearchFilters:
+    """Optional predicates pushed into the vector search WHERE clause."""
+    topic: Optional[str] = None
+    tags: Optional[List[str]] = None  # Match any, case-insensitive (like the keyword index)
+    min_importance: Optional[str] = None
+    since: Optional[Union[datetime, str]] = None
+    until: Optional[Union[datetime, str]] = None
+
+    def is_empty(self) -> bool:
+        return not (self.topic or self.tags or self.min_importance or self.since or self.until)
+
+    def importance_levels(self) -> List[str]:
+        """Importance values at or above min_importance."""
+        floor = IMPORTANCE_LEVELS.get(self.min_importance, 0)
+        return [name for name, level in IMPORTANCE_LEVELS.items() if level >= floor]
+
+    def normalized_tags(self) -> List[str]:
+        """Filter tags lowercased, as the keyword index stores them."""
+        return [tag.lower() for tag in self.tags or []]
+
+    def time_bounds(self) -> Tuple[Optional[str], Optional[str]]:
+        """(since, until) as ISO strings, comparable with stored timestamps."""
+        return (_iso(self.since) if self.since else None, _iso(self.until) if self.until else None)
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        """Apply the same predicates to an in-memory record (local store)."""
+        if self.topic and record.get("topic") != self.topic:
+            return False
+        if self.tags and not set(self.normalized_tags()) & {t.lower() for t in record.get("tags") or []}:
+            return False
+        if self.min_importance and record.get("importance", "normal") not in self.importance_levels():
+            return False
+        timestamp = record.get("timestamp") or ""
+        since, until = self.time_bounds()
+        if since and timestamp < since:
+            return False
+        if until and timestamp > until:
+            return False
+        return True
+
+
+def _iso(value: Union[datetime, str]) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def quote_table(table_id: str) -> str:
+    """Backtick-quote a project.dataset.table id, rejecting anything unsafe."""
+    if not _IDENTIFIER.match(table_id):
+        raise ValueError(f"Invalid BigQuery table id: {table_id!r}")
+    return f"`{table_id}`"
+
+
+def build_filter_clause(filters: Optional[SearchFilters]) -> Tuple[str, List[QueryParam]]:
+    """
+    Build a WHERE clause (without the keyword) for the given filters.
+
+    Returns:
+        (clause, params); clause is "TRUE" when there is nothing to filter
+    """
+    if not filters or filters.is_empty():
+        return "TRUE", []
+
+    clauses: List[str] = []
+    params: List[QueryParam] = []
+
+    if filters.topic:
+        clauses.append("topic = @topic")
+        params.append(QueryParam("topic", "STRING", filters.topic))
+    if filters.tags:
+        # tags are stored comma-joined and compared case-insensitively
+        clauses.append(
+            "EXISTS (SELECT 1 FROM UNNEST(SPLIT(IFNULL(tags, ''), ',')) AS tag "
+            "WHERE LOWER(tag) IN UNNEST(@tags))"
+        )
+        params.append(QueryParam("tags", "STRING", filters.normalized_tags(), is_array=True))
+    if filters.min_importance:
+        clauses.append("IFNULL(importance, 'normal') IN UNNEST(@importance_levels)")
+        params.append(QueryParam("importance_levels", "STRING", filters.importance_levels(), is_array=True))
+    if filters.since:
+        clauses.append("timestamp >= @since")
+        params.append(QueryParam("since", "TIMESTAMP", _iso(filters.since)))
+    if filters.until:
+        clauses.append("timestamp <= @until")
+        params.append(QueryParam("until", "TIMESTAMP", _iso(filters.until)))
+
+    return " AND ".join(clauses), params
+
+
+def build_search_query(
+    table_id: str,
+    query_embedding: List[float],
+    limit: int = 5,
+    min_similarity: float = 0.0,
+    filters: Optional[SearchFilters] = None,
+    use_vector_index: bool = False,
+    fraction_lists_to_search: Optional[float] = None
+) -> VectorQuery:
+    """
+    Build a parameterized similarity search.
+
+    The query embedding is passed as an ARRAY<FLOAT64> parameter, so the
+    SQL text stays small and cacheable. Brute force computes
+    COSINE_DISTANCE once per row in a subquery; with use_vector_index the
+    search goes through VECTOR_SEARCH, which uses the table's vector index
+    when one is active.
+    """
+    limit = int(limit)
+    if limit <= 0:
+        raise ValueError("limit must be positive")
+
+    table = quote_table(table_id)
+    where, params = build_filter_clause(filters)
+    params = [
+        QueryParam("query_embedding", "FLOAT64", [float(x) for x in query_embedding], is_array=True),
+        QueryParam("min_similarity", "FLOAT64", float(min_similarity)),
+        *params,
+    ]
+    columns = ", ".join(RESULT_COLUMNS)
+
+    if use_vector_index:
+        options = ""
+        if fraction_lists_to_search:
+            options = (
+                f",\n    options => '{{\"fraction_lists_to_search\": {float(fraction_lists_to_search)}}}'"
+            )
+        base_columns = ", ".join(f"base.{c}" for c in RESULT_COLUMNS)
+        sql = f"""
+SELECT {base_columns}, 1 - distance AS similarity
+FROM VECTOR_SEARCH(
+    (SELECT {columns}, embedding FROM {table} WHERE {where}),
+    'embedding',
+    (SELECT @query_embedding AS embedding),
+    top_k => {limit},
+    distance_type => 'COSINE'{options}
+)
+WHERE 1 - distance >= @min_similarity
+ORDER BY similarity DESC
+""".strip()
+    else:
+        sql = f"""
+SELECT {columns}, similarity
+FROM (
+    SELECT {columns}, 1 - COSINE_DISTANCE(embedding, @query_embedding) AS similarity
+    FROM {table}
+    WHERE {where}
+)
+WHERE similarity >= @min_similarity
+ORDER BY similarity DESC
+LIMIT {limit}
+""".strip()
+
+    return VectorQuery(sql, params)
+
+
+def build_delete_query(table_id: str, memory_id: str) -> VectorQuery:
+    """Delete one row by id."""
+    return VectorQuery(
+        f"DELETE FROM {quote_table(table_id)} WHERE id = @id",
+        [QueryParam("id", "STRING", memory_id)]
+    )
+
+
+def build_create_vector_index(
+    table_id: str,
+    index_name: str = "embedding_index",
+    index_type: str = "IVF",
+    num_lists: Optional[int] = None
+) -> str:
+    """DDL for a cosine vector index on the embedding column."""
+    if not _IDENTIFIER.match(index_name) or "." in index_name:
+        raise ValueError(f"Invalid index name: {index_name!r}")
+    if index_type not in ("IVF", "TREE_AH"):
+        raise ValueError(f"Unsupported index type: {index_type!r}")
+
+    options = [f"index_type = '{index_type}'", "distance_type = 'COSINE'"]
+    if num_lists and index_type == "IVF":
+        options.append(f"ivf_options = '{{\"num_lists\": {int(num_lists)}}}'")
+
+    return (
+        f"CREATE VECTOR INDEX IF NOT EXISTS {index_name}\n"
+        f"ON {quote_table(table_id)}(embedding)\n"
+        f"STORING({', '.join(INDEX_STORED_COLUMNS)})\n"
+        f"OPTIONS({', '.join(options)})"
+    )
+
+
+def build_row_count_query(table_id: str) -> VectorQuery:
+    """Count the table's rows (decides whether a vector index pays off)."""
+    return VectorQuery(f"SELECT COUNT(*) AS total FROM {quote_table(table_id)}")
+
+
+def build_vector_index_status_query(project_id: str, dataset_id: str, table_name: str) -> VectorQuery:
+    """Look up active vector indexes on a table."""
+    schema = quote_table(f"{project_id}.{dataset_id}.INFORMATION_SCHEMA.VECTOR_INDEXES")
+    return VectorQuery(
+        f"SELECT index_name, index_status, coverage_percentage FROM {schema} "
+        f"WHERE table_name = @table_name",
+        [QueryParam("table_name", "STRING", table_name)]
+    )
@@ -5,15 +5,25 @@ Ported from Dav1d's vector_store_bigquery.py
 """
 
 import os
+import threading
+import time
 import uuid
 import json
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from google.cloud import bigquery
-from google import genai
 
-from ..core.config import PROJECT_ID, LOCATION
+from ..core.config import (
+    PROJECT_ID, LOCATION, EMBEDDING_MODEL, BIGQUERY_INSERT_BATCH_ROWS,
+    BIGQUERY_VECTOR_INDEX, BIGQUERY_VECTOR_INDEX_MIN_ROWS, BIGQUERY_VECTOR_INDEX_CHECK_S,
+    BIGQUERY_VECTOR_INDEX_RECHECK_S
+)
+from .embedding import EmbeddingService, get_embedding_service
+from .vector_sql import (
+    SearchFilters, VectorQuery, build_search_query, build_delete_query,
+    build_create_vector_index, build_vector_index_status_query, build_row_count_query
+)
 
 
 class BigQueryVectorStore:
@@ -22,7 +32,13 @@ class BigQueryVectorStore:
     
     Features:
     - Semantic search using gemini-embedding-001
-    - Cosine similarity ranking
+    - Batched, cached embeddings via the shared EmbeddingService
+    - Streaming inserts for bulk loads
+    - Cosine similarity ranking with parameterized SQL (distance computed once)
+    - Topic / tag / importance / time filters pushed into the query
+    - VECTOR_SEARCH through a BigQuery vector index on large tables; index
+      status checks and creation run in a background thread, never on a
+      search
     - Automatic dataset/table initialization
     - Metadata support
     """
@@ -32,7 +48,10 @@ class BigQueryVectorStore:
         project_id: str = None, 
         location: str = None,
         dataset_id: str = "kaedra_memory",
-        table_id: str = "embeddings"
+        table_id: str = "embeddings",
+        embedder: EmbeddingService = None,
+        bq_client: Any = None,
+        vector_index: str = BIGQUERY_VECTOR_INDEX
     ):
         self.project_id = project_id or PROJECT_ID
         self.location = location or LOCATION
@@ -40,10 +59,22 @@ class BigQueryVectorStore:
         self.table_id = table_id
         self.full_table_id = f"{self.project_id}.{self.dataset_id}.{self.table_id}"
         
-        # Initialize clients
-        self._bq_client = None
-        self._genai_client = None
+        # Initialize clients (bq_client may be a stand-in for offline tests)
+        self._bq_client = bq_client
+        self.embedder = embedder or get_embedding_service()
         self._initialized = False
+        
+        # Vector index usage: "auto" checks INFORMATION_SCHEMA, "on"/"off" force it
+        self.vector_index = vector_index
+        self._index_active: Optional[bool] = None
+        self._index_checked_at = 0.0
+        self._index_requested = False
+        self._index_lock = threading.Lock()
+        self._index_refresh: Optional[threading.Thread] = None
+        # Last "too small for an index" count, plus rows this process added since
+        self._too_small_at: Optional[float] = None
+        self._known_rows = 0
+        self._rows_added = 0
     
     @property
     def bq_client(self) -> bigquery.Client:
@@ -52,17 +83,6 @@ class BigQueryVectorStore:
             self._bq_client = bigquery.Client(project=self.project_id)
         return self._bq_client
     
-    @property
-    def genai_client(self) -> genai.Client:
-        """Lazy-load Gen AI client."""
-        if self._genai_client is None:
-            self._genai_client = genai.Client(
-                vertexai=True, 
-                project=self.project_id, 
-                location=self.location
-            )
-        return self._genai_client
-    
     def initialize_dataset(self) -> bool:
         """
         Ensure the dataset and table exist.
@@ -108,6 +128,117 @@ class BigQueryVectorStore:
             print(f"[VectorStore] Initialization failed: {e}")
             return False
     
+    def _run_query(self, query: VectorQuery):
+        """Run a generated query, binding its parameters."""
+        query_parameters = []
+        for p in query.params:
+            if p.is_array:
+                query_parameters.append(bigquery.ArrayQueryParameter(p.name, p.type, p.value))
+            else:
+                query_parameters.append(bigquery.ScalarQueryParameter(p.name, p.type, p.value))
+        job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
+        return self.bq_client.query(query.sql, job_config=job_config)
+    
+    def has_active_vector_index(self, max_age_s: float = BIGQUERY_VECTOR_INDEX_CHECK_S) -> bool:
+        """
+        Whether an ACTIVE vector index covers the table.
+        
+        Never queries on the caller's path: "auto" mode answers from the
+        last refresh_vector_index and starts a background refresh once
+        that is older than max_age_s (searches brute-force until the first
+        refresh lands).
+        """
+        if self.vector_index == "on":
+            return True
+        if self.vector_index == "off":
+            return False
+        
+        if time.time() - self._index_checked_at >= max_age_s:
+            self._refresh_in_background()
+        return bool(self._index_active)
+    
+    def _refresh_in_background(self):
+        """Start refresh_vector_index in a daemon thread unless one is running."""
+        with self._index_lock:
+            if self._index_refresh is not None and self._index_refresh.is_alive():
+                return
+            self._index_refresh = threading.Thread(
+                target=self.refresh_vector_index, name="kaedra-vector-index", daemon=True
+            )
+            self._index_refresh.start()
+    
+    def refresh_vector_index(self) -> bool:
+        """
+        Check the vector index status, blocking (INFORMATION_SCHEMA query).
+        
+        A missing index is requested via ensure_vector_index once the table
+        reaches BIGQUERY_VECTOR_INDEX_MIN_ROWS rows. A "too small" count is
+        remembered: the table is only recounted once this process has added
+        enough rows to cross the threshold, or after
+        BIGQUERY_VECTOR_INDEX_RECHECK_S for rows written elsewhere.
+        
+        Returns:
+            True if an ACTIVE index covers the table
+        """
+        try:
+            rows = list(self._run_query(build_vector_index_status_query(
+                self.project_id, self.dataset_id, self.table_id
+            )))
+            if not rows and not self._index_requested and self._may_need_index():
+                # No index at all (a building one is listed as PENDING)
+                self._index_requested = self.ensure_vector_index()
+            self._index_active = any(row.index_status == "ACTIVE" for row in rows)
+        except Exception as e:
+            print(f"[VectorStore] Vector index check failed: {e}")
+            self._index_active = False
+        self._index_checked_at = time.time()
+        return self._index_active
+    
+    def _may_need_index(self) -> bool:
+        """False while the last row count is known to be too small."""
+        if self._too_small_at is None:
+            return True
+        if self._known_rows + self._rows_added >= BIGQUERY_VECTOR_INDEX_MIN_ROWS:
+            return True
+        return time.time() - self._too_small_at >= BIGQUERY_VECTOR_INDEX_RECHECK_S
+    
+    def ensure_vector_index(
+        self,
+        min_rows: int = BIGQUERY_VECTOR_INDEX_MIN_ROWS,
+        index_type: str = "IVF",
+        num_lists: Optional[int] = None
+    ) -> bool:
+        """
+        Create a cosine vector index on the embedding column once the table
+        is large enough for one to pay off.
+        
+        BigQuery builds the index in the background; searches switch to
+        VECTOR_SEARCH once it reports ACTIVE.
+        
+        Returns:
+            True if the index exists or was created
+        """
+        if not self.initialize_dataset():
+            return False
+        
+        try:
+            total = next(iter(self._run_query(build_row_count_query(self.full_table_id)))).total
+            if total < min_rows:
+                print(f"[VectorStore] {total} rows < {min_rows}, skipping vector index")
+                self._too_small_at = time.time()
+                self._known_rows = total
+                self._rows_added = 0
+                return False
+            
+            ddl = build_create_vector_index(self.full_table_id, index_type=index_type, num_lists=num_lists)
+            self.bq_client.query(ddl).result()
+            self._index_active = None
+            print(f"[VectorStore] Vector index requested on {self.table_id}")
+            return True
+        except Exception as e:
+            print(f"[VectorStore] Vector index creation failed: {e}")
+            return False
+    
     def get_embedding(self, text: str) -> List[float]:
         """
         Generate embedding using gemini-embedding-001.
@@ -118,15 +249,32 @@ class BigQueryVectorStore:
         Returns:
             List of floats representing the embedding vector
         """
-        try:
-            result = self.genai_client.models.embed_content(
-                model="gemini-embedding-001",
-                contents=text
-            )
-            return list(result.embeddings[0].values)
-        except Exception as e:
-            print(f"[VectorStore] Embedding failed: {e}")
-            return []
+        return self.embedder.embed(text, EMBEDDING_MODEL)
+    
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed many texts through the shared EmbeddingService, which serves
+        cache hits and sends the rest in as few batched calls as possible.
+        
+        Returns:
+            One embedding per input text (empty list where embedding failed)
+        """
+        return self.embedder.embed_many(texts, EMBEDDING_MODEL)
+    
+    def _build_row(self, content: str, embedding: List[float], topic: str = "general",
+                   tags: List[str] = None, importance: str = "normal",
+                   metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build a BigQuery row for a memory."""
+        return {
+            "id": f"vec_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}",
+            "content": content,
+            "topic": topic,
+            "tags": ",".join(tags) if tags else "",
+            "importance": importance,
+            "metadata": json.dumps(metadata) if metadata else None,
+            "embedding": embedding,
+            "timestamp": datetime.now().isoformat()
+        }
     
     def add_memory(
         self, 
@@ -149,34 +297,83 @@ class BigQueryVectorStore:
         if not embedding:
             return None
         
-        memory_id = f"vec_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
-        
-        row = {
-            "id": memory_id,
-            "content": content,
-            "topic": topic,
-            "tags": ",".join(tags) if tags else "",
-            "importance": importance,
-            "metadata": json.dumps(metadata) if metadata else None,
-            "embedding": embedding,
-            "timestamp": datetime.now().isoformat()
-        }
+        row = self._build_row(content, embedding, topic, tags, importance, metadata)
         
         try:
             errors = self.bq_client.insert_rows_json(self.full_table_id, [row])
             if errors:
                 print(f"[VectorStore] Insert error: {errors}")
                 return None
-            return memory_id
+            self._rows_added += 1
+            return row["id"]
         except Exception as e:
             print(f"[VectorStore] Add memory failed: {e}")
             return None
     
+    def add_memories(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Add many memories with batched embeddings and streaming inserts.
+        
+        Args:
+            items: Dicts with content and optional topic, tags,
+                importance and metadata (same fields as add_memory)
+        
+        Returns:
+            One {"id", "error"} dict per item, in input order
+        """
+        results: List[Dict[str, Any]] = [{"id": None, "error": None} for _ in items]
+        if not items:
+            return results
+        
+        if not self.initialize_dataset():
+            for r in results:
+                r["error"] = "vector store initialization failed"
+            return results
+        
+        embeddings = self.get_embeddings([item["content"] for item in items])
+        
+        rows, positions = [], []
+        for i, (item, embedding) in enumerate(zip(items, embeddings)):
+            if not embedding:
+                results[i]["error"] = "embedding failed"
+                continue
+            rows.append(self._build_row(
+                item["content"], embedding,
+                topic=item.get("topic", "general"),
+                tags=item.get("tags"),
+                importance=item.get("importance", "normal"),
+                metadata=item.get("metadata")
+            ))
+            positions.append(i)
+        
+        for start in range(0, len(rows), BIGQUERY_INSERT_BATCH_ROWS):
+            chunk = rows[start:start + BIGQUERY_INSERT_BATCH_ROWS]
+            chunk_positions = positions[start:start + BIGQUERY_INSERT_BATCH_ROWS]
+            try:
+                errors = self.bq_client.insert_rows_json(self.full_table_id, chunk)
+            except Exception as e:
+                errors = [{"index": j, "errors": [str(e)]} for j in range(len(chunk))]
+            
+            failed = {err.get("index"): err.get("errors") for err in errors or []}
+            self._rows_added += len(chunk) - len(failed)
+            for j, (row, pos) in enumerate(zip(chunk, chunk_positions)):
+                if j in failed:
+                    results[pos]["error"] = str(failed[j])
+                else:
+                    results[pos]["id"] = row["id"]
+        
+        return results
+    
     def search_similar(
         self, 
         query: str, 
         limit: int = 5,
-        min_similarity: float = 0.0
+        min_similarity: float = 0.0,
+        topic: str = None,
+        tags: List[str] = None,
+        min_importance: str = None,
+        since: Any = None,
+        until: Any = None
     ) -> List[Dict[str, Any]]:
         """
         Search for semantically similar memories.
@@ -185,6 +382,10 @@ class BigQueryVectorStore:
             query: Search query
             limit: Max results to return
             min_similarity: Minimum similarity threshold (0-1)
+            topic: Only this topic
+            tags: Only memories with any of these tags
+            min_importance: Minimum importance level
+            since / until: Timestamp bounds (datetime or ISO string)
             
         Returns:
             List of matching memories with similarity scores
@@ -196,29 +397,18 @@ class BigQueryVectorStore:
         if not query_embedding:
             return []
         
-        # SQL for vector search using cosine distance
-        sql = f"""
-        SELECT
-            id,
-            content,
-            topic,
-            tags,
-            importance,
-            metadata,
-            timestamp,
-            1 - COSINE_DISTANCE(embedding, {query_embedding}) as similarity
-        FROM
-            `{self.full_table_id}`
-        WHERE
-            1 - COSINE_DISTANCE(embedding, {query_embedding}) >= {min_similarity}
-        ORDER BY
-            similarity DESC
-        LIMIT {limit}
-        """
+        sql_query = build_search_query(
+            self.full_table_id,
+            query_embedding,
+            limit=limit,
+            min_similarity=min_similarity,
+            filters=SearchFilters(topic, tags, min_importance, since, until),
+            use_vector_index=self.has_active_vector_index()
+        )
         
         try:
             results = []
-            for row in self.bq_client.query(sql):
+            for row in self._run_query(sql_query):
                 results.append({
                     "id": row.id,
                     "content": row.content,
@@ -237,8 +427,7 @@ class BigQueryVectorStore:
     def delete_memory(self, memory_id: str) -> bool:
         """Delete a memory by ID."""
         try:
-            sql = f"DELETE FROM `{self.full_table_id}` WHERE id = '{memory_id}'"
-            self.bq_client.query(sql).result()
+            self._run_query(build_delete_query(self.full_table_id, memory_id)).result()
             return True
         except Exception as e:
             print(f"[VectorStore] Delete failed: {e}")
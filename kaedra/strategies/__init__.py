@@ -1,11 +1,11 @@
 """KAEDRA Strategies - Advanced prompting techniques."""
 
-from .tree_of_thought import TreeOfThoughtsStrategy
-from .battle_of_bots import BattleOfBotsStrategy
+from .tree_of_thought import TreeOfThoughtsStrategy, ToTResult, ToTNode
+from .battle_of_bots import BattleOfBotsStrategy, BattleResult
 from .presets import PromptOptimizer, BUILTIN_PRESETS, Preset
 
 __all__ = [
-    'TreeOfThoughtsStrategy',
-    'BattleOfBotsStrategy',
+    'TreeOfThoughtsStrategy', 'ToTResult', 'ToTNode',
+    'BattleOfBotsStrategy', 'BattleResult',
     'PromptOptimizer', 'BUILTIN_PRESETS', 'Preset'
 ]
@@ -3,11 +3,25 @@ KAEDRA v0.0.6 - Battle of Bots Strategy
 Adversarial validation through competing perspectives.
 """
 
-from typing import Optional
-from dataclasses import dataclass
+import asyncio
+import time
+from typing import Optional, Callable, Dict, List, Tuple
+from dataclasses import dataclass, field
 
-from ..services.prompt import PromptService
+from ..services.prompt import PromptService, PromptResult
 from ..core.config import Colors
+from ..core.exceptions import KaedraError
+from ..agents.blade import BLADE_PROFILE
+from ..agents.nyx import NYX_PROFILE
+
+
+# (name, system profile, drafting brief); extra bots reuse these in turn
+PERSONAS: List[Tuple[str, str, str]] = [
+    ("BLADE", BLADE_PROFILE,
+     "Aggressive, action-focused, direct. Prioritize speed and impact. \"Ship it\" mentality."),
+    ("NYX", NYX_PROFILE,
+     "Strategic, risk-aware, thoughtful. Consider long-term implications. \"Measure twice, cut once\" mentality."),
+]
 
 
 @dataclass
@@ -18,85 +32,185 @@ class BattleResult:
     critique: str
     golden_version: str
     full_battle: str
+    drafts: Dict[str, str] = field(default_factory=dict)         # Every bot's draft, by bot name
+    timings_ms: Dict[str, float] = field(default_factory=dict)   # drafts / critique / synthesis / total
+    errors: Dict[str, str] = field(default_factory=dict)         # Failed stages, by bot or stage name
+    
+    @property
+    def ok(self) -> bool:
+        return "synthesis" not in self.errors and "critique" not in self.errors
 
 
 class BattleOfBotsStrategy:
     """
     Battle of Bots adversarial validation.
-    
-    Generates competing perspectives:
-    - BLADE VERSION: Aggressive, action-focused
-    - NYX VERSION: Strategic, risk-aware
-    - CRITIQUE: Brutal honest review
-    - GOLDEN VERSION: Synthesized best of both
+
+    Staged pipeline:
+    - DRAFTS: num_bots concurrent calls, each with its own persona
+      (BLADE: aggressive, action-focused; NYX: strategic, risk-aware)
+    - CRITIQUE: one brutal, honest review of every draft
+    - GOLDEN VERSION: one synthesis call, streamed as it is written
     """
     
     def __init__(self, prompt_service: PromptService, num_bots: int = 2):
         self.prompt = prompt_service
         self.num_bots = num_bots
     
-    def execute(self, task: str, model_key: str = None) -> str:
+    def _bots(self) -> List[Tuple[str, str, str]]:
+        """(name, profile, brief) for each bot; repeated personas are numbered."""
+        bots = []
+        for i in range(self.num_bots):
+            name, profile, brief = PERSONAS[i % len(PERSONAS)]
+            round_num = i // len(PERSONAS)
+            bots.append((f"{name} #{round_num + 1}" if round_num else name, profile, brief))
+        return bots
+    
+    async def execute_async(self, task: str, model_key: str = None,
+                            on_chunk: Optional[Callable[[str], None]] = None) -> BattleResult:
         """
         Run the Battle of Bots.
-        
+
         Args:
             task: The task or content to battle-test
             model_key: Override model key
-            
+            on_chunk: Receives golden-version chunks as they stream
+                      (default: print them)
+
         Returns:
-            Full battle analysis text
+            BattleResult with every draft, the critique and the golden version
         """
         print(f"\n{Colors.GOLD}[⚔️  BATTLE OF THE BOTS]{Colors.RESET}")
         print(f"{Colors.DIM}Task: {task}{Colors.RESET}\n")
-        
-        battle_prompt = f"""Adversarial Validation Protocol - Battle of the Bots:
 
-TASK: {task}
+        start_time = time.time()
+        timings: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
 
-═══════════════════════════════════════════════════════════════════════════════
-ROUND 1 - COMPETING DRAFTS
-═══════════════════════════════════════════════════════════════════════════════
+        # ROUND 1 - competing drafts, all at once
+        print(f"{Colors.NEON_RED}[ROUND 1]{Colors.RESET} Generating {self.num_bots} competing drafts...\n")
+        bots = self._bots()
+        results: List[PromptResult] = await asyncio.gather(*[
+            self.prompt.generate_async(
+                f"""Adversarial Validation Protocol - Battle of the Bots.
 
-Generate TWO distinct versions:
-
-[BLADE VERSION]
-- Aggressive, action-focused, direct
-- Prioritize speed and impact
-- "Ship it" mentality
-
-[NYX VERSION]
-- Strategic, risk-aware, thoughtful
-- Consider long-term implications
-- "Measure twice, cut once" mentality
+TASK: {task}
 
-═══════════════════════════════════════════════════════════════════════════════
-ROUND 2 - BRUTAL CRITIQUE
-═══════════════════════════════════════════════════════════════════════════════
+Write your version. {brief}
+Another bot is writing a competing version; make yours the one that wins.""",
+                model_key,
+                system_instruction=profile,
+                # Repeated personas must not collapse into one cached answer
+                bypass_cache=name not in (persona[0] for persona in PERSONAS),
+                agent="BATTLE"
+            )
+            for name, profile, brief in bots
+        ])
+        timings["drafts"] = (time.time() - start_time) * 1000
+
+        drafts: Dict[str, str] = {}
+        for (name, _, _), result in zip(bots, results):
+            if result.ok:
+                drafts[name] = result.text
+                print(f"{Colors.DIM}[{name} VERSION]{Colors.RESET}\n{result.text}\n")
+            else:
+                errors[name] = result.error.message
+                print(f"{Colors.NEON_RED}[{name}] {result.error.message}{Colors.RESET}\n")
+
+        critique = ""
+        golden = ""
+        if not drafts:
+            errors["critique"] = "no drafts to critique"
+        else:
+            versions = "\n\n".join(f"[{name} VERSION]\n{text}" for name, text in drafts.items())
+
+            # ROUND 2 - brutal critique
+            print(f"{Colors.NEON_RED}[ROUND 2]{Colors.RESET} Critiquing...\n")
+            stage_start = time.time()
+            result = await self.prompt.generate_async(
+                f"""TASK: {task}
+
+{versions}
 
 As THE CRITIC (harsh, brutally honest):
-- Roast both versions mercilessly
+- Roast every version mercilessly
 - Point out weaknesses, flaws, gaps
 - What would make someone ANGRY about each?
 - What's missing? What's wrong?
-- No sugarcoating. Be ruthless.
+- No sugarcoating. Be ruthless.""",
+                model_key,
+                agent="BATTLE"
+            )
+            timings["critique"] = (time.time() - stage_start) * 1000
+            if not result.ok:
+                errors["critique"] = result.error.message
+                print(f"{Colors.NEON_RED}[CRITIC] {result.error.message}{Colors.RESET}\n")
+            else:
+                critique = result.text
+                print(f"{critique}\n")
+
+                # ROUND 3 - golden synthesis, streamed
+                print(f"{Colors.GOLD}[ROUND 3]{Colors.RESET} GOLDEN VERSION\n")
+                stage_start = time.time()
+                golden, error = await self._synthesize(task, versions, critique, model_key, on_chunk)
+                timings["synthesis"] = (time.time() - stage_start) * 1000
+                if error:
+                    errors["synthesis"] = error
+
+        timings["total"] = (time.time() - start_time) * 1000
+        print(f"\n{Colors.GOLD}[⚔️  BATTLE CONCLUDED]{Colors.RESET}\n")
+
+        sections = [
+            f"## {name} VERSION\n" + (drafts[name] if name in drafts else f"[failed: {errors[name]}]")
+            for name, _, _ in bots
+        ]
+        if critique:
+            sections.append(f"## CRITIQUE\n{critique}")
+        if golden or "synthesis" in errors:
+            sections.append(f"## GOLDEN VERSION\n{golden}" + (
+                f"\n[synthesis failed: {errors['synthesis']}]" if "synthesis" in errors else ""))
+
+        return BattleResult(
+            blade_version=drafts.get("BLADE", ""),
+            nyx_version=drafts.get("NYX", ""),
+            critique=critique,
+            golden_version=golden,
+            full_battle="\n\n".join(sections),
+            drafts=drafts,
+            timings_ms=timings,
+            errors=errors
+        )
+    
+    async def _synthesize(self, task: str, versions: str, critique: str, model_key: str,
+                          on_chunk: Optional[Callable[[str], None]]) -> Tuple[str, Optional[str]]:
+        """Stream the golden version; returns (text, error message or None)."""
+        emit = on_chunk or (lambda chunk: print(chunk, end="", flush=True))
+        chunks = []
+        try:
+            async for chunk in self.prompt.generate_stream_async(
+                f"""TASK: {task}
 
-═══════════════════════════════════════════════════════════════════════════════
-ROUND 3 - GOLDEN SYNTHESIS
-═══════════════════════════════════════════════════════════════════════════════
+{versions}
 
-Create ONE final [GOLDEN VERSION]:
+[CRITIQUE]
+{critique}
+
+Create ONE final GOLDEN VERSION:
 - Address ALL critique points
-- Merge the best elements from both versions
+- Merge the best elements from every version
 - Fix the weaknesses identified
-- This should be objectively better than either original
-
-Show all three rounds with clear separation.
-"""
-        
-        print(f"{Colors.NEON_RED}[ROUND 1]{Colors.RESET} Generating competing drafts...\n")
-        
-        result = self.prompt.generate(battle_prompt, model_key)
-        print(f"{result.text}\n")
-        print(f"{Colors.GOLD}[⚔️  BATTLE CONCLUDED]{Colors.RESET}\n")
-        
-        return result.text
+- This should be objectively better than any original
+
+Reply with the golden version only.""",
+                model_key,
+                agent="BATTLE"
+            ):
+                chunks.append(chunk)
+                emit(chunk)
+        except KaedraError as e:
+            return "".join(chunks), e.message
+        return "".join(chunks), None
+    
+    def execute(self, task: str, model_key: str = None,
+                on_chunk: Optional[Callable[[str], None]] = None) -> BattleResult:
+        """Synchronous version of execute_async for non-async contexts."""
+        return asyncio.run(self.execute_async(task, model_key, on_chunk))
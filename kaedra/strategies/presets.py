@@ -3,6 +3,7 @@ KAEDRA v0.0.6 - Prompt Presets
 User-defined and built-in prompt templates.
 """
 
+import asyncio
 from typing import Dict, Optional
 from dataclasses import dataclass
 
@@ -67,7 +68,7 @@ class PromptOptimizer:
     def __init__(self, prompt_service: PromptService):
         self.prompt = prompt_service
     
-    def optimize(self, raw_prompt: str, model_key: str = None) -> str:
+    async def optimize_async(self, raw_prompt: str, model_key: str = None) -> str:
         """
         Transform a rough prompt into an optimized one.
         
@@ -107,11 +108,15 @@ EXPLANATION:
 [Brief explanation of what you improved and why]
 """
         
-        result = self.prompt.generate(optimizer_prompt, model_key)
+        result = await self.prompt.generate_async(optimizer_prompt, model_key, agent="OPTIMIZER")
         print(f"{Colors.NEON_GREEN}{result.text}{Colors.RESET}\n")
         
         return result.text
     
+    def optimize(self, raw_prompt: str, model_key: str = None) -> str:
+        """Synchronous version of optimize_async for non-async contexts."""
+        return asyncio.run(self.optimize_async(raw_prompt, model_key))
+    
     def get_preset(self, name: str) -> Optional[Preset]:
         """Get a preset by name."""
         # Check user presets first
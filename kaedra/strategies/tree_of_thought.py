@@ -1,79 +1,362 @@
 """
 KAEDRA v0.0.6 - Tree of Thought Strategy
-Multi-path reasoning with branch exploration.
+Multi-path reasoning with parallel branch exploration and beam pruning.
 """
 
-from typing import Optional
-from dataclasses import dataclass
+import asyncio
+import re
+import time
+from typing import Optional, List, Dict, Tuple
+from dataclasses import dataclass, field
 
 from ..services.prompt import PromptService, PromptResult
-from ..core.config import Colors
+from ..services.usage import TokenUsage
+from ..core.config import Colors, TOT_MAX_CONCURRENCY, TOT_BEAM_WIDTH, TOT_EVALUATOR_MODEL
+
+
+# Each sibling slot explores a different angle so parallel samples don't converge
+ANGLES = [
+    "Conservative/Safe: minimal risk, proven methods",
+    "Aggressive/Fast: maximum speed, accept some risk",
+    "Creative/Unconventional: a novel solution, outside the box",
+    "Resourceful/Lean: least time and money spent",
+    "Systematic/Scalable: builds something that keeps paying off",
+]
+
+_SCORE = re.compile(r"SCORE\W*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_REASON = re.compile(r"REASON\W*(.+)", re.IGNORECASE)
+
+
+@dataclass
+class ToTNode:
+    """One thought in the tree."""
+    id: str                      # Path-style id: "2.1" is the first child of the second root
+    depth: int
+    angle: str
+    thought: str = ""
+    score: float = 0.0           # Evaluator score, 0-10
+    rationale: str = ""
+    status: str = "pending"      # pending | kept | pruned | cancelled | failed (generation or evaluation)
+    latency_ms: float = 0.0      # Generation plus evaluation
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    error: Optional[str] = None
+    children: List["ToTNode"] = field(default_factory=list)
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status != "cancelled"
+    
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "depth": self.depth,
+            "angle": self.angle,
+            "thought": self.thought,
+            "score": self.score,
+            "rationale": self.rationale,
+            "status": self.status,
+            "latency_ms": self.latency_ms,
+            "usage": self.usage.to_dict(),
+            "error": self.error,
+            "children": [child.to_dict() for child in self.children],
+        }
 
 
 @dataclass
 class ToTResult:
     """Result from Tree of Thought analysis."""
-    approaches: list
-    evaluation: str
-    golden_path: str
-    full_analysis: str
+    task: str
+    approaches: List[ToTNode]              # Root branches (the tree)
+    best_path: List[ToTNode]               # Highest-scoring root-to-leaf path
+    golden_path: str                       # Synthesized final recommendation ("" if synthesis failed)
+    latency_ms: float = 0.0
+    synthesis_usage: TokenUsage = field(default_factory=TokenUsage)
+    error: Optional[str] = None            # Why there is no golden path
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+    
+    def nodes(self) -> List[ToTNode]:
+        """Every node, depth-first."""
+        stack, found = list(reversed(self.approaches)), []
+        while stack:
+            node = stack.pop()
+            found.append(node)
+            stack.extend(reversed(node.children))
+        return found
+    
+    @property
+    def usage(self) -> TokenUsage:
+        total = self.synthesis_usage
+        for node in self.nodes():
+            total = total + node.usage
+        return total
+    
+    @property
+    def full_analysis(self) -> str:
+        """Markdown rendering: the explored tree, then the golden path."""
+        lines = ["## Explored paths"]
+        for node in self.nodes():
+            label = node.status.upper() if node.status != "kept" else f"{node.score:g}/10"
+            summary = node.error or " — ".join(
+                part for part in (node.thought.splitlines()[0] if node.thought else "", node.rationale) if part
+            )
+            lines.append(f"{'  ' * (node.depth - 1)}- **{node.id}** [{label}] {node.angle.split(':')[0]}: {summary}")
+        lines.append("\n## Golden path")
+        lines.append(self.golden_path if self.ok else f"[synthesis failed: {self.error}]")
+        return "\n".join(lines)
+    
+    def to_dict(self) -> dict:
+        return {
+            "task": self.task,
+            "tree": [node.to_dict() for node in self.approaches],
+            "best_path": [node.id for node in self.best_path],
+            "golden_path": self.golden_path,
+            "error": self.error,
+            "latency_ms": self.latency_ms,
+            "usage": self.usage.to_dict(),
+        }
 
 
 class TreeOfThoughtsStrategy:
     """
     Tree of Thought (ToT) reasoning strategy.
-    
-    Breaks a task into multiple approaches:
-    - Conservative/Safe
-    - Aggressive/Fast
-    - Creative/Unconventional
-    
-    Then evaluates each and synthesizes a "golden path".
+
+    Features:
+    - `breadth` candidate thoughts per expanded node, generated as
+      independent parallel calls (one angle each: conservative,
+      aggressive, creative, ...)
+    - Each candidate scored by a cheap evaluator call (flash); a failed
+      or unparseable evaluation marks the candidate failed, so it never
+      takes a beam slot
+    - Beam search: the top `beam_width` candidates per level are
+      expanded until `depth`
+    - Promising candidates start expanding as soon as they are scored;
+      their subtrees are cancelled if they fall out of the beam
+    - One concurrency cap for every call in a run
+    - Structured ToTResult tree with per-node latency and token usage;
+      a failed synthesis is reported in ToTResult.error, not the golden path
     """
     
-    def __init__(self, prompt_service: PromptService, depth: int = 3, breadth: int = 3):
+    def __init__(self, prompt_service: PromptService, depth: int = 3, breadth: int = 3,
+                 beam_width: int = TOT_BEAM_WIDTH,
+                 max_concurrency: int = TOT_MAX_CONCURRENCY,
+                 evaluator_model: str = TOT_EVALUATOR_MODEL):
         self.prompt = prompt_service
         self.depth = depth
         self.breadth = breadth
+        self.beam_width = beam_width
+        self.max_concurrency = max_concurrency
+        self.evaluator_model = evaluator_model
     
-    def execute(self, task: str, model_key: str = None) -> str:
+    async def execute_async(self, task: str, model_key: str = None) -> ToTResult:
         """
         Perform Tree of Thought analysis.
-        
+
         Args:
             task: The task or question to analyze
-            model_key: Override model key
-            
+            model_key: Override model key for generating thoughts
+
         Returns:
-            Full analysis text
+            ToTResult with the explored tree and the golden path
         """
         print(f"\n{Colors.NEON_GREEN}[TREE OF THOUGHT]{Colors.RESET}")
-        print(f"{Colors.DIM}Generating multiple strategic paths...{Colors.RESET}\n")
-        
-        tot_prompt = f"""Using Tree of Thought (TOT) methodology:
+        print(f"{Colors.DIM}Exploring {self.breadth} branches x {self.depth} levels "
+              f"(beam {self.beam_width})...{Colors.RESET}\n")
 
-TASK: {task}
+        start_time = time.time()
+        limit = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def spawn(parent: Optional[ToTNode], path: List[ToTNode]) -> List[ToTNode]:
+            """Start generating and scoring the children of parent."""
+            depth = len(path) + 1
+            children = []
+            for i in range(self.breadth):
+                node = ToTNode(
+                    id=f"{parent.id}.{i + 1}" if parent else str(i + 1),
+                    depth=depth,
+                    angle=ANGLES[i % len(ANGLES)]
+                )
+                tasks[node.id] = asyncio.create_task(self._grow(node, task, path, model_key, limit))
+                children.append(node)
+            if parent:
+                parent.children = children
+            return children
+
+        roots = spawn(None, [])
+        paths: Dict[str, List[ToTNode]] = {node.id: [node] for node in roots}
+        level = roots
+        beam: List[ToTNode] = []
 
-Step 1 - BRAINSTORM: Generate 3 distinct approaches:
-- Approach A (Conservative/Safe): Minimal risk, proven methods
-- Approach B (Aggressive/Fast): Maximum speed, accept some risk
-- Approach C (Creative/Unconventional): Novel solution, outside the box
+        try:
+            for depth in range(1, self.depth + 1):
+                scored: List[ToTNode] = []
+                for done in asyncio.as_completed([tasks[node.id] for node in level]):
+                    node = await done
+                    if not node.ok:
+                        continue
+                    scored.append(node)
+                    # Speculatively expand a candidate that currently ranks in the beam
+                    rank = sorted(scored, key=lambda n: -n.score).index(node)
+                    if depth < self.depth and rank < self.beam_width:
+                        spawn(node, paths[node.id])
 
-Step 2 - EVALUATE: For each approach, analyze:
-- Strengths (what makes it good?)
-- Weaknesses (what could fail?)
-- Success likelihood (1-10)
-- Time/resources needed
+                if not scored:
+                    break
+                beam = sorted(scored, key=lambda n: -n.score)[:self.beam_width]
+                for node in level:
+                    if node in beam:
+                        node.status = "kept"
+                    elif node.ok:
+                        node.status = "pruned"
+                        self._cancel(node.children, tasks)
 
-Step 3 - SYNTHESIZE: Combine the best elements into one "golden path" solution.
-- Take the strengths from each approach
-- Mitigate the weaknesses
-- Create a hybrid that's better than any individual approach
+                print(f"{Colors.DIM}  Level {depth}: {len(scored)}/{len(level)} scored, kept "
+                      f"{', '.join(f'{n.id} ({n.score:g})' for n in beam) or 'none'}{Colors.RESET}")
 
-Present each step clearly with headers, then give your final recommendation.
+                if depth == self.depth:
+                    break
+
+                level = []
+                for node in beam:
+                    children = node.children or spawn(node, paths[node.id])
+                    for child in children:
+                        paths[child.id] = paths[node.id] + [child]
+                    level.extend(children)
+        finally:
+            # Pruned subtrees (and everything else, if we were cancelled)
+            pending = [t for t in tasks.values() if not t.done()]
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        # Best path ends at the top node of the deepest level that scored anything
+        best_path = paths[beam[0].id] if beam else []
+
+        golden_path, synthesis_usage, error = await self._synthesize(task, best_path, model_key, limit)
+        result = ToTResult(
+            task=task,
+            approaches=roots,
+            best_path=best_path,
+            golden_path=golden_path,
+            latency_ms=(time.time() - start_time) * 1000,
+            synthesis_usage=synthesis_usage,
+            error=error
+        )
+
+        print(f"{Colors.NEON_GREEN}[TOT RESULT]{Colors.RESET} "
+              f"{Colors.DIM}{len(result.nodes())} nodes, {result.usage.total_tokens} tokens, "
+              f"{result.latency_ms:.0f}ms{Colors.RESET}")
+        if result.ok:
+            print(f"{golden_path}\n")
+        else:
+            print(f"{Colors.NEON_RED}[synthesis failed] {error}{Colors.RESET}\n")
+
+        return result
+    
+    async def _grow(self, node: ToTNode, task: str, path: List[ToTNode],
+                    model_key: str, limit: asyncio.Semaphore) -> ToTNode:
+        """Generate a node's thought, then score it."""
+        start_time = time.time()
+        steps = "\n".join(f"{i + 1}. {step.thought}" for i, step in enumerate(path))
+        prompt = f"""TASK: {task}
+
+{f"PLAN SO FAR:{chr(10)}{steps}{chr(10)}{chr(10)}" if steps else ""}Propose the {"next step" if steps else "first step of an approach"} using this angle:
+{node.angle}
+
+Be concrete and brief (at most 5 sentences). Reply with the step only."""
+
+        try:
+            # Independent samples: skip the response cache and in-flight coalescing
+            async with limit:
+                result = await self.prompt.generate_async(
+                    prompt, model_key, temperature=0.9, max_tokens=512, bypass_cache=True, agent="TOT"
+                )
+            node.usage = result.usage or TokenUsage()
+            if not result.ok:
+                node.error = result.error.message
+                node.status = "failed"
+                return node
+            node.thought = result.text.strip()
+
+            evaluation = await self._evaluate(task, path + [node], limit)
+            node.usage = node.usage + (evaluation.usage or TokenUsage())
+            if not evaluation.ok:
+                node.error = f"evaluation failed: {evaluation.error.message}"
+                node.status = "failed"
+                return node
+            score = _SCORE.search(evaluation.text)
+            if not score:
+                # An unscored thought must not compete for the beam as a 0
+                node.error = "evaluation failed: no SCORE in evaluator reply"
+                node.status = "failed"
+                return node
+            reason = _REASON.search(evaluation.text)
+            node.score = min(10.0, float(score.group(1)))
+            node.rationale = reason.group(1).strip() if reason else ""
+            return node
+        except asyncio.CancelledError:
+            node.status = "cancelled"
+            raise
+        finally:
+            node.latency_ms = (time.time() - start_time) * 1000
+    
+    async def _evaluate(self, task: str, path: List[ToTNode], limit: asyncio.Semaphore) -> PromptResult:
+        """Score a path's latest step with the evaluator model."""
+        steps = "\n".join(f"{i + 1}. {step.thought}" for i, step in enumerate(path))
+        prompt = f"""TASK: {task}
+
+PLAN:
+{steps}
+
+Rate how likely this plan, ending with step {len(path)}, is to accomplish the task well.
+Consider feasibility, risk and payoff. Reply with exactly two lines:
+SCORE: <0-10>
+REASON: <one sentence>"""
+        async with limit:
+            return await self.prompt.generate_async(
+                prompt, self.evaluator_model, temperature=0.0, max_tokens=128, agent="TOT"
+            )
+    
+    async def _synthesize(self, task: str, best_path: List[ToTNode], model_key: str,
+                          limit: asyncio.Semaphore) -> Tuple[str, TokenUsage, Optional[str]]:
+        """Turn the best path into the golden path; returns (text, usage, error message or None)."""
+        if not best_path:
+            return "", TokenUsage(), "no branch could be generated and scored"
+
+        steps = "\n".join(f"{i + 1}. {step.thought}" for i, step in enumerate(best_path))
+        prompt = f"""Using Tree of Thought (TOT) methodology, this path scored highest:
+
+TASK: {task}
+
+BEST PATH:
+{steps}
+
+SYNTHESIZE: Turn this path into one "golden path" solution.
+- Keep its strengths
+- Mitigate its weaknesses
+- Give clear, ordered next actions and your final recommendation
 """
-        
-        result = self.prompt.generate(tot_prompt, model_key)
-        print(f"{Colors.NEON_GREEN}[TOT RESULT]{Colors.RESET}\n{result.text}\n")
-        
-        return result.text
+        async with limit:
+            result = await self.prompt.generate_async(prompt, model_key, agent="TOT")
+        if not result.ok:
+            return "", result.usage or TokenUsage(), result.error.message
+        return result.text, result.usage or TokenUsage(), None
+    
+    @staticmethod
+    def _cancel(nodes: List[ToTNode], tasks: Dict[str, asyncio.Task]):
+        """Cancel a pruned node's speculative subtree."""
+        for node in nodes:
+            task = tasks.get(node.id)
+            if task and not task.done():
+                task.cancel()
+                node.status = "cancelled"
+            elif node.ok:
+                node.status = "pruned"
+            TreeOfThoughtsStrategy._cancel(node.children, tasks)
+    
+    def execute(self, task: str, model_key: str = None) -> ToTResult:
+        """Synchronous version of execute_async for non-async contexts."""
+        return asyncio.run(self.execute_async(task, model_key))
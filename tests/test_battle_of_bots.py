@@ -0,0 +1,130 @@
+"""Offline tests for the Battle of Bots pipeline."""
+
+import asyncio
+
+from kaedra.agents.blade import BLADE_PROFILE
+from kaedra.agents.nyx import NYX_PROFILE
+from kaedra.core.exceptions import PromptError
+from kaedra.services.prompt import PromptResult
+from kaedra.strategies.battle_of_bots import BattleOfBotsStrategy
+
+
+class FakePrompt:
+    """
+    generate_async / generate_stream_async stand-in for drafts, critique and synthesis.
+
+    Draft calls are told apart by their system_instruction; failing_profiles
+    makes those drafts fail. The golden version streams golden_chunks, then
+    raises if stream_error is set.
+    """
+
+    def __init__(self, failing_profiles=(), critique_fails=False,
+                 golden_chunks=("Golden ", "version."), stream_error=None):
+        self.failing_profiles = set(failing_profiles)
+        self.critique_fails = critique_fails
+        self.golden_chunks = golden_chunks
+        self.stream_error = stream_error
+        self.drafts = []          # (system_instruction, bypass_cache) per draft call
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.streamed = False
+
+    async def generate_async(self, prompt, model_key=None, system_instruction=None,
+                             bypass_cache=False, **kwargs):
+        if system_instruction is None:  # Critique
+            if self.critique_fails:
+                return self._failure("critic down")
+            return self._result("Every version is weak.")
+
+        self.drafts.append((system_instruction, bypass_cache))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)  # Let the other drafts start
+        self.in_flight -= 1
+        if system_instruction in self.failing_profiles:
+            return self._failure("draft quota")
+        return self._result(f"draft {len(self.drafts)}")
+
+    async def generate_stream_async(self, prompt, model_key=None, **kwargs):
+        self.streamed = True
+        for chunk in self.golden_chunks:
+            yield chunk
+        if self.stream_error:
+            raise PromptError(self.stream_error)
+
+    @staticmethod
+    def _result(text):
+        return PromptResult(text=text, model="m", latency_ms=1.0)
+
+    @staticmethod
+    def _failure(message):
+        return PromptResult(text=f"[error] {message}", model="m", latency_ms=1.0,
+                            error=PromptError(message))
+
+
+def run(prompt, num_bots=2):
+    chunks = []
+    strategy = BattleOfBotsStrategy(prompt, num_bots=num_bots)
+    result = asyncio.run(strategy.execute_async("launch plan", on_chunk=chunks.append))
+    return result, chunks
+
+
+def test_repeated_personas_are_numbered():
+    names = [name for name, _, _ in BattleOfBotsStrategy(None, num_bots=5)._bots()]
+
+    assert names == ["BLADE", "NYX", "BLADE #2", "NYX #2", "BLADE #3"]
+
+
+def test_drafts_run_concurrently_and_repeats_bypass_cache():
+    prompt = FakePrompt()
+
+    result, chunks = run(prompt, num_bots=4)
+
+    assert prompt.max_in_flight == 4
+    assert prompt.drafts == [(BLADE_PROFILE, False), (NYX_PROFILE, False),
+                             (BLADE_PROFILE, True), (NYX_PROFILE, True)]
+    assert list(result.drafts) == ["BLADE", "NYX", "BLADE #2", "NYX #2"]
+    assert result.ok and not result.errors
+    assert chunks == ["Golden ", "version."]
+    assert result.golden_version == "Golden version."
+    assert set(result.timings_ms) == {"drafts", "critique", "synthesis", "total"}
+
+
+def test_failed_drafts_are_reported_and_the_rest_go_on():
+    result, _ = run(FakePrompt(failing_profiles=[NYX_PROFILE]), num_bots=3)
+
+    assert result.errors == {"NYX": "draft quota"}
+    assert list(result.drafts) == ["BLADE", "BLADE #2"]
+    assert result.ok and result.nyx_version == ""
+    assert "## NYX VERSION\n[failed: draft quota]" in result.full_battle
+
+
+def test_no_drafts_skips_critique():
+    prompt = FakePrompt(failing_profiles=[BLADE_PROFILE, NYX_PROFILE])
+
+    result, _ = run(prompt)
+
+    assert not result.ok
+    assert result.errors["critique"] == "no drafts to critique"
+    assert not prompt.streamed
+
+
+def test_failed_critique_skips_synthesis():
+    prompt = FakePrompt(critique_fails=True)
+
+    result, chunks = run(prompt)
+
+    assert not result.ok
+    assert result.errors == {"critique": "critic down"}
+    assert not prompt.streamed and chunks == []
+    assert result.golden_version == "" and "GOLDEN VERSION" not in result.full_battle
+    assert "synthesis" not in result.timings_ms
+
+
+def test_broken_synthesis_stream_keeps_partial_golden():
+    result, chunks = run(FakePrompt(golden_chunks=("Half ",), stream_error="stream cut"))
+
+    assert chunks == ["Half "]
+    assert result.golden_version == "Half "
+    assert result.errors == {"synthesis": "stream cut"} and not result.ok
+    assert result.full_battle.endswith("## GOLDEN VERSION\nHalf \n[synthesis failed: stream cut]")
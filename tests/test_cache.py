@@ -0,0 +1,84 @@
+"""Offline tests for the two-tier cache's disk tier bounds and counters."""
+
+import sqlite3
+import threading
+
+from kaedra.services.cache import EmbeddingCache, TieredCache
+
+
+def disk_keys(cache):
+    with sqlite3.connect(cache.db_file) as conn:
+        return [row[0] for row in conn.execute("SELECT key FROM cache ORDER BY rowid")]
+
+
+def make_cache(tmp_path, **kwargs):
+    return TieredCache(db_file=tmp_path / "cache.db", **kwargs)
+
+
+def test_expired_row_is_deleted_on_read(tmp_path):
+    cache = make_cache(tmp_path, max_entries=1)
+    cache.put("old", b"v", ttl_s=-1)  # Already expired
+    cache.put("other", b"w")          # Pushes "old" out of the memory tier
+
+    assert cache.get("old") is None
+    assert disk_keys(cache) == ["other"]
+
+
+def test_purge_drops_expired_rows(tmp_path):
+    cache = make_cache(tmp_path, purge_every=1000)
+    cache.put_many({"a": b"1", "b": b"2"}, ttl_s=-1)
+    cache.put("c", b"3")
+
+    assert cache.purge() == 2
+    assert disk_keys(cache) == ["c"]
+
+
+def test_disk_tier_is_capped_keeping_newest_writes(tmp_path):
+    cache = make_cache(tmp_path, max_disk_entries=3, purge_every=1)
+    for i in range(6):
+        cache.put(f"k{i}", b"v")
+    cache.put("k3", b"rewritten")  # Rewriting a key makes it newest
+
+    assert disk_keys(cache) == ["k4", "k5", "k3"]
+    assert cache.stats()["purged"] == 3
+
+
+def test_cap_applies_to_existing_file_on_open(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many({f"k{i}": b"v" for i in range(10)})
+
+    reopened = make_cache(tmp_path, max_disk_entries=4)
+
+    assert disk_keys(reopened) == ["k6", "k7", "k8", "k9"]
+
+
+def test_counters_are_exact_under_threads(tmp_path):
+    cache = make_cache(tmp_path, max_entries=1)
+    cache.put_many({"a": b"1", "b": b"2"})  # Only "b" stays in memory
+
+    def worker():
+        for _ in range(200):
+            cache.get("a")        # Disk hit (then evicts "b")
+            cache.get("missing")  # Miss
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats["misses"] == 800
+    assert stats["memory_hits"] + stats["disk_hits"] == 800
+
+
+def test_embedding_cache_disk_tier_is_capped(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embeddings.db", max_entries=2, max_disk_entries=5)
+    for i in range(20):
+        cache.put("model", f"text {i}", [float(i)])
+    cache._cache.purge()
+
+    with sqlite3.connect(tmp_path / "embeddings.db") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] == 5
+    assert cache.get("model", "text 19") == [19.0]
+    assert cache.get("model", "text 0") is None
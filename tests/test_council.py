@@ -0,0 +1,80 @@
+"""Offline tests for council convene when an agent fails."""
+
+import asyncio
+
+import pytest
+
+from kaedra.agents.base import AgentResponse
+from kaedra.agents.council import Council
+from kaedra.core.exceptions import AgentError
+
+
+class FakeAgent:
+    """Agent stand-in that answers with fixed text or raises."""
+
+    def __init__(self, name, reply=None, error=None):
+        self.name = name
+        self.reply = reply
+        self.error = error
+
+    async def run(self, prompt, model_key=None):
+        if self.error:
+            raise self.error
+        return AgentResponse(content=self.reply, agent_name=self.name, model="m", latency_ms=1.0)
+
+
+def make_council(kaedra, blade, nyx):
+    return Council(prompt_service=None, kaedra=kaedra, blade=blade, nyx=nyx)
+
+
+def test_failed_synthesis_falls_back_to_advisors_with_marker():
+    council = make_council(
+        FakeAgent("KAEDRA", error=RuntimeError("quota exhausted")),
+        FakeAgent("BLADE", "Ship it today."),
+        FakeAgent("NYX", "Check the rollback first."),
+    )
+
+    result = asyncio.run(council.convene("launch?"))
+
+    assert not result.synthesized
+    assert result.kaedra_synthesis.startswith("[SYNTHESIS FAILED: quota exhausted]")
+    assert "BLADE: Ship it today." in result.kaedra_synthesis
+    assert "NYX: Check the rollback first." in result.kaedra_synthesis
+    assert result.to_dict()["synthesized"] is False
+
+
+def test_fallback_skips_missing_advisor():
+    council = make_council(
+        FakeAgent("KAEDRA", error=RuntimeError("down")),
+        FakeAgent("BLADE", "Ship it today."),
+        FakeAgent("NYX", error=RuntimeError("down")),
+    )
+
+    result = asyncio.run(council.convene("launch?"))
+
+    assert "NYX:" not in result.kaedra_synthesis
+    assert set(result.errors) == {"KAEDRA", "NYX"}
+
+
+def test_successful_synthesis_is_used():
+    council = make_council(
+        FakeAgent("KAEDRA", "Here's what we're doing..."),
+        FakeAgent("BLADE", "Ship it."),
+        FakeAgent("NYX", "Careful."),
+    )
+
+    result = asyncio.run(council.convene("launch?"))
+
+    assert result.synthesized and not result.partial
+    assert result.kaedra_synthesis == "Here's what we're doing..."
+
+
+def test_both_advisors_failing_raises():
+    council = make_council(
+        FakeAgent("KAEDRA", "unused"),
+        FakeAgent("BLADE", error=RuntimeError("down")),
+        FakeAgent("NYX", error=RuntimeError("down")),
+    )
+
+    with pytest.raises(AgentError):
+        asyncio.run(council.convene("launch?"))
@@ -0,0 +1,193 @@
+"""Offline tests for EmbeddingService batching, retries and batch splitting."""
+
+import asyncio
+import threading
+import time
+
+from kaedra.services.cache import EmbeddingCache
+from kaedra.services.embedding import EmbeddingService
+from kaedra.services.retry import Retrier, RetryBudget, RetryPolicy
+
+
+class ServiceUnavailable(Exception):
+    """Retryable by name, like google.api_core's."""
+
+
+class ApiError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeApi:
+    """embed_fn recording each call's batch; `fail(texts)` may raise."""
+
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, model, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+        if self.fail:
+            self.fail(texts)
+        return [[float(len(text))] for text in texts]
+
+    @property
+    def sizes(self):
+        return sorted(len(call) for call in self.calls)
+
+
+def make_service(api, **kwargs):
+    return EmbeddingService(
+        project="test",
+        embed_fn=api,
+        cache=EmbeddingCache(None),
+        batch_window_ms=20,
+        retrier=Retrier(RetryPolicy(max_attempts=3, base_delay_s=0), RetryBudget(), sleep=lambda s: None),
+        **kwargs
+    )
+
+
+def test_batches_respect_model_input_limit():
+    api = FakeApi()
+    service = make_service(api, batch_limits={"small": 3})
+
+    vectors = service.embed_many([f"t{i}" for i in range(7)], model="small")
+
+    assert vectors == [[2.0]] * 7
+    assert api.sizes == [1, 3, 3]
+
+
+def test_gemini_embedding_sends_one_input_per_request():
+    api = FakeApi()
+    service = make_service(api)
+
+    assert service.batch_limit("gemini-embedding-001") == 1
+    service.embed_many(["a", "bb", "ccc"], model="gemini-embedding-001")
+
+    assert api.sizes == [1, 1, 1]
+
+
+def test_other_models_use_max_batch():
+    api = FakeApi()
+    service = make_service(api, max_batch=250)
+
+    service.embed_many(["a", "bb", "ccc"], model="text-embedding-004")
+
+    assert service.batch_limit("text-embedding-004") == 250
+    assert api.calls == [["a", "bb", "ccc"]]
+
+
+def test_transient_error_retries_whole_batch():
+    failures = [1]
+
+    def fail(texts):
+        if failures[0]:
+            failures[0] -= 1
+            raise ServiceUnavailable("503 unavailable")
+
+    api = FakeApi(fail)
+    service = make_service(api)
+
+    assert service.embed_many(["a", "bb"], model="text-embedding-004") == [[1.0], [2.0]]
+    assert api.sizes == [2, 2]
+
+
+def test_rate_limit_fails_batch_without_splitting():
+    def fail(texts):
+        raise ApiError("429 resource exhausted", 429)
+
+    api = FakeApi(fail)
+    service = make_service(api)
+
+    assert service.embed_many(["a", "bb"], model="text-embedding-004") == [[], []]
+    assert api.sizes == [2, 2, 2]  # max_attempts, never split
+
+
+def test_invalid_input_is_isolated_by_splitting():
+    def fail(texts):
+        if "bad" in texts:
+            raise ApiError("400 invalid argument", 400)
+
+    api = FakeApi(fail)
+    service = make_service(api)
+
+    vectors = service.embed_many(["a", "bad", "ccc", "dddd"], model="text-embedding-004")
+
+    assert vectors == [[1.0], [], [3.0], [4.0]]
+    assert api.calls[0] == ["a", "bad", "ccc", "dddd"]
+    assert ["bad"] in api.calls
+
+
+def test_identical_texts_share_one_request():
+    api = FakeApi()
+    service = make_service(api)
+
+    service.embed_many(["same", "same", "other"], model="text-embedding-004")
+
+    assert api.calls == [["same", "other"]]
+    assert service.stats()["coalesced"] == 1
+
+
+class BrokenCache(EmbeddingCache):
+    """Cache whose writes raise something other than sqlite3.Error."""
+
+    def put_many(self, model, texts, vectors):
+        raise TypeError("cannot encode vector")
+
+
+def test_cache_write_failure_still_returns_vectors():
+    api = FakeApi()
+    service = make_service(api)
+    service.cache = BrokenCache(None)
+
+    assert service.embed_many(["a", "bb"], model="text-embedding-004") == [[1.0], [2.0]]
+    assert service.embed_many(["a"], model="text-embedding-004") == [[1.0]]
+
+
+def test_unexpected_failure_resolves_futures_and_worker_survives():
+    service = make_service(lambda model, texts: None)  # len(None) raises outside the retrier
+
+    assert service.embed_many(["a", "bb"], model="text-embedding-004") == [[], []]
+    assert service.embed_many(["a"], model="text-embedding-004") == [[]]  # Not joined to a dead future
+    assert service.stats()["pending"] == 0
+
+
+def test_callers_wait_at_most_result_timeout():
+    release = threading.Event()
+    service = make_service(lambda model, texts: release.wait(5) and [[1.0]] * len(texts),
+                           result_timeout_s=0.2)
+    try:
+        start = time.monotonic()
+        assert service.embed_many(["a"], model="text-embedding-004") == [[]]
+        assert asyncio.run(service.embed_many_async(["b"], model="text-embedding-004")) == [[]]
+        assert time.monotonic() - start < 2
+    finally:
+        release.set()
+
+
+def test_retry_backoff_does_not_block_other_batches():
+    failures = [1]
+
+    def fail(texts):
+        if "slow" in texts and failures[0]:
+            failures[0] -= 1
+            raise ServiceUnavailable("503 unavailable")
+
+    service = EmbeddingService(
+        project="test",
+        embed_fn=FakeApi(fail),
+        cache=EmbeddingCache(None),
+        batch_window_ms=0,
+        retrier=Retrier(RetryPolicy(max_attempts=3, base_delay_s=0), RetryBudget(),
+                        sleep=lambda s: time.sleep(1.0))
+    )
+    slow = service.submit(["slow"], model="text-embedding-004")
+    time.sleep(0.1)  # The slow batch is now backing off
+
+    start = time.monotonic()
+    assert service.embed_many(["fast"], model="text-embedding-004") == [[4.0]]
+    assert time.monotonic() - start < 0.5
+    assert slow[0].result(timeout=5) == [4.0]
@@ -0,0 +1,152 @@
+"""Offline tests for the write-behind semantic indexer."""
+
+import gc
+import json
+import threading
+import time
+import weakref
+
+from kaedra.services.indexing import SemanticIndexer
+from kaedra.services.memory import MemoryService
+
+
+class FakeStore:
+    """add_memories/delete_memory stand-in; can fail or block on demand."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.rows = {}
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+
+    def add_memories(self, items):
+        self.entered.set()
+        self.gate.wait(5)
+        if self.fail:
+            return [{"id": None, "error": "store down"} for _ in items]
+        results = []
+        for item in items:
+            row_id = f"vec_{item['metadata']['local_id']}"
+            self.rows[row_id] = item
+            results.append({"id": row_id, "error": None})
+        return results
+
+    def delete_memory(self, row_id):
+        return self.rows.pop(row_id, None) is not None
+
+    def local_ids(self):
+        return {item["metadata"]["local_id"] for item in self.rows.values()}
+
+
+def item(memory_id):
+    return {"content": memory_id, "metadata": {"local_id": memory_id}}
+
+
+def make_indexer(store, tmp_path, **kwargs):
+    options = dict(batch_wait_s=0.01, max_retries=0, backoff_s=0, outbox_retry_s=0)
+    options.update(kwargs)
+    return SemanticIndexer(store, tmp_path / "outbox.jsonl", **options)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_indexes_submitted_items(tmp_path):
+    store = FakeStore()
+    indexer = make_indexer(store, tmp_path)
+    try:
+        indexer.submit_many([item("a"), item("b")])
+        assert indexer.flush(5)
+        assert store.local_ids() == {"a", "b"}
+    finally:
+        indexer.close()
+
+
+def test_replays_keep_lifetime_attempts_then_dead_letter(tmp_path):
+    store = FakeStore(fail=True)
+    indexer = make_indexer(store, tmp_path, max_replays=2)
+    try:
+        indexer.submit(item("a"))
+        assert wait_for(lambda: indexer.dead_letter_file.exists())
+    finally:
+        indexer.close()
+
+    [record] = read_records(indexer.dead_letter_file)
+    assert record["item"]["metadata"]["local_id"] == "a"
+    assert record["replays"] == 3
+    assert record["attempts"] == 3          # First pass plus two replays, never reset
+    assert indexer.stats()["dead_lettered"] == 1
+    assert indexer.stats()["outbox_depth"] == 0
+
+
+def test_discard_drops_queued_and_in_flight_records(tmp_path):
+    store = FakeStore()
+    store.gate.clear()
+    indexer = make_indexer(store, tmp_path, batch_size=1)
+    try:
+        indexer.submit(item("in-flight"))
+        assert store.entered.wait(5)
+        indexer.submit_many([item("queued"), item("kept")])
+
+        assert indexer.discard(["in-flight", "queued"]) == 1  # One record was still queued
+        store.gate.set()
+        assert indexer.flush(5)
+    finally:
+        indexer.close()
+
+    assert store.local_ids() == {"kept"}  # In-flight one was indexed, then removed again
+    assert indexer.stats()["indexed"] == 1    # Only "kept" counts as written
+
+
+def test_discard_drops_outbox_records(tmp_path):
+    indexer = make_indexer(FakeStore(), tmp_path)
+    indexer.close()
+    indexer._spill([
+        {"item": item("gone"), "enqueued_at": 0, "attempts": 1, "replays": 0},
+        {"item": item("stays"), "enqueued_at": 0, "attempts": 1, "replays": 0},
+    ])
+
+    assert indexer.discard(["gone"]) == 1
+    assert [r["item"]["metadata"]["local_id"] for r in read_records(indexer.outbox_file)] == ["stays"]
+
+
+def test_memory_service_delete_drops_pending_indexing(tmp_path):
+    store = FakeStore()
+    store.gate.clear()
+    service = MemoryService(db_path=tmp_path, backend="json", vector_store=store)
+    try:
+        first = service.insert("first")
+        assert store.entered.wait(5)
+        second = service.insert("second")
+
+        service.delete(first)
+        service.delete(second)
+        store.gate.set()
+        assert service.flush(5)
+
+        assert store.local_ids() == set()
+    finally:
+        store.gate.set()
+        service.close()
+
+
+def test_closed_indexer_is_not_kept_alive(tmp_path):
+    indexer = make_indexer(FakeStore(), tmp_path)
+    indexer.close()
+    ref = weakref.ref(indexer)
+
+    del indexer
+    gc.collect()
+
+    assert ref() is None
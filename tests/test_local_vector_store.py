@@ -0,0 +1,168 @@
+"""Offline tests for the in-process NumPy vector store and its MemoryService wiring."""
+
+import itertools
+
+import numpy as np
+
+import kaedra.services.memory as memory_module
+from kaedra.services.local_vector_store import LocalVectorStore
+from kaedra.services.memory import MemoryService
+from kaedra.services.vector_sql import SearchFilters
+
+
+# Tiny deterministic "embedding": one axis per keyword
+VOCAB = ("cat", "dog", "car", "tree")
+
+
+def fake_embed(texts):
+    return [[float(word in text.lower()) + 0.01 for word in VOCAB] for text in texts]
+
+
+def make_store(tmp_path, **kwargs):
+    return LocalVectorStore(tmp_path, embed_fn=fake_embed, **kwargs)
+
+
+def test_add_and_search_ranks_by_cosine(tmp_path):
+    store = make_store(tmp_path)
+    cat = store.add_memory("the cat sat", topic="pets")
+    store.add_memory("a red car", topic="vehicles")
+    store.add_memory("the dog barked", topic="pets")
+
+    results = store.search_similar("cat", limit=2)
+
+    assert [r["id"] for r in results][:1] == [cat]
+    assert len(results) == 2
+    assert results[0]["similarity"] > results[1]["similarity"]
+    assert store.get_stats()["total"] == 3
+
+
+def test_add_memories_reuses_local_id(tmp_path):
+    store = make_store(tmp_path)
+
+    results = store.add_memories([
+        {"content": "cat", "metadata": {"local_id": "mem_1"}},
+        {"content": "dog"},
+    ])
+
+    assert results[0] == {"id": "mem_1", "error": None}
+    assert results[1]["id"].startswith("vec_")
+
+
+def test_search_applies_filters_before_top_k(tmp_path):
+    store = make_store(tmp_path)
+    store.add_memory("cat one", topic="pets", tags=["Home"], importance="low")
+    keep = store.add_memory("cat two", topic="pets", tags=["home"], importance="high")
+    store.add_memory("cat three", topic="wild", tags=["home"], importance="high")
+
+    results = store.search_similar("cat", limit=5, topic="pets", tags=["HOME"], min_importance="high")
+
+    assert [r["id"] for r in results] == [keep]
+
+
+def test_tag_filter_is_case_insensitive(tmp_path):
+    store = make_store(tmp_path)
+    store.add_memory("cat", tags=["Project-X"])
+
+    assert len(store.search_similar("cat", tags=["project-x"])) == 1
+    assert store.search_similar("cat", tags=["other"]) == []
+
+
+def test_delete_swaps_last_row_into_hole(tmp_path):
+    store = make_store(tmp_path)
+    first = store.add_memory("cat")
+    store.add_memory("dog")
+    last = store.add_memory("car")
+
+    assert store.delete_memory(first) is True
+    assert store.delete_memory(first) is False
+
+    assert store.get_stats()["total"] == 2
+    assert store._row_of[last] == 0
+    assert [r["id"] for r in store.search_similar("car", limit=1)] == [last]
+
+
+def test_persists_to_npy_and_reloads(tmp_path):
+    store = make_store(tmp_path)
+    keep = store.add_memory("the dog", topic="pets")
+    gone = store.add_memory("the car")
+    store.delete_memory(gone)
+    store.save()
+
+    assert (tmp_path / "vectors.npy").exists()
+    assert np.load(tmp_path / "vectors.npy").shape == (1, len(VOCAB))
+
+    reloaded = make_store(tmp_path)
+
+    assert reloaded.get_stats()["total"] == 1
+    results = reloaded.search_similar("dog")
+    assert [(r["id"], r["topic"]) for r in results] == [(keep, "pets")]
+
+
+def test_filter_mask_matches_record_predicates_after_deletes_and_reload(tmp_path):
+    store = make_store(tmp_path, autosave_every=1000)
+    topics, importance = ("pets", "work", None), ("low", "high", "bogus")
+    ids = [
+        store.add_memory(f"cat {i}", topic=topics[i % 3], tags=[["A", "b"], [], ["B", "c", "d"]][i % 3],
+                         importance=importance[i % 3 - 1])
+        for i in range(12)
+    ]
+    for memory_id in ids[::4]:
+        store.delete_memory(memory_id)
+    store.save()
+    stamps = sorted(r["timestamp"] for r in store._records)
+    cases = [
+        SearchFilters(topic, tags, level, since, until)
+        for topic, tags, level, (since, until) in itertools.product(
+            (None, "pets", "missing"), (None, ["b"], ["C", "zzz"], ["zzz"]), (None, "normal", "bogus"),
+            ((None, None), (stamps[2], None), (None, stamps[5]))
+        )
+    ]
+
+    for current in (store, make_store(tmp_path)):
+        size = current._size
+        for filters in cases:
+            expected = [filters.matches(r) for r in current._records]
+            assert current._filter_mask(filters, size).tolist() == expected, filters
+
+
+def test_autosave_every_n_changes(tmp_path):
+    store = make_store(tmp_path, autosave_every=2)
+    store.add_memory("cat")
+    assert not (tmp_path / "vectors.npy").exists()
+
+    store.add_memory("dog")
+    assert (tmp_path / "vectors.npy").exists()
+
+
+def test_out_of_sync_files_start_empty(tmp_path):
+    store = make_store(tmp_path)
+    store.add_memory("cat")
+    store.save()
+    (tmp_path / "vectors.json").write_text("[]", encoding="utf-8")
+
+    assert make_store(tmp_path).get_stats()["total"] == 0
+
+
+def test_memory_service_picks_local_backend_from_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_module, "VECTOR_BACKEND", "local")
+
+    service = MemoryService(db_path=tmp_path, backend="json")
+    try:
+        assert isinstance(service.vector_store, LocalVectorStore)
+        assert service.semantic_enabled
+    finally:
+        service.close()
+
+
+def test_memory_service_indexes_and_deletes_through_local_store(tmp_path):
+    service = MemoryService(db_path=tmp_path, backend="json", vector_store=make_store(tmp_path))
+    try:
+        memory_id = service.insert("my cat likes boxes", topic="pets")
+        assert service.flush(timeout=5)
+
+        assert [r["id"] for r in service.semantic_recall("cat")] == [memory_id]
+
+        service.delete(memory_id)
+        assert service.semantic_recall("cat") == []
+    finally:
+        service.close()
@@ -0,0 +1,70 @@
+"""Offline tests for the memory storage backends under concurrent use."""
+
+import threading
+
+from kaedra.services import memory_store
+from kaedra.services.memory_store import JsonMemoryBackend, SQLiteMemoryBackend
+
+
+def entry(memory_id, content="note", tags=("misc",)):
+    return {
+        "id": memory_id, "topic": "t", "content": content, "tags": list(tags),
+        "timestamp": f"2024-01-01T00:00:{memory_id[-2:]}", "importance": "normal",
+    }
+
+
+def run_threads(count, target):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_json_backend_concurrent_writes_survive_reload(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_store, "JOURNAL_COMPACT_MIN_OPS", 7)  # Compact mid-run
+    backend = JsonMemoryBackend(tmp_path)
+
+    def worker(i):
+        for j in range(25):
+            backend.put(entry(f"m{i}-{j:02d}", content=f"alpha {i} {j}"))
+            backend.search("alpha", top_k=3)
+            if j % 5 == 0:
+                backend.delete(f"m{i}-{j:02d}")
+
+    run_threads(8, worker)
+
+    reloaded = JsonMemoryBackend(tmp_path)
+    assert backend.stats()["total"] == 8 * 20
+    assert {e["id"] for e in reloaded.all_entries()} == {e["id"] for e in backend.all_entries()}
+
+
+def test_sqlite_close_releases_every_thread_connection(tmp_path):
+    backend = SQLiteMemoryBackend(tmp_path / "memory.db")
+
+    def worker(i):
+        backend.put(entry(f"m{i:02d}"))
+
+    run_threads(4, worker)
+    opened = list(backend._conns)
+    assert len(opened) == 5  # Constructor's thread plus four workers
+
+    backend.close()
+
+    for conn in opened:
+        try:
+            conn.execute("SELECT 1")
+        except Exception as e:
+            assert "closed" in str(e)
+        else:
+            raise AssertionError("connection left open")
+    assert backend._conns == []
+
+
+def test_sqlite_reopens_after_close(tmp_path):
+    backend = SQLiteMemoryBackend(tmp_path / "memory.db")
+    backend.put(entry("m01"))
+    backend.close()
+
+    assert backend.get("m01")["id"] == "m01"
+    backend.close()
@@ -0,0 +1,147 @@
+"""Offline tests for the model router's confidence cascade through PromptService."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import kaedra.services.prompt as prompt_module
+from kaedra.core.config import MODEL_COSTS, MODELS
+from kaedra.services.cache import ResponseCache
+from kaedra.services.model_router import SELF_CHECK_INSTRUCTION, ModelRouter
+from kaedra.services.prompt import PromptService
+from kaedra.services.rate_limit import AdmissionController
+from kaedra.services.retry import Retrier, RetryBudget, RetryPolicy
+from kaedra.services.usage import UsageTracker
+
+
+FLASH, PRO = MODELS["flash"], MODELS["pro"]
+COMPLETION_TOKENS = {FLASH: 5, PRO: 20}
+
+
+class ScriptedModel:
+    """Answers from `replies` by model name (an Exception is raised); records every call."""
+
+    replies = {}
+    calls = []
+
+    def __init__(self, name, **kwargs):
+        self.name = name
+
+    def _reply(self, prompt):
+        ScriptedModel.calls.append((self.name, prompt))
+        reply = self.replies[self.name]
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(text=reply, usage_metadata=SimpleNamespace(
+            prompt_token_count=10, candidates_token_count=COMPLETION_TOKENS[self.name],
+            cached_content_token_count=0
+        ))
+
+    def generate_content(self, prompt, generation_config=None):
+        return self._reply(prompt)
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        return self._reply(prompt)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(prompt_module, "GenerativeModel", ScriptedModel)
+    ScriptedModel.calls = []
+    ScriptedModel.replies = {PRO: "A thorough answer from the strong model."}
+    return PromptService(
+        model_key="flash",
+        enable_grounding=False,
+        response_cache=ResponseCache(None),
+        retrier=Retrier(RetryPolicy(max_attempts=1, base_delay_s=0), RetryBudget(), sleep=lambda s: None),
+        admission=AdmissionController(),
+        usage_tracker=UsageTracker(),
+        router=ModelRouter(fast_model="flash", strong_model="pro", self_check=True,
+                           min_confidence=6, min_answer_chars=80),
+        auto_route=True
+    )
+
+
+def route_of(result):
+    return result.metadata["route"]
+
+
+def models_called():
+    return [name for name, _ in ScriptedModel.calls]
+
+
+def test_confident_fast_answer_is_kept_without_its_confidence_line(service):
+    ScriptedModel.replies[FLASH] = "Paris is the capital of France.\n**CONFIDENCE: 9**"
+
+    result = service.generate("What is the capital of France?")
+
+    assert result.text == "Paris is the capital of France."
+    assert models_called() == [FLASH]
+    assert ScriptedModel.calls[0][1].endswith(SELF_CHECK_INSTRUCTION)
+    route = route_of(result)
+    assert route["confidence"] == 9.0 and not route["escalated"]
+    assert route["cost_usd"] == MODEL_COSTS["flash"]
+
+
+@pytest.mark.parametrize("reply, prompt, reason", [
+    ("Maybe Lyon?\nCONFIDENCE: 3", "What is the capital of France?", "low_confidence"),
+    ("I'm sorry, I can't help with that.\nCONFIDENCE: 9", "What is the capital of France?", "refusal"),
+    ("Use B.\nCONFIDENCE: 9", "Analyze the trade-offs of option A and option B", "too_short"),
+    ("\nCONFIDENCE: 9", "What is the capital of France?", "empty"),
+])
+def test_failed_self_check_escalates_to_strong(service, reply, prompt, reason):
+    ScriptedModel.replies[FLASH] = reply
+
+    result = service.generate(prompt)
+
+    assert models_called() == [FLASH, PRO]
+    assert not ScriptedModel.calls[1][1].endswith(SELF_CHECK_INSTRUCTION)  # Plain prompt on escalation
+    assert result.text == ScriptedModel.replies[PRO] and result.model == PRO
+    route = route_of(result)
+    assert route["escalated"] and route["reason"] == reason and route["model_key"] == "pro"
+
+
+def test_fast_error_escalates(service):
+    ScriptedModel.replies[FLASH] = ValueError("bad gateway")
+
+    result = service.generate("What is the capital of France?")
+
+    assert result.ok and result.model == PRO
+    assert route_of(result)["reason"] == "error"
+
+
+def test_usage_and_latency_sum_both_attempts(service):
+    ScriptedModel.replies[FLASH] = "Maybe Lyon?\nCONFIDENCE: 2"
+
+    result = asyncio.run(service.generate_async("What is the capital of France?"))
+
+    assert result.usage.prompt_tokens == 20
+    assert result.usage.completion_tokens == COMPLETION_TOKENS[FLASH] + COMPLETION_TOKENS[PRO]
+    route = route_of(result)
+    assert result.latency_ms == pytest.approx(sum(a["latency_ms"] for a in route["attempts"]))
+    assert route["cost_usd"] == pytest.approx(MODEL_COSTS["flash"] + MODEL_COSTS["pro"])
+
+
+def test_research_starts_on_strong_without_self_check(service):
+    result = service.generate("Collect sources on solid-state batteries", agent="RESEARCH")
+
+    assert models_called() == [PRO]
+    assert not ScriptedModel.calls[0][1].endswith(SELF_CHECK_INSTRUCTION)
+    route = route_of(result)
+    assert route["start"] == "pro" and not route["escalated"]
+
+
+def test_cached_attempts_cost_nothing(service):
+    ScriptedModel.replies[FLASH] = "Paris is the capital of France.\nCONFIDENCE: 9"
+    service.generate("What is the capital of France?")
+    spent = service.router.stats()
+
+    result = service.generate("What is the capital of France?")
+
+    assert models_called() == [FLASH]  # Second call served from the response cache
+    route = route_of(result)
+    assert route["attempts"][0]["cached"] and route["cost_usd"] == 0.0
+    stats = service.router.stats()
+    assert stats["cost_usd"] == spent["cost_usd"]
+    assert stats["strong_only_cost_usd"] == spent["strong_only_cost_usd"]
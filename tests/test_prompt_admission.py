@@ -0,0 +1,141 @@
+"""Offline tests: every retry attempt of a PromptService call is admitted on its own."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import kaedra.services.prompt as prompt_module
+from kaedra.core.config import MODELS
+from kaedra.core.exceptions import RateLimitError
+from kaedra.services.cache import ResponseCache
+from kaedra.services.prompt import PromptService
+from kaedra.services.rate_limit import AdmissionController
+from kaedra.services.retry import Retrier, RetryBudget, RetryPolicy
+from kaedra.services.usage import UsageTracker
+
+
+MODEL = MODELS["flash"]
+
+
+class ServiceUnavailable(Exception):
+    """Retryable by name, like google.api_core's."""
+
+
+def response(text="ok"):
+    return SimpleNamespace(text=text, usage_metadata=None)
+
+
+class FlakyModel:
+    """Fails the first `failures` calls, recording how many slots were held during each."""
+
+    failures = 1
+    instances = []
+
+    def __init__(self, name, **kwargs):
+        self.calls = 0
+        self.in_flight_seen = []
+        FlakyModel.instances.append(self)
+
+    def _attempt(self):
+        self.calls += 1
+        self.in_flight_seen.append(LIMITS.limiter(MODEL).slots.in_use)
+        if self.calls <= self.failures:
+            raise ServiceUnavailable("503 unavailable")
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        self._attempt()
+        return iter([response("o"), response("k")]) if stream else response()
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self._attempt()
+        if not stream:
+            return response()
+
+        async def chunks():
+            yield response("o")
+            yield response("k")
+        return chunks()
+
+
+LIMITS = None
+
+
+@pytest.fixture
+def service(monkeypatch):
+    global LIMITS
+    LIMITS = AdmissionController(limits={MODEL: {"max_in_flight": 1}}, queue_timeout_s=1)
+    monkeypatch.setattr(prompt_module, "GenerativeModel", FlakyModel)
+    FlakyModel.instances = []
+    return PromptService(
+        model_key="flash",
+        enable_grounding=False,
+        response_cache=ResponseCache(None),
+        retrier=Retrier(RetryPolicy(base_delay_s=0), RetryBudget(), sleep=lambda s: None),
+        admission=LIMITS,
+        usage_tracker=UsageTracker(),
+        auto_route=False
+    )
+
+
+def assert_admitted_per_attempt():
+    limiter = LIMITS.limiter(MODEL)
+    [model] = FlakyModel.instances
+    assert model.calls == 2
+    assert limiter.admitted == 2           # One admission per attempt
+    assert model.in_flight_seen == [1, 1]  # Never more than the attempt's own slot
+    assert limiter.slots.in_use == 0
+
+
+def test_generate_admits_each_attempt(service):
+    result = service.generate("hi", bypass_cache=True)
+
+    assert result.ok and result.text == "ok"
+    assert_admitted_per_attempt()
+
+
+def test_generate_async_admits_each_attempt(service):
+    result = asyncio.run(service.generate_async("hi", bypass_cache=True))
+
+    assert result.ok
+    assert_admitted_per_attempt()
+
+
+def test_generate_stream_admits_each_attempt(service):
+    assert "".join(service.generate_stream("hi")) == "ok"
+    assert_admitted_per_attempt()
+
+
+def test_generate_stream_async_admits_each_attempt(service):
+    async def collect():
+        return "".join([chunk async for chunk in service.generate_stream_async("hi", bypass_cache=True)])
+
+    assert asyncio.run(collect()) == "ok"
+    assert_admitted_per_attempt()
+
+
+def test_blocking_sdk_stream_admits_each_attempt(service, monkeypatch):
+    class BlockingModel(FlakyModel):
+        generate_content_async = None  # Older SDK: stream is opened and read in a worker thread
+
+    monkeypatch.setattr(prompt_module, "GenerativeModel", BlockingModel)
+
+    async def collect():
+        return "".join([chunk async for chunk in service.generate_stream_async("hi", bypass_cache=True)])
+
+    assert asyncio.run(collect()) == "ok"
+    assert_admitted_per_attempt()
+
+
+def test_admission_rejection_is_not_retried(service):
+    limiter = LIMITS.limiter(MODEL)
+    assert limiter.slots.acquire(None)  # Someone else holds the only slot
+    LIMITS.queue_timeout_s = 0.01
+    try:
+        result = service.generate("hi", bypass_cache=True)
+    finally:
+        limiter.slots.release()
+
+    assert isinstance(result.error, RateLimitError)
+    assert limiter.rejected == 1
+    assert all(model.calls == 0 for model in FlakyModel.instances)
@@ -0,0 +1,198 @@
+"""Offline tests for the semantic cache and KaedraAgent's use of it."""
+
+import asyncio
+from types import SimpleNamespace
+
+import kaedra.services.prompt as prompt_module
+from kaedra.agents.kaedra import KaedraAgent
+from kaedra.core.config import MODELS
+from kaedra.services.cache import ResponseCache
+from kaedra.services.local_vector_store import LocalVectorStore
+from kaedra.services.prompt import PromptResult, PromptService
+from kaedra.services.semantic_cache import SemanticCache
+from kaedra.services.usage import UsageTracker
+
+
+VOCAB = ("weather", "capital", "france", "plan")
+
+
+def fake_embed(texts):
+    return [[float(word in text) + 0.01 for word in VOCAB] for text in texts]
+
+
+class FakePrompt:
+    """The slice of PromptService the agent uses; counts model calls."""
+
+    current_model_key = "flash"
+    current_model = MODELS["flash"]
+    enable_grounding = True  # The service default; answers say whether they searched
+
+    def __init__(self, grounded=False):
+        self.grounded = grounded
+        self.calls = 0
+
+    async def generate_async(self, prompt, model_key=None, agent=None):
+        self.calls += 1
+        return PromptResult(text=f"answer {self.calls}", model=self.current_model,
+                            latency_ms=1.0, grounded=self.grounded)
+
+    async def generate_stream_async(self, prompt, model_key=None, agent=None):
+        self.calls += 1
+        yield f"answer {self.calls}"
+        prompt_module._stream_grounded.set(self.grounded)
+
+
+class SearchToolModel:
+    """GenerativeModel stand-in; replies carry grounding metadata only when search_hit."""
+
+    search_hit = False
+    calls = 0
+
+    def __init__(self, name, **kwargs):
+        self.name = name
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        SearchToolModel.calls += 1
+        queries = ["capital of france"] if self.search_hit else []
+        return SimpleNamespace(
+            text=f"answer {SearchToolModel.calls}",
+            usage_metadata=None,
+            candidates=[SimpleNamespace(grounding_metadata=SimpleNamespace(web_search_queries=queries))]
+        )
+
+
+def make_service(monkeypatch, search_hit):
+    monkeypatch.setattr(prompt_module, "GenerativeModel", SearchToolModel)
+    monkeypatch.setattr(SearchToolModel, "search_hit", search_hit)
+    monkeypatch.setattr(SearchToolModel, "calls", 0)
+    return PromptService(model_key="flash", response_cache=ResponseCache(None),
+                         usage_tracker=UsageTracker(), auto_route=False)
+
+
+class FakeMemory:
+    def __init__(self):
+        self.memories = []
+
+    def recall(self, query, top_k=3):
+        return self.memories
+
+
+def make_agent(tmp_path, grounded=False, memory=None):
+    cache = SemanticCache(store=LocalVectorStore(tmp_path, embed_fn=fake_embed), threshold=0.95)
+    return KaedraAgent(FakePrompt(grounded), memory, semantic_cache=cache)
+
+
+def ask(agent, query, **kwargs):
+    return asyncio.run(agent.run(query, **kwargs))
+
+
+def test_cache_is_off_unless_requested(tmp_path):
+    agent = make_agent(tmp_path)
+
+    ask(agent, "What is the capital of France?")
+    ask(agent, "What is the capital of France?")
+
+    assert agent.prompt.calls == 2
+    assert agent.semantic_cache.store.get_stats()["total"] == 0
+
+
+def test_paraphrase_hits_when_opted_in(tmp_path):
+    agent = make_agent(tmp_path)
+
+    first = ask(agent, "What is the capital of France?", use_semantic_cache=True)
+    second = ask(agent, "capital of france??", use_semantic_cache=True)
+
+    assert agent.prompt.calls == 1
+    assert second.content == first.content
+    assert "semantic_cache" in second.metadata
+
+
+def test_different_recalled_memories_miss(tmp_path):
+    memory = FakeMemory()
+    agent = make_agent(tmp_path, memory=memory)
+
+    ask(agent, "plan my week", use_semantic_cache=True)
+    memory.memories = [{"timestamp": "2024-01-01T00:00:00", "topic": "work", "content": "launch on Friday"}]
+    ask(agent, "plan my week", use_semantic_cache=True)
+
+    assert agent.prompt.calls == 2
+
+
+def test_grounded_answers_are_not_stored(tmp_path):
+    agent = make_agent(tmp_path, grounded=True)
+
+    ask(agent, "What is the capital of France?", use_semantic_cache=True)
+    ask(agent, "What is the capital of France?", use_semantic_cache=True)
+
+    assert agent.prompt.calls == 2
+    assert agent.semantic_cache.store.get_stats()["total"] == 0
+
+
+def test_default_grounded_service_caches_answers_that_did_not_search(tmp_path, monkeypatch):
+    service = make_service(monkeypatch, search_hit=False)
+    assert service.enable_grounding  # The production default
+    cache = SemanticCache(store=LocalVectorStore(tmp_path, embed_fn=fake_embed), threshold=0.95)
+    agent = KaedraAgent(service, None, semantic_cache=cache)
+
+    first = ask(agent, "What is the capital of France?", use_semantic_cache=True)
+    second = ask(agent, "capital of france??", use_semantic_cache=True)
+
+    assert SearchToolModel.calls == 1
+    assert second.content == first.content and "semantic_cache" in second.metadata
+
+
+def test_answers_that_searched_are_not_cached(tmp_path, monkeypatch):
+    service = make_service(monkeypatch, search_hit=True)
+    cache = SemanticCache(store=LocalVectorStore(tmp_path, embed_fn=fake_embed), threshold=0.95)
+    agent = KaedraAgent(service, None, semantic_cache=cache)
+
+    result = ask(agent, "What is the capital of France?", use_semantic_cache=True)
+
+    assert result.ok
+    assert cache.store.get_stats()["total"] == 0
+
+
+def test_caller_context_bypasses_cache(tmp_path):
+    agent = make_agent(tmp_path)
+
+    ask(agent, "What is the capital of France?", context="user: hi", use_semantic_cache=True)
+
+    assert agent.semantic_cache.store.get_stats()["total"] == 0
+
+
+def test_stream_uses_cache_when_opted_in(tmp_path):
+    agent = make_agent(tmp_path)
+
+    async def stream(query):
+        return "".join([chunk async for chunk in agent.run_stream(query, use_semantic_cache=True)])
+
+    first = asyncio.run(stream("What is the capital of France?"))
+
+    assert asyncio.run(stream("capital of France")) == first
+    assert agent.prompt.calls == 1
+
+
+def test_grounded_stream_is_not_stored(tmp_path):
+    agent = make_agent(tmp_path, grounded=True)
+
+    async def stream(query):
+        return "".join([chunk async for chunk in agent.run_stream(query, use_semantic_cache=True)])
+
+    asyncio.run(stream("What is the capital of France?"))
+
+    assert agent.semantic_cache.store.get_stats()["total"] == 0
+
+
+def test_lookup_is_scoped(tmp_path):
+    cache = SemanticCache(store=LocalVectorStore(tmp_path, embed_fn=fake_embed), threshold=0.95)
+    cache.store_response("capital of france", "Paris", "m", scope=SemanticCache.scope("memories a"))
+
+    assert cache.lookup("capital of france", "m", scope=SemanticCache.scope("memories a")).response == "Paris"
+    assert cache.lookup("capital of france", "m", scope=SemanticCache.scope("memories b")) is None
+    assert cache.lookup("capital of france", "other-model", scope=SemanticCache.scope("memories a")) is None
+
+
+def test_time_questions_are_not_cached(tmp_path):
+    cache = SemanticCache(store=LocalVectorStore(tmp_path, embed_fn=fake_embed))
+
+    assert not cache.store_response("what time is it", "3pm", "m")
@@ -0,0 +1,113 @@
+"""Offline tests for server-side conversations and atomic turn commits."""
+
+import threading
+
+from kaedra.services.cache import TieredCache
+from kaedra.services.session import ConversationStore
+
+
+def make_store(**kwargs):
+    return ConversationStore(backend=TieredCache(db_file=None, max_entries=100, ttl_s=3600), **kwargs)
+
+
+def turn(store, conversation_id, messages, reply):
+    conversation, query = store.begin_turn(conversation_id, messages)
+    return store.complete_turn(conversation, query, reply)
+
+
+def roles_and_contents(conversation):
+    return [(t["role"], t["content"]) for t in conversation.turns]
+
+
+def test_incremental_and_full_history_clients():
+    store = make_store()
+    turn(store, "c", [("user", "hi")], "hello")
+    turn(store, "c", [("user", "hi"), ("assistant", "hello"), ("user", "more")], "sure")
+
+    stored = store.get("c")
+    assert stored.message_count == 4
+    assert roles_and_contents(stored)[-2:] == [("user", "more"), ("assistant", "sure")]
+    assert store.stats()["full_history_requests"] == 1
+
+
+def test_failed_generation_leaves_store_unchanged():
+    store = make_store()
+    turn(store, "c", [("user", "hi")], "hello")
+
+    store.begin_turn("c", [("user", "second")])  # Generation fails: no complete_turn
+
+    assert store.get("c").message_count == 2
+
+
+def test_interleaved_turns_are_both_kept():
+    store = make_store()
+    turn(store, "c", [("user", "hi")], "hello")
+
+    first, first_query = store.begin_turn("c", [("user", "a")])
+    second, second_query = store.begin_turn("c", [("user", "b")])
+    store.complete_turn(first, first_query, "reply a")
+    store.complete_turn(second, second_query, "reply b")
+
+    stored = store.get("c")
+    assert roles_and_contents(stored) == [
+        ("user", "hi"), ("assistant", "hello"),
+        ("user", "a"), ("assistant", "reply a"),
+        ("user", "b"), ("assistant", "reply b"),
+    ]
+    assert stored.message_count == 6
+    assert store.stats()["conflicts"] == 1
+
+
+def test_concurrent_new_conversation_keeps_one_opening_message():
+    store = make_store()
+    messages_a = [("system", "be brief"), ("user", "a")]
+    messages_b = [("system", "be brief"), ("user", "b")]
+
+    first, first_query = store.begin_turn("c", messages_a)
+    second, second_query = store.begin_turn("c", messages_b)
+    store.complete_turn(first, first_query, "reply a")
+    store.complete_turn(second, second_query, "reply b")
+
+    contents = [content for _, content in roles_and_contents(store.get("c"))]
+    assert contents == ["be brief", "a", "reply a", "b", "reply b"]
+
+
+def test_no_lost_updates_under_threads():
+    store = make_store(recent_turns=100)
+    turn(store, "c", [("user", "start")], "ok")
+    barrier = threading.Barrier(8)
+
+    def worker(i):
+        conversation, query = store.begin_turn("c", [("user", f"q{i}")])
+        barrier.wait()
+        store.complete_turn(conversation, query, f"r{i}")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stored = store.get("c")
+    assert stored.message_count == 2 + 16
+    assert {content for _, content in roles_and_contents(stored)} >= {f"q{i}" for i in range(8)}
+
+
+def test_in_flight_state_is_not_persisted():
+    store = make_store()
+    conversation, query = store.begin_turn("c", [("system", "s"), ("user", "hi")])
+    assert conversation.pending == [{"role": "system", "content": "s"}]
+
+    saved = store.complete_turn(conversation, query, "hello")
+
+    assert "pending" not in saved.to_dict() and "base_digest" not in saved.to_dict()
+    assert store.get("c").message_count == 3
+
+
+def test_begun_turn_does_not_touch_stored_copy():
+    store = make_store()
+    turn(store, "c", [("user", "hi")], "hello")
+
+    store.begin_turn("c", [("system", "note"), ("user", "next")])
+
+    assert len(store.get("c").turns) == 2
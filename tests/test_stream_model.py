@@ -0,0 +1,109 @@
+"""Offline tests: streamed replies are labelled with the model that served them."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import kaedra.services.prompt as prompt_module
+from kaedra.agents.base import AgentResponse
+from kaedra.core.config import MODELS
+from kaedra.core.exceptions import PromptError
+from kaedra.interface.cli import stream_reply
+from kaedra.services.cache import ResponseCache
+from kaedra.services.prompt import PromptService, streamed_model
+from kaedra.services.usage import UsageTracker
+
+
+class StreamingModel:
+    def __init__(self, name, **kwargs):
+        self.name = name
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        async def chunks():
+            yield SimpleNamespace(text="hi", usage_metadata=None)
+        return chunks()
+
+
+class ProRouter:
+    """Routes every request to pro."""
+
+    def route(self, prompt, agent, cascade=True):
+        return SimpleNamespace(start="pro", attempts=[])
+
+    def record(self, decision):
+        pass
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.headers = []
+        self.notes = []
+
+    def begin_message(self, role, model=None, agent=None):
+        self.headers.append((role, model))
+
+    def append_chunk(self, chunk):
+        pass
+
+    def end_message(self, note=None):
+        self.notes.append(note)
+
+
+class StreamingAgent:
+    """Agent whose run_stream goes through a real PromptService, optionally failing after routing."""
+
+    name = "KAEDRA"
+
+    def __init__(self, prompt, fail=False):
+        self.prompt = prompt
+        self.fail = fail
+
+    async def run_stream(self, query, tool_output=None):
+        async for chunk in self.prompt.generate_stream_async(query, agent=self.name):
+            if self.fail:
+                raise PromptError("stream broke")
+            yield chunk
+
+
+@pytest.fixture
+def auto_service(monkeypatch):
+    monkeypatch.setattr(prompt_module, "GenerativeModel", StreamingModel)
+    return PromptService(
+        model_key="flash",
+        enable_grounding=False,
+        response_cache=ResponseCache(None),
+        usage_tracker=UsageTracker(),
+        router=ProRouter(),
+        auto_route=True
+    )
+
+
+def test_stream_reply_labels_routed_model(auto_service):
+    logger = RecordingLogger()
+
+    response = stream_reply(StreamingAgent(auto_service), "hello", "[K]", logger)
+
+    assert isinstance(response, AgentResponse) and response.content == "hi"
+    assert response.model == MODELS["pro"]
+    assert logger.headers == [("KAEDRA", MODELS["pro"])]
+
+
+def test_failed_stream_is_still_labelled_with_routed_model(auto_service):
+    logger = RecordingLogger()
+
+    response = stream_reply(StreamingAgent(auto_service, fail=True), "hello", "[K]", logger)
+
+    assert not response.ok
+    assert response.model == MODELS["pro"]
+    assert logger.headers == [("KAEDRA", MODELS["pro"])]
+    assert logger.notes == ["stream broke"]
+
+
+def test_streamed_model_does_not_leak_between_runs(auto_service):
+    async def drain():
+        return [chunk async for chunk in auto_service.generate_stream_async("hello")]
+
+    asyncio.run(drain())
+
+    assert streamed_model() is None
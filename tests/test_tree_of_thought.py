@@ -0,0 +1,80 @@
+"""Offline tests for Tree of Thought failure handling."""
+
+import itertools
+
+from kaedra.core.exceptions import PromptError
+from kaedra.services.prompt import PromptResult
+from kaedra.strategies.tree_of_thought import TreeOfThoughtsStrategy
+
+
+class FakePrompt:
+    """
+    generate_async stand-in for thoughts, evaluations and the synthesis.
+
+    Thoughts are numbered in the order they are generated; evaluate(n)
+    decides the evaluator reply for thought n (None means the call fails).
+    """
+
+    def __init__(self, evaluate, synthesis_fails=False):
+        self.evaluate = evaluate
+        self.synthesis_fails = synthesis_fails
+        self.counter = itertools.count(1)
+
+    async def generate_async(self, prompt, model_key=None, **kwargs):
+        if "SCORE: <0-10>" in prompt:
+            number = int(prompt.rsplit("thought ", 1)[1].split()[0])
+            reply = self.evaluate(number)
+            return self._result(reply) if reply is not None else self._failure("evaluator down")
+        if "SYNTHESIZE" in prompt:
+            return self._failure("synthesis quota") if self.synthesis_fails else self._result("golden")
+        return self._result(f"thought {next(self.counter)}")
+
+    @staticmethod
+    def _result(text):
+        return PromptResult(text=text, model="m", latency_ms=1.0)
+
+    @staticmethod
+    def _failure(message):
+        return PromptResult(text=f"[error] {message}", model="m", latency_ms=1.0,
+                            error=PromptError(message))
+
+
+def run(prompt, depth=1, breadth=3, beam_width=1):
+    strategy = TreeOfThoughtsStrategy(prompt, depth=depth, breadth=breadth, beam_width=beam_width)
+    return strategy.execute("plan a launch")
+
+
+def test_failed_synthesis_is_reported_as_error():
+    result = run(FakePrompt(lambda n: f"SCORE: {n}\nREASON: fine", synthesis_fails=True))
+
+    assert not result.ok
+    assert result.error == "synthesis quota"
+    assert result.golden_path == ""
+    assert "[synthesis failed: synthesis quota]" in result.full_analysis
+    assert result.to_dict()["error"] == "synthesis quota"
+
+
+def test_successful_synthesis_has_no_error():
+    result = run(FakePrompt(lambda n: f"SCORE: {n}\nREASON: fine"))
+
+    assert result.ok and result.golden_path == "golden"
+
+
+def test_failed_evaluations_never_take_beam_slots():
+    # Thought 1 scores 2; thought 2's evaluator call fails; thought 3's reply has no score
+    replies = {1: "SCORE: 2\nREASON: weak", 2: None, 3: "no idea"}
+    result = run(FakePrompt(replies.get), beam_width=2)
+
+    by_thought = {node.thought: node for node in result.approaches}
+    assert by_thought["thought 1"].status == "kept"
+    assert by_thought["thought 2"].status == "failed"
+    assert by_thought["thought 2"].error == "evaluation failed: evaluator down"
+    assert by_thought["thought 3"].status == "failed"
+    assert [node.thought for node in result.best_path] == ["thought 1"]
+
+
+def test_no_scored_branch_is_an_error():
+    result = run(FakePrompt(lambda n: None))
+
+    assert result.error == "no branch could be generated and scored"
+    assert result.best_path == []
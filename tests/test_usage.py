@@ -0,0 +1,110 @@
+"""Offline tests for token accounting and the OpenAI usage shape."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from kaedra.agents.base import AgentResponse
+from kaedra.core.config import MODEL_PRICING, MODELS
+from kaedra.services.usage import TokenUsage, UsageTracker, estimate_tokens, usage_from_response
+
+
+FLASH, PRO = MODELS["flash"], MODELS["pro"]
+
+
+def test_reported_counts_are_used_as_is():
+    response = SimpleNamespace(text="ignored", usage_metadata=SimpleNamespace(
+        prompt_token_count=120, candidates_token_count=30, cached_content_token_count=100
+    ))
+
+    usage = usage_from_response(response, "prompt")
+
+    assert usage == TokenUsage(prompt_tokens=120, completion_tokens=30, cached_tokens=100)
+    assert not usage.estimated
+
+
+def test_missing_usage_metadata_falls_back_to_estimates():
+    prompt, text = "x" * 40, "y" * 9
+    response = SimpleNamespace(text=text, usage_metadata=None)
+
+    usage = usage_from_response(response, prompt)
+
+    assert usage.prompt_tokens == estimate_tokens(prompt) == 10
+    assert usage.completion_tokens == estimate_tokens(text) == 3
+    assert usage.cached_tokens == 0 and usage.estimated
+
+
+def test_stream_text_overrides_response_text_for_estimate():
+    response = SimpleNamespace(text="last chunk", usage_metadata=SimpleNamespace(prompt_token_count=7))
+
+    usage = usage_from_response(response, "prompt", text="z" * 80)
+
+    assert usage.prompt_tokens == 7
+    assert usage.completion_tokens == 20 and usage.estimated
+
+
+def test_rollups_per_model_and_agent():
+    tracker = UsageTracker()
+    tracker.record(TokenUsage(prompt_tokens=1_000_000), FLASH, agent="KAEDRA")
+    tracker.record(TokenUsage(completion_tokens=1_000_000), PRO, agent="KAEDRA")
+    tracker.record(TokenUsage(prompt_tokens=10, completion_tokens=5, estimated=True), FLASH)
+
+    summary = tracker.summary()
+
+    flash = summary["by_model"][FLASH]
+    assert flash["calls"] == 2 and flash["total_tokens"] == 1_000_015 and flash["estimated"]
+    assert summary["by_model"][PRO]["cost_usd"] == MODEL_PRICING[PRO]["output"]
+    assert summary["by_agent"]["KAEDRA"]["calls"] == 2
+    assert summary["by_agent"]["direct"]["total_tokens"] == 15
+    session = summary["session"]
+    assert session["calls"] == 3 and session["total_tokens"] == 2_000_015
+    assert session["cost_usd"] == pytest.approx(
+        MODEL_PRICING[FLASH]["input"] + MODEL_PRICING[PRO]["output"], abs=1e-4
+    )
+
+
+def test_cached_prompt_tokens_use_cached_price():
+    tracker = UsageTracker()
+
+    cost = tracker.record(TokenUsage(prompt_tokens=1_000_000, cached_tokens=1_000_000), FLASH)
+
+    assert cost == pytest.approx(MODEL_PRICING[FLASH]["cached_input"])
+
+
+def test_to_openai_shape():
+    usage = TokenUsage(prompt_tokens=12, completion_tokens=8, cached_tokens=4)
+
+    assert usage.to_openai() == {
+        "prompt_tokens": 12,
+        "completion_tokens": 8,
+        "total_tokens": 20,
+        "prompt_tokens_details": {"cached_tokens": 4},
+    }
+
+
+class CachedAgent:
+    """Agent answering from the semantic cache: no model call, so no usage."""
+
+    async def run(self, query, context=None, use_semantic_cache=False):
+        return AgentResponse(content="a" * 40, agent_name="KAEDRA", model=FLASH, latency_ms=1.0)
+
+
+def test_chat_completion_estimates_usage_without_model_call(monkeypatch):
+    main = pytest.importorskip("kaedra.api.main")
+    monkeypatch.setattr(main.state, "agent", CachedAgent())
+    monkeypatch.setattr(main.state, "sessions", None)
+    request = main.OpenAIChatCompletionRequest(messages=[
+        main.OpenAIMessage(role="user", content="b" * 20),
+        main.OpenAIMessage(role="user", content="c" * 20),
+    ])
+
+    response = asyncio.run(main.openai_chat_endpoint(request))
+
+    context = "user: " + "b" * 20
+    assert response.usage == {
+        "prompt_tokens": estimate_tokens("c" * 20 + context),
+        "completion_tokens": 10,
+        "total_tokens": estimate_tokens("c" * 20 + context) + 10,
+        "prompt_tokens_details": {"cached_tokens": 0},
+    }
@@ -0,0 +1,239 @@
+"""Offline tests for the BigQuery vector search SQL and the vector store's index handling."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from kaedra.services.vector_sql import (
+    SearchFilters, build_create_vector_index, build_delete_query, build_filter_clause,
+    build_search_query, quote_table
+)
+from kaedra.services.vector_store import BigQueryVectorStore
+
+
+TABLE = "proj.kaedra_memory.embeddings"
+EMBEDDING = [0.125, -0.5, 0.75]
+
+
+def params(query):
+    return {p.name: p for p in query.params}
+
+
+class FakeBigQuery:
+    """Stand-in BigQuery client: records SQL and answers from canned rows."""
+
+    def __init__(self, total_rows=0, index_status=None):
+        self.total_rows = total_rows
+        self.index_status = index_status
+        self.queries = []
+
+    def query(self, sql, job_config=None):
+        self.queries.append(sql)
+        if "INFORMATION_SCHEMA.VECTOR_INDEXES" in sql:
+            rows = [SimpleNamespace(index_status=self.index_status)] if self.index_status else []
+        elif "COUNT(*)" in sql:
+            rows = [SimpleNamespace(total=self.total_rows)]
+        else:
+            rows = []
+        return _Job(rows)
+
+
+class _Job(list):
+    """Query job: iterable rows with a result() that waits (here, instantly)."""
+
+    def result(self):
+        return self
+
+
+class FakeEmbedder:
+    def embed(self, text, model=None):
+        return EMBEDDING
+
+
+def make_store(client, vector_index="auto"):
+    store = BigQueryVectorStore(
+        project_id="proj", embedder=FakeEmbedder(), bq_client=client, vector_index=vector_index
+    )
+    store._initialized = True
+    return store
+
+
+def test_search_query_passes_embedding_as_parameter():
+    query = build_search_query(TABLE, EMBEDDING, limit=7, min_similarity=0.3)
+
+    assert "0.125" not in query.sql
+    embedding = params(query)["query_embedding"]
+    assert embedding.is_array and embedding.type == "FLOAT64"
+    assert embedding.value == EMBEDDING
+    assert params(query)["min_similarity"].value == 0.3
+    assert "LIMIT 7" in query.sql
+    assert "@min_similarity" in query.sql
+
+
+def test_search_query_computes_distance_once():
+    query = build_search_query(TABLE, EMBEDDING)
+
+    assert query.sql.count("COSINE_DISTANCE") == 1
+    assert "WHERE similarity >= @min_similarity" in query.sql
+    assert "VECTOR_SEARCH" not in query.sql
+
+
+def test_empty_filters_match_everything():
+    assert build_filter_clause(None) == ("TRUE", [])
+    assert build_filter_clause(SearchFilters()) == ("TRUE", [])
+
+
+def test_topic_filter():
+    clause, filter_params = build_filter_clause(SearchFilters(topic="work"))
+
+    assert clause == "topic = @topic"
+    assert [(p.name, p.value) for p in filter_params] == [("topic", "work")]
+
+
+def test_tags_filter_matches_any_tag():
+    clause, filter_params = build_filter_clause(SearchFilters(tags=["a", "B"]))
+
+    assert "LOWER(tag) IN UNNEST(@tags)" in clause
+    assert filter_params[0].is_array and filter_params[0].value == ["a", "b"]
+
+
+def test_min_importance_filter_expands_levels():
+    clause, filter_params = build_filter_clause(SearchFilters(min_importance="high"))
+
+    assert "IN UNNEST(@importance_levels)" in clause
+    assert sorted(filter_params[0].value) == ["critical", "high"]
+
+
+def test_time_filters():
+    clause, filter_params = build_filter_clause(SearchFilters(since="2024-01-01", until="2024-12-31"))
+
+    assert clause == "timestamp >= @since AND timestamp <= @until"
+    assert {p.name: (p.type, p.value) for p in filter_params} == {
+        "since": ("TIMESTAMP", "2024-01-01"),
+        "until": ("TIMESTAMP", "2024-12-31"),
+    }
+
+
+def test_filters_are_pushed_into_search():
+    query = build_search_query(TABLE, EMBEDDING, filters=SearchFilters(topic="work", tags=["x"]))
+
+    assert "WHERE topic = @topic AND EXISTS" in query.sql
+    assert {"query_embedding", "min_similarity", "topic", "tags"} == set(params(query))
+
+
+def test_vector_search_path():
+    query = build_search_query(
+        TABLE, EMBEDDING, limit=3, filters=SearchFilters(topic="work"),
+        use_vector_index=True, fraction_lists_to_search=0.05
+    )
+
+    assert "FROM VECTOR_SEARCH(" in query.sql
+    assert "top_k => 3" in query.sql
+    assert "distance_type => 'COSINE'" in query.sql
+    assert '"fraction_lists_to_search": 0.05' in query.sql
+    assert "WHERE topic = @topic" in query.sql  # Filter applied inside the base table subquery
+    assert "COSINE_DISTANCE" not in query.sql
+
+
+def test_rejects_unsafe_identifiers():
+    with pytest.raises(ValueError):
+        quote_table("proj.ds.t`; DROP TABLE x; --")
+    with pytest.raises(ValueError):
+        build_search_query(TABLE, EMBEDDING, limit=0)
+    with pytest.raises(ValueError):
+        build_create_vector_index(TABLE, index_type="HNSW")
+
+
+def test_delete_query_is_parameterized():
+    query = build_delete_query(TABLE, "abc'--")
+
+    assert query.sql == f"DELETE FROM `{TABLE}` WHERE id = @id"
+    assert params(query)["id"].value == "abc'--"
+
+
+def test_create_vector_index_ddl():
+    ddl = build_create_vector_index(TABLE, num_lists=100)
+
+    assert ddl.startswith("CREATE VECTOR INDEX IF NOT EXISTS embedding_index")
+    assert "STORING(topic, tags, importance, timestamp)" in ddl
+    assert '"num_lists": 100' in ddl
+
+
+def test_local_filters_match_sql_semantics():
+    record = {"topic": "work", "tags": ["a"], "importance": "high", "timestamp": "2024-06-01T00:00:00"}
+
+    assert SearchFilters(topic="work", tags=["a", "z"], min_importance="normal").matches(record)
+    assert not SearchFilters(min_importance="critical").matches(record)
+    assert not SearchFilters(since="2024-07-01").matches(record)
+
+
+def count(client, marker):
+    return sum(marker in sql for sql in client.queries)
+
+
+def test_large_table_gets_vector_index():
+    client = FakeBigQuery(total_rows=10_000)
+    store = make_store(client)
+
+    assert store.refresh_vector_index() is False  # Requested, still building
+    assert any(sql.startswith("CREATE VECTOR INDEX") for sql in client.queries)
+
+
+def test_small_table_stays_brute_force():
+    client = FakeBigQuery(total_rows=10)
+    store = make_store(client)
+    store.refresh_vector_index()
+
+    store.search_similar("hello")
+
+    assert not any(sql.startswith("CREATE VECTOR INDEX") for sql in client.queries)
+    assert any("COSINE_DISTANCE" in sql for sql in client.queries)
+
+
+def test_active_index_switches_search_to_vector_search():
+    client = FakeBigQuery(total_rows=10_000, index_status="ACTIVE")
+    store = make_store(client)
+    store.refresh_vector_index()
+
+    store.search_similar("hello")
+
+    assert any("VECTOR_SEARCH" in sql for sql in client.queries)
+    assert not any(sql.startswith("CREATE VECTOR INDEX") for sql in client.queries)
+
+
+def test_search_never_checks_the_index_inline():
+    client = FakeBigQuery(total_rows=10_000, index_status="ACTIVE")
+    store = make_store(client)
+    store._refresh_in_background = lambda: None  # Background step disabled
+
+    store.search_similar("hello")
+
+    assert count(client, "INFORMATION_SCHEMA") == 0 and count(client, "COUNT(*)") == 0
+    assert any("COSINE_DISTANCE" in sql for sql in client.queries)  # Unknown yet: brute force
+
+
+def test_background_refresh_runs_once_per_interval():
+    client = FakeBigQuery(total_rows=10_000, index_status="ACTIVE")
+    store = make_store(client)
+
+    store.has_active_vector_index()
+    store._index_refresh.join(5)
+    store.has_active_vector_index()
+
+    assert count(client, "INFORMATION_SCHEMA") == 1
+    assert store.has_active_vector_index() is True
+
+
+def test_too_small_count_is_cached_until_enough_rows_are_added():
+    client = FakeBigQuery(total_rows=10)
+    store = make_store(client)
+
+    store.refresh_vector_index()
+    store.refresh_vector_index()  # e.g. the next 600 s expiry
+    assert count(client, "COUNT(*)") == 1
+
+    store._rows_added = 5_000
+    client.total_rows = 5_010
+    store.refresh_vector_index()
+    assert count(client, "COUNT(*)") == 2
+    assert any(sql.startswith("CREATE VECTOR INDEX") for sql in client.queries)